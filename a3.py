@@ -2,10 +2,10 @@ import tkinter as tk
 
 from model import TowerGame
 from tower import SimpleTower, MissileTower, LaserTower, InfernoTower, SlowTower, GunTower
-from enemy import SimpleEnemy, HardenedEnemy, SuperRichardEnemy, SwarmEnemy
-from utilities import Stepper
+from stepper import Stepper
+from utilities import FixedTimestep
 from view import GameView
-from level import AbstractLevel
+from levels.simple import MyLevel
 from advanced_view import TowerView
 from high_score_manager import HighScoreManager 
 import os.path
@@ -20,95 +20,6 @@ __author__ = "Haoxi Tan"
 
 
 
-#Could be moved to a separate file, perhaps levels/simple.py, and imported
-class MyLevel(AbstractLevel):
-    """A simple game level containing examples of how to generate a wave"""
-    waves = 20
-
-    def get_wave(self, wave, game):
-        """Returns enemies in the 'wave_n'th wave
-
-        Parameters:
-            wave_n (int): The nth wave
-            game (TowerGame): the instance of the game
-
-        Return:
-            list[tuple[int, AbstractEnemy]]: A list of (step, enemy) pairs in the
-                                             wave, sorted by step in ascending order 
-        """
-        enemies = []
-
-        if 1 <= wave <= 2:
-            #A hardcoded singleton list of (step, enemy) pairs
-
-            enemies = [ (10, SimpleEnemy()),(12, SimpleEnemy()),(14, SimpleEnemy())]
-
-
-        elif 3 <= wave < 8:
-            #List of (step, enemy) pairs spread across an interval of time (steps)
-
-            steps = int(40 * (wave ** .5))  #The number of steps to spread the enemies across
-            count = wave * 2  #The number of enemies to spread across the (time) steps
-
-            for step in self.generate_intervals(steps, count):
-                #make enemies have more health each wave!
-                enemies.append((step, SimpleEnemy(health=wave/2*100)))
-                #enemies.append((step+20, SwarmEnemy()))
-
-        elif 7 <= wave < 10:
-            #List of (step, enemy) pairs spread across an interval of time (steps)
-
-            steps = int(40 * (wave ** .5))  #The number of steps to spread the enemies across
-            count = wave  #The number of enemies to spread across the (time) steps
-
-            for step in self.generate_intervals(steps, count):
-                enemies.append((step, SimpleEnemy(health=wave/2*100)))
-                enemies.append((step+20, HardenedEnemy(health=wave/2*100)))
-
-        elif wave == 10:
-            #Generate sub waves
-            sub_waves = [
-                #(steps, number of enemies, enemy constructor, args, kwargs)
-                (50, 10, SimpleEnemy, (), {}),  #10 enemies over 50 steps
-                (100, None, None, None, None),  #then nothing for 100 steps
-                (50, 10, SimpleEnemy, (), {}),  #then another 10 enemies over 50 steps
-                (30, 1, lambda game=game: SuperRichardEnemy(game,health=wave/2.5*1500), (), {}),
-            ]
-
-            enemies = self.generate_sub_waves(sub_waves)
-
-        else:  #11 <= wave <= 20
-            #Now it's going to get hectic
-
-            sub_waves = [
-                (
-                    int(13 * wave),  #total steps
-                    int(25 * wave ** (wave / 50)),  #number of enemies
-                    SimpleEnemy,  #enemy constructor
-                    (),  #positional arguments to provide to enemy constructor
-                    {},  #keyword arguments to provide to enemy constructor
-                ),
-                (
-                    int(13 * wave),  #total steps
-                    int(25 * wave ** (wave / 50)),  #number of enemies
-                    HardenedEnemy,  #enemy constructor
-                    (),  #positional arguments to provide to enemy constructor
-                    {},  #keyword arguments to provide to enemy constructor
-                ),
-                (
-                    int(2 * wave),  #total steps
-                    int(wave/8 + 1),  #number of enemies
-                    lambda game=game: SuperRichardEnemy(game),  #enemy constructor
-                    (),  #positional arguments to provide to enemy constructor
-                    {},  #keyword arguments to provide to enemy constructor
-                ),
-
-            ]
-            enemies = self.generate_sub_waves(sub_waves)
-
-        return enemies
-
-
 class StatusBar(tk.Frame):
     '''class for status bar'''
 
@@ -369,8 +280,15 @@ class TowerGameApp(Stepper):
         self._master = master
         super().__init__(master, delay=delay)
         master.title("tkDefend")
+
+        #simulation ticks are scheduled from real time, so frames can be skipped when fast-forwarding
+        self._timestep = FixedTimestep(delay / 1000)
+        self._last_frame = None
+        self._drawn_updates = None
         
-        self._game = game = TowerGame()
+        #paths for previewing tower placement are built ahead of the cursor, in the background
+        self._game = game = TowerGame(prefetch_paths=True, pooling=True)
+        self._preview_poll = None
 
         self._highscores = {}
 
@@ -438,6 +356,12 @@ class TowerGameApp(Stepper):
             command=self._toggle_paused)
         self._play_button.pack(side=tk.RIGHT)
 
+        self._speed_button_text = tk.StringVar()
+        self._speed_button_text.set("speed: 1x")
+        self._speed_button = tk.Button(self._control_frame, textvariable=self._speed_button_text,
+            command=self._cycle_speed)
+        self._speed_button.pack(side=tk.RIGHT)
+
         #6.3 initiate upgrade dictionary to store upgrade controls for each tower
         self._upgrade_controls = {}
 
@@ -513,6 +437,7 @@ class TowerGameApp(Stepper):
         
         if paused:
             self.pause()
+            self._last_frame = None
             self._play_button_text.set("play")
         else:
             self.start()
@@ -520,6 +445,11 @@ class TowerGameApp(Stepper):
 
         self._paused = paused
 
+    def _cycle_speed(self):
+        """Cycles through fast-forward speeds; intermediate steps are not rendered"""
+        speed = self._timestep.next_speed()
+        self._speed_button_text.set("speed: %s" % ("max" if speed is None else "%dx" % speed))
+
     def _setup_game(self):
         '''setup the game'''
 
@@ -554,8 +484,6 @@ class TowerGameApp(Stepper):
 
         #to store and retrive boss images
         self._view._boss_images = {}
-        self._view.laser_counts = {}
-        self._view.total_laser_count = 0
 
     #Task 1.4 (File Menu): Complete menu item handlers here (including docstrings!)
     
@@ -606,7 +534,10 @@ class TowerGameApp(Stepper):
 
     def refresh_view(self):
         """Refreshes the game view"""
-        if self._step_number % 2 == 0:
+        #enemies only move when the game updates, so skip redrawing them otherwise
+        updates = self._game.stats['updates']
+        if updates != self._drawn_updates:
+            self._drawn_updates = updates
             self._view.draw_enemies(self._game.enemies)
         self._view.draw_towers(self._game.towers)
         self._view.draw_obstacles(self._game.obstacles)
@@ -616,13 +547,21 @@ class TowerGameApp(Stepper):
         """
         Perform a step every interval
 
-        Triggers a game step and updates the view
+        Triggers as many game steps as have elapsed (according to the speed) and
+        updates the view once
 
         Returns:
             (bool) True if the game is still running
         """
-        
-        self._game.step()
+        now = time.perf_counter()
+        elapsed = 0 if self._last_frame is None else now - self._last_frame
+        self._last_frame = now
+
+        #unbounded speed steps for as long as a frame would otherwise take
+        ticks = self._timestep.update(elapsed)
+        deadline = now + self._delay / 1000 if ticks is None else None
+
+        self._game.advance(ticks, deadline=deadline, until=self.is_stopped)
 
         self._view.delete('laser')
 
@@ -647,7 +586,8 @@ class TowerGameApp(Stepper):
         position = event.x, event.y
         self._current_tower.position = position
 
-        legal, grid_path = self._game.attempt_placement(position)
+        #only read finished paths, so previews never wait on path finding
+        legal, grid_path = self._game.attempt_placement(position, wait=False)
 
         #find the best path and covert positions to pixel positions
         path = [self._game.grid.cell_to_pixel_centre(position)
@@ -657,6 +597,17 @@ class TowerGameApp(Stepper):
         self._view.draw_preview(self._current_tower, legal)
         self._view.draw_path(path)
 
+        #redraw once the previewed path has been built, even if the mouse stays still
+        self._cancel_preview_poll()
+        if self._game.is_preview_pending(position):
+            self._preview_poll = self._master.after(20, self._move, event)
+
+    def _cancel_preview_poll(self):
+        """Cancels any scheduled redraw of the placement preview"""
+        if self._preview_poll is not None:
+            self._master.after_cancel(self._preview_poll)
+            self._preview_poll = None
+
 
     def _mouse_leave(self, event):
         """
@@ -669,6 +620,7 @@ class TowerGameApp(Stepper):
         #Task 1.2 (Tower placement): Delete the preview
         #Hint: Relevant canvas items are tagged with: 'path', 'range', 'shadow'
         #      See tk.Canvas.delete (delete all with tag)
+        self._cancel_preview_poll()
         self._view.delete("shadow", "range", "path")
 
     def _left_click(self, event):
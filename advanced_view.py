@@ -460,32 +460,9 @@ class ObstacleView(SimpleView):
     @classmethod
     def _draw_laser(cls, canvas: tk.Canvas, laser: Laser):
         """Draws a laser with random colours"""
+        colour = random.choice(('red','lightblue','yellow','white'))
 
-        try:
-            canvas.laser_counts[laser] += 1
-        except KeyError:
-            canvas.laser_counts[laser] = 1
-
-        if canvas.laser_counts[laser] < 3:
-
-            canvas.total_laser_count += 1
-
-            x, y = laser.position
-
-            length, width = laser.size
-
-            dx, dy = rotate_point((length / 2, width / 2), laser.rotation)
-
-            #head = x + dx, y + dy
-            #tail = x - dx, y - dy
-
-            head = x + dx, y + dy
-            tail = x, y
-
-            colour = random.choice(('red','lightblue','yellow','white'))
-
-            return canvas.create_line(head, tail, tag='laser', fill=colour, width=random.random()*3) #was #00ffff (aqua)
-
+        return canvas.create_line(laser.position, laser.end, tag='laser', fill=colour, width=random.random()*3) #was #00ffff (aqua)
 
 
     @classmethod
@@ -0,0 +1,141 @@
+"""
+Diagonal path benchmark
+
+Compares the length of the best path, & the time taken to generate it, when paths
+may only move axially (Path) & when they may also move diagonally (DiagonalPath),
+on square grids of increasing size scattered with randomly placed towers, from the
+top-left to the bottom-right.
+
+Usage:
+    python -m benchmarks.diagonal_path [--sizes 50,100,200,300] [--density .3] [--repeat 3]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from modules.matrix import get_adjacent_cells
+from path import Path, DiagonalPath
+
+__author__ = "Haoxi Tan"
+
+
+def get_scattered_towers(size, density, start, end, seed=0):
+    """Returns randomly placed towers that leave a path from start to end
+
+    Parameters:
+        size (int): The number of columns & rows in the grid
+        density (float): The proportion of cells to try placing a tower in
+        start (tuple<int, int>): The starting position
+        end (tuple<int, int>): The end position
+        seed (int): Seed for the tower positions
+
+    Return:
+        set<tuple<int, int>>: The positions of every tower
+    """
+    rng = random.Random(seed)
+
+    towers = set()
+    for column in range(size):
+        for row in range(size):
+            if rng.random() < density:
+                towers.add((column, row))
+
+    # clear an axial route along the top & right, so every grid can be crossed
+    towers.difference_update((column, start[1]) for column in range(size))
+    towers.difference_update((size - 1, row) for row in range(start[1], end[1] + 1))
+
+    # reopen scattered cells, to give the path more room to choose between routes
+    towers.difference_update((column, row) for column, row in list(towers) if rng.random() < .5 * density)
+
+    return towers
+
+
+def get_ends(size):
+    """(tuple<tuple<int, int>, tuple<int, int>>) Returns the start & end positions, just
+    outside the top-left & bottom-right of a 'size' x 'size' grid"""
+    return (-1, 1), (size, size - 2)
+
+
+def get_neighbour_function(size, start, end, towers, deltas):
+    """Returns a neighbour function like TowerGame's, moving along 'deltas'"""
+    def get_neighbours(cell, from_=True):  # pylint: disable=unused-argument
+        for node in get_adjacent_cells(cell, deltas=deltas):
+            column, row = node
+            if (0 <= column < size and 0 <= row < size and node not in towers) \
+                    or node == start or node == end:
+                yield node
+
+    return get_neighbours
+
+
+def build_axial_path(size, start, end, towers):
+    """(Path) Builds a path that only moves axially"""
+    return Path(start, end, get_neighbour_function(size, start, end, towers, Path.DELTAS))
+
+
+def build_diagonal_path(size, start, end, towers):
+    """(DiagonalPath) Builds a path that may also move diagonally"""
+    return DiagonalPath(start, end, get_neighbour_function(size, start, end, (), DiagonalPath.DELTAS),
+                        blocked=towers)
+
+
+def get_length(path):
+    """(float) Returns the length, in cells, of the best path"""
+    return sum(abs(dx) + abs(dy) if 0 in (dx, dy) else 2 ** .5 for dx, dy in path.get_best_deltas())
+
+
+def time_build(build, size, towers, repeat):
+    """Returns the best time taken to build a path on a 'size' x 'size' grid
+
+    Return:
+        tuple<float, float, int>: (best time, path length, path cells) triple
+    """
+    start, end = get_ends(size)
+
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        path = build(size, start, end, towers)
+        elapsed = time.perf_counter() - begin
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, get_length(path), len(list(path.get_shortest()))
+
+
+def main(argv=None):
+    """Runs the diagonal path benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark axial against diagonal paths")
+    parser.add_argument('--sizes', default="50,100,200,300",
+                        help="comma separated grid side lengths")
+    parser.add_argument('--density', type=float, default=.3, help="proportion of cells with towers")
+    parser.add_argument('--repeat', type=int, default=3, help="number of builds to time per size")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'size':>9} {'towers':>7} {'axial len':>10} {'diag len':>9} {'cells':>13} "
+          f"{'axial (s)':>10} {'diag (s)':>9} {'slowdown':>9}")
+
+    for size in sizes:
+        towers = get_scattered_towers(size, args.density, *get_ends(size))
+
+        axial_time, axial_length, axial_cells = time_build(build_axial_path, size, towers, args.repeat)
+        diagonal_time, diagonal_length, diagonal_cells = time_build(build_diagonal_path, size, towers,
+                                                                    args.repeat)
+
+        if diagonal_length > axial_length:
+            print(f"FAIL: diagonal path is longer on {size}x{size} ({diagonal_length:.1f} vs {axial_length:.1f})")
+            return 1
+
+        print(f"{f'{size}x{size}':>9} {len(towers):>7} {axial_length:>10.1f} {diagonal_length:>9.1f} "
+              f"{f'{axial_cells} / {diagonal_cells}':>13} {axial_time:>10.3f} {diagonal_time:>9.3f} "
+              f"{diagonal_time / axial_time:>8.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""
+Import-time benchmark for the game model
+
+Imports a module in a fresh interpreter & checks that it neither pulls in
+tkinter nor exceeds a fixed time budget, so the model stays usable headless.
+
+Usage:
+    python -m benchmarks.import_time [--module model] [--budget 0.25]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+__author__ = "Haoxi Tan"
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Run in a child process so modules cached by this interpreter can't skew the timing
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+print(json.dumps(sorted(name for name in sys.modules if name.split('.')[0] in ('tkinter', '_tkinter'))))
+"""
+
+def measure_import(module, repeat=5):
+    """Imports 'module' in 'repeat' fresh interpreters
+
+    Parameters:
+        module (str): The name of the module to import
+        repeat (int): The number of interpreters to import within
+
+    Return:
+        tuple<float, list<str>>: (best time, gui modules) pair, where:
+                                    - best time: The fastest import time, in seconds
+                                    - gui modules: Names of tkinter modules that were imported
+    """
+    best = None
+    gui_modules = []
+
+    for _ in range(repeat):
+        output = subprocess.check_output([sys.executable, '-c', PROBE.format(module=module)],
+                                         cwd=ROOT, universal_newlines=True)
+        elapsed, imported = output.splitlines()
+
+        elapsed = float(elapsed)
+        best = elapsed if best is None else min(best, elapsed)
+        gui_modules = json.loads(imported)
+
+    return best, gui_modules
+
+
+def main(argv=None):
+    """Runs the import benchmark, returning a non-zero exit status on failure"""
+    parser = argparse.ArgumentParser(description="Benchmark module import time")
+    parser.add_argument('--module', default='model', help="module to import")
+    parser.add_argument('--budget', type=float, default=.25, help="maximum import time, in seconds")
+    parser.add_argument('--repeat', type=int, default=5, help="number of fresh interpreters to time")
+    args = parser.parse_args(argv)
+
+    elapsed, gui_modules = measure_import(args.module, repeat=args.repeat)
+
+    print(f"import {args.module}: {elapsed * 1000:.1f}ms (budget {args.budget * 1000:.0f}ms)")
+
+    failed = False
+    if gui_modules:
+        print(f"FAIL: importing {args.module} imported {', '.join(gui_modules)}")
+        failed = True
+    if elapsed > args.budget:
+        print(f"FAIL: importing {args.module} exceeded the time budget")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
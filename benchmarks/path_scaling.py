@@ -0,0 +1,106 @@
+"""
+Path generation scaling benchmark
+
+Times generating a path through a maze of tower walls on square grids of
+increasing size, for the dict-based Path & the array-backed ArrayPath.
+
+Usage:
+    python -m benchmarks.path_scaling [--sizes 50,100,200,500] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+
+from modules.matrix import get_adjacent_cells
+from path import Path, ArrayPath
+
+__author__ = "Haoxi Tan"
+
+
+def get_maze(size, spacing=4):
+    """Returns towers forming a serpentine maze across a square grid
+
+    Every 'spacing'th column is a wall, with a single gap alternating between the
+    bottom & top rows, so the path must wind across the whole grid.
+
+    Parameters:
+        size (int): The number of columns & rows in the grid
+        spacing (int): The number of columns between walls
+
+    Return:
+        set<tuple<int, int>>: The positions of every tower
+    """
+    towers = set()
+    for i, column in enumerate(range(spacing - 1, size - 1, spacing)):
+        gap = size - 1 if i % 2 == 0 else 0
+        towers.update((column, row) for row in range(size) if row != gap)
+
+    return towers
+
+
+def build_dict_path(size, start, end, towers):
+    """(Path) Builds a dict-based Path, with a neighbour function like TowerGame's"""
+    def get_neighbours(cell, from_=True):  # pylint: disable=unused-argument
+        for node in get_adjacent_cells(cell):
+            column, row = node
+            if (0 <= column < size and 0 <= row < size and node not in towers) \
+                    or node == start or node == end:
+                yield node
+
+    return Path(start, end, get_neighbours)
+
+
+def build_array_path(size, start, end, towers):
+    """(ArrayPath) Builds an array-backed path"""
+    return ArrayPath(start, end, (size, size), blocked=towers)
+
+
+def time_build(build, size, repeat):
+    """Returns the best time taken to build a path on a 'size' x 'size' maze
+
+    Return:
+        tuple<float, int>: (best time, path length) pair
+    """
+    towers = get_maze(size)
+    start, end = (-1, 1), (size, 1)
+
+    best = None
+    for _ in range(repeat):
+        begin = time.perf_counter()
+        path = build(size, start, end, towers)
+        elapsed = time.perf_counter() - begin
+
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, path.distances[start]
+
+
+def main(argv=None):
+    """Runs the path scaling benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark path generation on growing grids")
+    parser.add_argument('--sizes', default="50,100,200,500",
+                        help="comma separated grid side lengths")
+    parser.add_argument('--repeat', type=int, default=3, help="number of builds to time per size")
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    print(f"{'size':>9} {'cells':>8} {'length':>8} {'Path (s)':>10} {'ArrayPath (s)':>14} {'speedup':>8}")
+
+    for size in sizes:
+        dict_time, length = time_build(build_dict_path, size, args.repeat)
+        array_time, array_length = time_build(build_array_path, size, args.repeat)
+
+        if array_length != length:
+            print(f"FAIL: path lengths differ on {size}x{size} ({length} vs {array_length})")
+            return 1
+
+        print(f"{f'{size}x{size}':>9} {size * size:>8} {length:>8} {dict_time:>10.3f} "
+              f"{array_time:>14.3f} {dict_time / array_time:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
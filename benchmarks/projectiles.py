@@ -0,0 +1,134 @@
+"""
+Projectile benchmark
+
+Compares the time taken to step increasing numbers of projectiles (an even mix of
+missiles, bullets & pulses, fired at stationary enemies) one object at a
+time & in bulk with a ProjectileSystem, starting from identical scenes.
+
+Usage:
+    python -m benchmarks.projectiles [--counts 50,200,1000,5000] [--steps 20]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+
+from core import GameData, UnitManager
+from enemy import SimpleEnemy
+from enemy_store import EnemyStore
+from projectiles import ProjectileSystem
+from tower import Bullet, Missile, Pulse
+
+__author__ = "Haoxi Tan"
+
+CELL_SIZE = 40
+GRID_SIZE = (40, 40)
+
+
+def build_scene(count, seed=0):
+    """Returns stored enemies, & projectiles fired at them from random positions
+
+    Parameters:
+        count (int): The number of projectiles to create
+        seed (int): Seed for the unit positions
+
+    Return:
+        tuple<GameData, list<AbstractObstacle>>: (data, projectiles) pair
+    """
+    rng = random.Random(seed)
+    width, height = (CELL_SIZE * cells for cells in GRID_SIZE)
+
+    data = GameData()
+    data.enemies = UnitManager((width, height))
+    data.enemy_store = EnemyStore()
+
+    enemies = []
+    for _ in range(max(count // 4, 1)):
+        # enough health to survive every hit, so projectiles keep their targets
+        enemy = SimpleEnemy(health=10 ** 9)
+        enemy.set_cell_size(CELL_SIZE)
+        enemy.position = rng.uniform(0, width), rng.uniform(0, height)
+
+        data.enemy_store.add(enemy)
+        data.enemies.update_unit(enemy)
+        enemies.append(enemy)
+
+    projectiles = []
+    for i in range(count):
+        position = rng.uniform(0, width), rng.uniform(0, height)
+        target = rng.choice(enemies)
+        rotation = rng.uniform(-math.pi, math.pi)
+
+        kind = i % 3
+        if kind == 0:
+            projectile = Missile(position, CELL_SIZE, target, rotation=rotation)
+        elif kind == 1:
+            projectile = Bullet(position, CELL_SIZE, target, rotation=rotation)
+        else:
+            projectile = Pulse(position, CELL_SIZE, rng.choice(Pulse.DIRECTIONS))
+
+        projectiles.append(projectile)
+
+    return data, projectiles
+
+
+def time_objects(data, projectiles, steps):
+    """Returns the time taken to step each projectile individually 'steps' times
+
+    Return:
+        tuple<float, int>: (time, remaining projectiles) pair
+    """
+    start = time.perf_counter()
+
+    for _ in range(steps):
+        projectiles = [projectile for projectile in projectiles if projectile.step(data)[0]]
+
+    return time.perf_counter() - start, len(projectiles)
+
+
+def time_system(data, projectiles, steps):
+    """Returns the time taken to step every projectile in bulk 'steps' times
+
+    Return:
+        tuple<float, int>: (time, remaining projectiles) pair
+    """
+    system = ProjectileSystem()
+    for projectile in projectiles:
+        system.add(projectile)
+
+    start = time.perf_counter()
+
+    for _ in range(steps):
+        system.step(data.enemy_store, data.enemies)
+
+    return time.perf_counter() - start, len(system)
+
+
+def main(argv=None):
+    """Runs the projectile benchmark"""
+    parser = argparse.ArgumentParser(description="Benchmark stepping projectiles individually & in bulk")
+    parser.add_argument('--counts', default="50,200,1000,5000",
+                        help="comma separated numbers of projectiles")
+    parser.add_argument('--steps', type=int, default=20, help="number of steps to time")
+    args = parser.parse_args(argv)
+
+    counts = [int(count) for count in args.counts.split(',')]
+
+    print(f"{'count':>7} {'remaining':>13} {'objects (ms)':>13} {'system (ms)':>12} {'speedup':>8}")
+
+    for count in counts:
+        objects_time, objects_remaining = time_objects(*build_scene(count), args.steps)
+        system_time, system_remaining = time_system(*build_scene(count), args.steps)
+
+        objects_time, system_time = (1000 * elapsed / args.steps for elapsed in (objects_time, system_time))
+
+        print(f"{count:>7} {f'{objects_remaining} / {system_remaining}':>13} {objects_time:>13.3f} "
+              f"{system_time:>12.3f} {objects_time / system_time:>7.1f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
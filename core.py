@@ -2,6 +2,8 @@
 
 import math
 from abc import ABC
+from bisect import bisect_left, bisect_right
+from itertools import count
 
 __author__ = "Benjamin Martin"
 __copyright__ = "Copyright 2018, The University of Queensland"
@@ -135,20 +137,46 @@ class Point2D:
 
 class BucketManager:
     """Collection of values mapped from two dimensional positions in a grid, the grid
-    divided into multiple buckets (sub-regions)"""
+    divided into multiple buckets (sub-regions)
+
+    Each value is kept in exactly one bucket, and is only moved between buckets when
+    its position crosses a bucket boundary"""
 
     def __init__(self, max_position, buckets=(10, 10)):
         bucket_size = tuple(int(i / buckets_i + .5) for i, buckets_i in zip(max_position, buckets))
 
         self._max = max_position
         self._buckets = [[set() for i in range(buckets[1])] for i in range(buckets[0])]
+        self._shape = tuple(buckets)
         self._bucket_size = bucket_size
 
+        # the index of the bucket containing each value
+        self._indices = {}
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __contains__(self, value):
+        return value in self._indices
+
+    def __iter__(self):
+        """Yields every value, in no particular order"""
+        return iter(self._indices)
+
     def clear(self):
         """Removes all value & position mappings"""
-        for column in self._buckets:
-            for cell in column:
-                cell.clear()
+        for x_i, y_i in set(self._indices.values()):
+            self._buckets[x_i][y_i].clear()
+
+        self._indices.clear()
+
+    def get_bucket_size(self):
+        """(tuple<int, int>) Returns the (width, height) of each bucket"""
+        return self._bucket_size
+
+    def get_max_position(self):
+        """(tuple<int, int>) Returns the (x, y) size of the area divided into buckets"""
+        return self._max
 
     def position_to_index(self, position):
         """(tuple<int, int>) Returns index of the bucket that corresponds to position
@@ -158,16 +186,51 @@ class BucketManager:
         """
         return tuple(int(i // i_bucket_size) for i, i_bucket_size in zip(position, self._bucket_size))
 
+    def is_position_valid(self, position):
+        """(bool) Returns True iff 'position' lies within the area divided into buckets"""
+        x, y = position
+        max_x, max_y = self._max
+
+        return 0 <= x < max_x and 0 <= y < max_y
+
     def add(self, position, value):
-        """(tuple<int, int>) Adds 'value' at 'position'
-        
+        """(tuple<int, int>) Adds 'value' at 'position', moving it if it has already been added
+
         Parameters:
             position (tuple<int, int>): The position in the grid
             value (*): The value to add
+
+        Return:
+            bool: True iff 'value' was added to a different bucket than it was previously in
         """
-        x_i, y_i = self.position_to_index(position)
+        index = self.position_to_index(position)
+        previous = self._indices.get(value)
+
+        if index == previous:
+            return False
+
+        x_i, y_i = index
         self._buckets[x_i][y_i].add(value)
 
+        if previous is not None:
+            x_i, y_i = previous
+            self._buckets[x_i][y_i].discard(value)
+
+        self._indices[value] = index
+        return True
+
+    def remove(self, value):
+        """Removes 'value', if it has been added
+
+        Parameters:
+            value (*): The value to remove
+        """
+        index = self._indices.pop(value, None)
+
+        if index is not None:
+            x_i, y_i = index
+            self._buckets[x_i][y_i].discard(value)
+
     def get_bucket_for_position(self, position):
         """(tuple<int, int>) Returns the bucket corresponding to 'position'
         
@@ -177,11 +240,188 @@ class BucketManager:
         x_i, y_i = self.position_to_index(position)
         return self._buckets[x_i][y_i]
 
-        # def get_nearby_buckets(self):
+    def get_indices_along(self, start, end):
+        """(list<tuple<int, int>>) Returns the index of every bucket that the segment from
+        'start' to 'end' passes through, in order, skipping those outside of the grid
+
+        Buckets are walked one boundary crossing at a time (Amanatides & Woo's DDA), so a
+        segment longer than a bucket can't skip over the buckets in the middle.
+
+        Parameters:
+            start (tuple<num, num>): The position the segment starts at
+            end (tuple<num, num>): The position the segment ends at
+        """
+        (x0, y0), (x1, y1) = start, end
+        width, height = self._bucket_size
+        columns, rows = self._shape
+
+        x_i, y_i = int(x0 // width), int(y0 // height)
+        crossings = abs(int(x1 // width) - x_i) + abs(int(y1 // height) - y_i)
+
+        # the fraction of the segment travelled at the next boundary crossed along each axis,
+        # & the fraction travelled between boundaries
+        dx, dy = x1 - x0, y1 - y0
+        step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+
+        if dx:
+            next_x = ((x_i + (step_x > 0)) * width - x0) / dx
+            delta_x = width / abs(dx)
+        else:
+            next_x = delta_x = math.inf
+
+        if dy:
+            next_y = ((y_i + (step_y > 0)) * height - y0) / dy
+            delta_y = height / abs(dy)
+        else:
+            next_y = delta_y = math.inf
+
+        indices = []
+        for _ in range(crossings + 1):
+            if 0 <= x_i < columns and 0 <= y_i < rows:
+                indices.append((x_i, y_i))
+
+            if next_x < next_y:
+                x_i += step_x
+                next_x += delta_x
+            else:
+                y_i += step_y
+                next_y += delta_y
+
+        return indices
+
+    def get_buckets_along(self, start, end):
+        """(list<set>) Returns every bucket that the segment from 'start' to 'end' passes
+        through, in order (see get_indices_along)"""
+        return [self._buckets[x_i][y_i] for x_i, y_i in self.get_indices_along(start, end)]
+
+    def get_bucket(self, index):
+        """(set) Returns the bucket at 'index'
+
+        The same set is kept for the lifetime of this manager, so it may be held onto
+        to observe the values in that bucket as they change.
+        """
+        x_i, y_i = index
+        return self._buckets[x_i][y_i]
+
+    def get_bucket_box(self, index):
+        """Returns the area covered by the bucket at 'index', as a pair of coordinate
+        pairs: ((left, top), (right, bottom)), where right & bottom are exclusive"""
+        width, height = self._bucket_size
+        x_i, y_i = index
+
+        return (x_i * width, y_i * height), ((x_i + 1) * width, (y_i + 1) * height)
+
+    def _clamp_index(self, index):
+        """(tuple<int, int>) Returns the nearest valid bucket index to 'index'"""
+        return tuple(min(max(i, 0), buckets_i - 1) for i, buckets_i in zip(index, self._shape))
+
+    def get_bucket_bounds(self, top_left, bottom_right):
+        """Returns the range of bucket indices that can intersect a box
+
+        Parameters:
+            top_left (tuple<int, int>): The top-left position of the box
+            bottom_right (tuple<int, int>): The bottom-right position of the box
+
+        Return:
+            tuple<tuple<int, int>, tuple<int, int>>: The (min, max) bucket indices, inclusive,
+                                                     or None if the box lies outside of the grid
+        """
+        max_x, max_y = self._max
+        (left, top), (right, bottom) = top_left, bottom_right
+
+        if right < 0 or bottom < 0 or left >= max_x or top >= max_y:
+            return None
+
+        return (self._clamp_index(self.position_to_index(top_left)),
+                self._clamp_index(self.position_to_index(bottom_right)))
+
+    @staticmethod
+    def _get_ring(centre, ring, bounds):
+        """Yields the bucket indices exactly 'ring' buckets away from 'centre' (by
+        Chebyshev distance), excluding those outside of 'bounds'"""
+        c_x, c_y = centre
+        (min_x, min_y), (max_x, max_y) = bounds
 
-    def get_closish(self, position, nearby_buckets=None):
-        """Yields positions, roughly prioritised by proximity to 'position'"""
-        raise NotImplementedError("get_closish must be implemented by a subclass")
+        if ring == 0:
+            yield centre
+            return
+
+        left, right = c_x - ring, c_x + ring
+        top, bottom = c_y - ring, c_y + ring
+
+        for x_i in range(max(left, min_x), min(right, max_x) + 1):
+            if top >= min_y:
+                yield x_i, top
+            if bottom <= max_y:
+                yield x_i, bottom
+
+        for y_i in range(max(top + 1, min_y), min(bottom - 1, max_y) + 1):
+            if left >= min_x:
+                yield left, y_i
+            if right <= max_x:
+                yield right, y_i
+
+    def get_closish_indices(self, position, radius=None):
+        """Yields bucket indices, searching outwards in square rings from the bucket
+        containing 'position'
+
+        Parameters:
+            position (tuple<int, int>): The position to search outwards from
+            radius (float): If not None, only buckets that can contain positions within
+                            'radius' (horizontally & vertically) of 'position' are yielded
+        """
+        if radius is None:
+            bounds = (0, 0), tuple(buckets_i - 1 for buckets_i in self._shape)
+        else:
+            x, y = position
+            bounds = self.get_bucket_bounds((x - radius, y - radius), (x + radius, y + radius))
+
+            if bounds is None:
+                return
+
+        (min_x, min_y), (max_x, max_y) = bounds
+
+        # clamp the centre into bounds, so a centre outside the grid still searches outwards
+        x_i, y_i = self.position_to_index(position)
+        centre = min(max(x_i, min_x), max_x), min(max(y_i, min_y), max_y)
+        c_x, c_y = centre
+
+        rings = max(c_x - min_x, max_x - c_x, c_y - min_y, max_y - c_y)
+
+        for ring in range(rings + 1):
+            yield from self._get_ring(centre, ring, bounds)
+
+    def get_closish(self, position, radius=None):
+        """Yields values, prioritised by the proximity of their bucket to 'position'
+
+        Buckets are searched outwards in square rings from the bucket containing
+        'position', so values in nearer buckets are always yielded first.
+
+        Parameters:
+            position (tuple<int, int>): The position to search outwards from
+            radius (float): If not None, only buckets that can contain positions within
+                            'radius' (horizontally & vertically) of 'position' are searched
+        """
+        buckets = self._buckets
+        for x_i, y_i in self.get_closish_indices(position, radius=radius):
+            yield from buckets[x_i][y_i]
+
+    def get_in_box(self, top_left, bottom_right):
+        """Yields values in every bucket that intersects a box, in no particular order
+
+        Parameters:
+            top_left (tuple<int, int>): The top-left position of the box
+            bottom_right (tuple<int, int>): The bottom-right position of the box
+        """
+        bounds = self.get_bucket_bounds(top_left, bottom_right)
+
+        if bounds is None:
+            return
+
+        (min_x, min_y), (max_x, max_y) = bounds
+        for column in self._buckets[min_x:max_x + 1]:
+            for values in column[min_y:max_y + 1]:
+                yield from values
 
 
 class UnitManager(BucketManager):
@@ -192,19 +432,102 @@ class UnitManager(BucketManager):
         """Adds 'unit' to this UnitManager"""
         self.add(unit.position, unit)
 
-    def get_closish(self, position, nearby_buckets=None):
-        """Yields positions, roughly prioritised by proximity to 'position'"""
-        # naive implementation, performance could be improved by searching outwards from nearby buckets
+    def update_unit(self, unit: Unit):
+        """Moves 'unit' to the bucket for its current position, adding it if necessary,
+        or removes it if it is positioned outside of the grid
+
+        Return:
+            bool: True iff 'unit' is in this UnitManager
+        """
+        if not self.is_position_valid(unit.position):
+            self.remove(unit)
+            return False
+
+        self.add(unit.position, unit)
+        return True
+
+    def remove_unit(self, unit: Unit):
+        """Removes 'unit' from this UnitManager, if it has been added"""
+        self.remove(unit)
+
+
+class ProgressIndex:
+    """Collection of units ordered by their progress, i.e. remaining distance along a path
+
+    Units are kept sorted as their progress is updated, so the unit nearest to (or
+    furthest from) the end of the path can be found without sorting every unit.
+    """
+
+    def __init__(self):
+        # parallel sorted lists of (progress, tiebreak) keys & their units
+        self._keys = []
+        self._units = []
 
-        # if nearby_buckets is None:
-        #     nearby_buckets = {(0, 0)}
+        self._entries = {}
+        self._tiebreaks = count()
 
-        # x_i, y_i = self.position_to_index(position)
+    def __len__(self):
+        return len(self._units)
 
-        for column in self._buckets:
-            for values in column:
-                for value in values:
-                    yield value
+    def __contains__(self, unit):
+        return unit in self._entries
+
+    def __iter__(self):
+        """Yields units, from least to most remaining distance"""
+        return iter(self._units)
+
+    def __reversed__(self):
+        """Yields units, from most to least remaining distance"""
+        return reversed(self._units)
+
+    def clear(self):
+        """Removes all units"""
+        self._keys.clear()
+        self._units.clear()
+        self._entries.clear()
+
+    def get_progress(self, unit, default=None):
+        """(float) Returns the remaining distance of 'unit', or 'default' if it hasn't been added"""
+        key = self._entries.get(unit)
+        return default if key is None else key[0]
+
+    def update(self, unit, progress):
+        """Sets the remaining distance of 'unit' to 'progress', adding it if necessary
+
+        Parameters:
+            unit (Unit): The unit to update
+            progress (float): The unit's remaining distance along the path
+        """
+        key = self._entries.get(unit)
+        if key is not None:
+            if key[0] == progress:
+                return
+            self._pop(key)
+
+        key = self._entries[unit] = progress, next(self._tiebreaks)
+        index = bisect_right(self._keys, key)
+        self._keys.insert(index, key)
+        self._units.insert(index, unit)
+
+    def remove(self, unit):
+        """Removes 'unit', if it has been added"""
+        key = self._entries.pop(unit, None)
+        if key is not None:
+            self._pop(key)
+
+    def _pop(self, key):
+        """Removes the entry for 'key' from the sorted lists"""
+        index = bisect_left(self._keys, key)
+        del self._keys[index]
+        del self._units[index]
+
+    def first(self):
+        """(Unit) Returns the unit with the least remaining distance, or None if empty"""
+        return self._units[0] if self._units else None
+
+    def last(self):
+        """(Unit) Returns the unit with the most remaining distance, or None if empty"""
+        return self._units[-1] if self._units else None
 
 
 class GameData:
@@ -216,3 +539,7 @@ class GameData:
     towers = None
     grid = None
     path = None
+    enemy_store = None
+    progress = None
+    pool = None
+    routes = None
@@ -4,7 +4,9 @@ All enemies should inherit from AbstractEnemy (either directly or from one of it
 """
 
 from core import Unit
-from utilities import rectangles_intersect, get_delta_through_centre
+from modules.matrix import AXIAL_DELTAS
+from pool import create
+from utilities import rectangles_intersect, get_delta_through_centre, get_radial_target
 import random
 
 __author__ = "Benjamin Martin and Brae Webb"
@@ -23,6 +25,12 @@ class AbstractEnemy(Unit):
     points: int
     live_damage = 1
 
+    # The types of damage that don't harm this enemy, which it has no need to route around
+    immunities = frozenset()
+
+    # The EnemyStore holding this enemy's attributes, if any (see enemy_store.EnemyStore)
+    _store = None
+
     def __init__(self, grid_size=(.2, .2), grid_speed=1 / 12, health=100):
         """Construct an abstract enemy
 
@@ -38,6 +46,17 @@ class AbstractEnemy(Unit):
 
         super().__init__(None, grid_size, 0)  # allow enemy's to be position- & sizeless initially
 
+
+    @property
+    def store(self):
+        """(EnemyStore) Returns the store holding this enemy's attributes, or None if it isn't stored"""
+        return self._store
+
+    @property
+    def row(self):
+        """(int) Returns the row holding this enemy's attributes in its store (see store)"""
+        return self._row
+
     def set_cell_size(self, cell_size: int):
         """Sets the cell size for this unit to 'cell_size'"""
         super().set_cell_size(cell_size)
@@ -60,47 +79,45 @@ class AbstractEnemy(Unit):
         """
         raise NotImplementedError("damage method must be implemented by subclass")
 
-    def __repr__(self):
-        return self.name
-
-
-class SimpleEnemy(AbstractEnemy):
-    """Basic type of enemy"""
-    name = "Simple Enemy"
-    colour = '#E23152'  # Amaranth
-
-    points = 5
-    live_damage = 1
-
-    def __init__(self, grid_size=(.2, .2), grid_speed=5/60, health=100):
-        super().__init__(grid_size, grid_speed, health)
+    def act(self, data):
+        """Performs any actions, other than moving, for a single time-step
+        i.e. spawning other enemies
 
+        Parameters:
+            data (GameData): Data for the game the enemy is in
+        """
 
-    def damage(self, damage, type_):
-        """Inflict damage on the enemy
+    def step(self, data):
+        """Performs a single time-step, acting then moving the enemy forward
 
         Parameters:
-            damage (int): The amount of damage to inflict
-            type_ (str): The type of damage to do i.e. projectile, explosive
-        """
-        #debug
+            data (GameData): Data for the game the enemy is in
 
-        self.health -= damage
-        if self.health < 0:
-            self.health = 0
+        Returns:
+            bool: True iff the new location of the enemy is within the grid
+        """
+        self.act(data)
+        return self.move(data)
 
-    def step(self, data):
+    def move(self, data):
         """Move the enemy forward a single time-step
 
+        Enemies that don't override this method may instead be moved in bulk
+        by the game (see flow_field.FlowField.advance)
+
         Parameters:
-            grid (GridCoordinateTranslator): Grid the enemy is currently on
-            path (Path): The path the enemy is following
+            data.grid (GridCoordinateTranslator): Grid the enemy is currently on
+            data.path (Path): The path the enemy is following, unless routed by
+                              data.routes (see get_path)
 
         Returns:
             bool: True iff the new location of the enemy is within the grid
         """
         grid = data.grid
-        path = data.path
+        path = self.get_path(data)
+
+        if path.DELTAS is not AXIAL_DELTAS:
+            return self._move_radially(grid, path)
 
         # Repeatedly move toward next cell centre as much as possible
         movement = self.grid_speed
@@ -133,6 +150,86 @@ class SimpleEnemy(AbstractEnemy):
         intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0), grid.pixels)
         return intersects or grid.pixel_to_cell(self.position) in path.deltas
 
+    def _move_radially(self, grid, path):
+        """Move the enemy forward a single time-step along a path that may move diagonally
+
+        Parameters:
+            grid (GridCoordinateTranslator): Grid the enemy is currently on
+            path (Path): The path the enemy is following
+
+        Returns:
+            bool: True iff the new location of the enemy is within the grid
+        """
+        movement = self.grid_speed
+        at_centre = False
+        while movement > 0:
+            cell_position = grid.pixel_to_cell(self.position)
+            cell_offset = grid.pixel_to_cell_offset(self.position)
+
+            try:
+                delta = path.get_best_delta(cell_position)
+            except KeyError:
+                return None
+
+            # Move toward the next cell's centre, via the current cell's centre if off course
+            # (centre pixels are rounded, so may not be exactly at the centre)
+            target = delta if at_centre else get_radial_target(cell_offset, delta)
+            dx, dy = target[0] - cell_offset[0], target[1] - cell_offset[1]
+            distance = (dx * dx + dy * dy) ** .5
+
+            if distance <= movement:
+                target_cell = cell_position[0] + target[0], cell_position[1] + target[1]
+                self.position = grid.cell_to_pixel_centre(target_cell)
+                movement -= distance
+                at_centre = True
+            else:
+                speed = movement / distance * self.cell_size
+                self.move_by((speed * dx, speed * dy))
+                self.position = tuple(int(i) for i in self.position)
+                movement = 0
+
+        intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0), grid.pixels)
+        return intersects or grid.pixel_to_cell(self.position) in path.deltas
+
+    def get_path(self, data):
+        """(Path) Returns the path this enemy follows
+
+        Parameters:
+            data (GameData): Data for the game the enemy is in
+        """
+        if data.routes is None:
+            return data.path
+        return data.routes.get_path(self.immunities)
+
+    def __repr__(self):
+        return self.name
+
+
+class SimpleEnemy(AbstractEnemy):
+    """Basic type of enemy"""
+    name = "Simple Enemy"
+    colour = '#E23152'  # Amaranth
+
+    points = 5
+    live_damage = 1
+
+    def __init__(self, grid_size=(.2, .2), grid_speed=5/60, health=100):
+        super().__init__(grid_size, grid_speed, health)
+
+
+    def damage(self, damage, type_):
+        """Inflict damage on the enemy
+
+        Parameters:
+            damage (int): The amount of damage to inflict
+            type_ (str): The type of damage to do i.e. projectile, explosive
+        """
+        #debug
+
+        self.health -= damage
+        if self.health < 0:
+            self.health = 0
+
 
 class SwarmEnemy(SimpleEnemy):
     """A type of enemy that is faster and smaller than SimpleEnemy,
@@ -151,6 +248,8 @@ class InvincibleEnemy(SimpleEnemy):
     name = "Invincible Enemy"
     colour = '#4D4C5B'  # Porpoise
 
+    immunities = frozenset(('projectile', 'explosive', 'pulse', 'energy'))
+
     def damage(self, damage, type_):
         """Enemy never takes damage
 
@@ -168,6 +267,8 @@ class HardenedEnemy(AbstractEnemy):
     points = 7
     live_damage = 2
 
+    immunities = frozenset(('projectile', 'explosive'))
+
     def __init__(self, grid_size=(.3, .3), grid_speed=3/60, health=100):
         super().__init__(grid_size, grid_speed, health)
 
@@ -178,57 +279,13 @@ class HardenedEnemy(AbstractEnemy):
             damage (int): The amount of damage to inflict
             type_ (str): The type of damage to do i.e. projectile, explosive
         """
-        if type_ == "projectile" or type_ == "explosive":
+        if type_ in self.immunities:
             return
 
         self.health -= damage
         if self.health < 0:
             self.health = 0
 
-    def step(self, data):
-        """Move the enemy forward a single time-step
-
-        Parameters:
-            grid (GridCoordinateTranslator): Grid the enemy is currently on
-            path (Path): The path the enemy is following
-
-        Returns:
-            bool: True iff the new location of the enemy is within the grid
-        """
-        grid = data.grid
-        path = data.path
-
-
-        # Repeatedly move toward next cell centre as much as possible
-        movement = self.grid_speed
-        while movement > 0:
-            cell_offset = grid.pixel_to_cell_offset(self.position)
-
-            # Assuming cell_offset is along an axis!
-            offset_length = abs(cell_offset[0] + cell_offset[1])
-
-            if offset_length == 0:
-                partial_movement = movement
-            else:
-                partial_movement = min(offset_length, movement)
-
-            cell_position = grid.pixel_to_cell(self.position)
-            delta = path.get_best_delta(cell_position)
-
-            # Ensures enemy will move to the centre before moving toward delta
-            dx, dy = get_delta_through_centre(cell_offset, delta)
-
-            speed = partial_movement * self.cell_size
-            self.move_by((speed * dx, speed * dy))
-            self.position = tuple(int(i) for i in self.position)
-
-            movement -= partial_movement
-
-
-
-        intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0), grid.pixels)
-        return intersects or grid.pixel_to_cell(self.position) in path.deltas
-
 
 class SuperRichardEnemy(AbstractEnemy):
     """A super boss enemy.
@@ -274,59 +331,22 @@ class SuperRichardEnemy(AbstractEnemy):
         if self.health < 0:
             self.health = 0
 
-    def step(self, data):
-        """Move the enemy forward a single time-step
+    def act(self, data):
+        """Starts spawning swarm enemies once below half health
 
         Parameters:
-            grid (GridCoordinateTranslator): Grid the enemy is currently on
-            path (Path): The path the enemy is following
-
-        Returns:
-            bool: True iff the new location of the enemy is within the grid
+            data (GameData): Data for the game the enemy is in
         """
-        grid = data.grid
-        path = data.path
-
-
         #starts generating swarm enemies if below half life
         if self.health/SuperRichardEnemy.health <= 0.5: 
 
-            swarm = [(5,  SwarmEnemy())]
-            
             if self.swarm_count < 10:
                 for i in range(5):
-                    
+                    # each swarm enemy must be a distinct instance
+                    swarm = [(5,  create(data.pool, SwarmEnemy))]
+
                     for step, enemy in swarm:
                         enemy.set_cell_size(self.game.grid.cell_size)
 
                     self.spawn_swarm(swarm)
                     self.swarm_count += 1
-
-        # Repeatedly move toward next cell centre as much as possible
-        movement = self.grid_speed
-        while movement > 0:
-            cell_offset = grid.pixel_to_cell_offset(self.position)
-
-            # Assuming cell_offset is along an axis!
-            offset_length = abs(cell_offset[0] + cell_offset[1])
-
-            if offset_length == 0:
-                partial_movement = movement
-            else:
-                partial_movement = min(offset_length, movement)
-
-            cell_position = grid.pixel_to_cell(self.position)
-            delta = path.get_best_delta(cell_position)
-
-            # Ensures enemy will move to the centre before moving toward delta
-            dx, dy = get_delta_through_centre(cell_offset, delta)
-
-            speed = partial_movement * self.cell_size
-            self.move_by((speed * dx, speed * dy))
-            self.position = tuple(int(i) for i in self.position)
-
-            movement -= partial_movement
-
-        intersects = rectangles_intersect(*self.get_bounding_box(), (0, 0), grid.pixels)
-        return intersects or grid.pixel_to_cell(self.position) in path.deltas
-
@@ -0,0 +1,214 @@
+"""
+Array-backed (struct-of-arrays) storage for enemies
+
+Enemies added to an EnemyStore keep their position, health, max_health, grid_speed
+& size in contiguous NumPy arrays, with each enemy object becoming a thin view over
+its row. This allows whole waves to be processed with vectorised operations, while
+existing code continues to treat enemies as ordinary objects.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for array-backed enemies
+    np = None
+
+__author__ = "Haoxi Tan"
+
+
+class StoredAttribute:
+    """Descriptor for an enemy attribute that is held in its EnemyStore's arrays"""
+
+    def __init__(self, array_name, is_vector=False):
+        """Constructor
+
+        Parameters:
+            array_name (str): The name of the EnemyStore array that holds this attribute
+            is_vector (bool): If True, each row is an (x, y) pair & is returned as a tuple
+        """
+        self._array_name = array_name
+        self._is_vector = is_vector
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        array = getattr(instance._store, self._array_name)
+        row = instance._row
+
+        # ndarray.item avoids constructing intermediate numpy scalars & views
+        if self._is_vector:
+            return array.item(row, 0), array.item(row, 1)
+        return array.item(row)
+
+    def __set__(self, instance, value):
+        getattr(instance._store, self._array_name)[instance._row] = value
+
+
+# Cache of unit class to the subclass whose stored attributes are views over a row
+_view_classes = {}
+
+
+def get_view_class(enemy_class, fields=None):
+    """(Class<Unit>) Returns the subclass of 'enemy_class' used while its instances
+    belong to an EnemyStore (or another store of 'fields')
+
+    Plain enemies are left untouched, so only stored enemies pay for attribute lookups
+    through the arrays.
+
+    Parameters:
+        enemy_class (Class<Unit>): The class of the stored units
+        fields (dict<str, tuple<str, bool>>): Maps each stored attribute to its
+                                              (array name, is_vector) pair, defaulting
+                                              to EnemyStore.FIELDS
+    """
+    view_class = _view_classes.get(enemy_class)
+
+    if view_class is None:
+        if fields is None:
+            fields = EnemyStore.FIELDS
+
+        namespace = {field: StoredAttribute(array_name, is_vector)
+                     for field, (array_name, is_vector) in fields.items()}
+        namespace['__module__'] = enemy_class.__module__
+        namespace['__doc__'] = enemy_class.__doc__
+
+        view_class = _view_classes[enemy_class] = type(enemy_class.__name__, (enemy_class,), namespace)
+
+    return view_class
+
+
+class EnemyStore:
+    """Struct-of-arrays collection of enemies
+
+    Rows [0, len(store)) of each array are occupied, in no particular order; removing
+    an enemy moves the last row into its place.
+
+    Attributes:
+        positions (np.ndarray<float>): (n, 2) array of (x, y) pixel positions
+        health (np.ndarray<float>): Current health of each enemy
+        max_health (np.ndarray<float>): Maximum health of each enemy
+        grid_speed (np.ndarray<float>): Relative speed of each enemy within a grid cell
+        sizes (np.ndarray<float>): (n, 2) array of (width, height) pixel sizes
+        class_ids (np.ndarray<int>): Index into 'classes' of each enemy's class
+        classes (list<Class<AbstractEnemy>>): Every enemy class that has been stored
+    """
+    # Maps each stored enemy attribute to its (array name, is_vector) pair
+    FIELDS = {
+        'position': ('positions', True),
+        'size': ('sizes', True),
+        'health': ('health', False),
+        'max_health': ('max_health', False),
+        'grid_speed': ('grid_speed', False),
+    }
+
+    def __init__(self, capacity=64):
+        """Constructor
+
+        Parameters:
+            capacity (int): The number of enemies to initially allocate space for
+
+        Raises:
+            ImportError if numpy is not installed
+        """
+        if np is None:
+            raise ImportError("EnemyStore requires numpy")
+
+        self._enemies = []
+        self._class_ids = {}
+        self.classes = []
+
+        self.positions = np.zeros((capacity, 2))
+        self.sizes = np.zeros((capacity, 2))
+        self.health = np.zeros(capacity)
+        self.max_health = np.zeros(capacity)
+        self.grid_speed = np.zeros(capacity)
+        self.class_ids = np.zeros(capacity, dtype=np.intp)
+
+    def __len__(self):
+        return len(self._enemies)
+
+    def __iter__(self):
+        """Yields stored enemies, in row order"""
+        return iter(self._enemies)
+
+    def __contains__(self, enemy):
+        return enemy._store is self
+
+    def get_enemy(self, row):
+        """(AbstractEnemy) Returns the enemy stored in 'row'"""
+        return self._enemies[row]
+
+    def get_class_id(self, enemy_class):
+        """(int) Returns the class id for 'enemy_class', registering it if necessary"""
+        class_id = self._class_ids.get(enemy_class)
+
+        if class_id is None:
+            class_id = self._class_ids[enemy_class] = len(self.classes)
+            self.classes.append(enemy_class)
+
+        return class_id
+
+    def _grow(self):
+        """Doubles the capacity of every array"""
+        for array_name, _ in self.FIELDS.values():
+            array = getattr(self, array_name)
+            setattr(self, array_name, np.concatenate((array, np.zeros_like(array))))
+
+        self.class_ids = np.concatenate((self.class_ids, np.zeros_like(self.class_ids)))
+
+    def add(self, enemy):
+        """Moves 'enemy's attributes into this store, making it a view over a new row
+
+        Parameters:
+            enemy (AbstractEnemy): The enemy to add, which must not belong to a store
+        """
+        if enemy._store is not None:
+            raise ValueError(f"{enemy} already belongs to an EnemyStore")
+
+        row = len(self._enemies)
+        if row == len(self.health):
+            self._grow()
+
+        self._enemies.append(enemy)
+        self.class_ids[row] = self.get_class_id(type(enemy))
+
+        for field, (array_name, _) in self.FIELDS.items():
+            getattr(self, array_name)[row] = enemy.__dict__.pop(field)
+
+        enemy._store, enemy._row = self, row
+        enemy.__class__ = get_view_class(type(enemy))
+
+    def remove(self, enemy):
+        """Removes 'enemy' from this store, copying its attributes back onto it
+
+        Parameters:
+            enemy (AbstractEnemy): The enemy to remove
+        """
+        if enemy._store is not self:
+            raise KeyError(f"{enemy} does not belong to this EnemyStore")
+
+        values = {field: getattr(enemy, field) for field in self.FIELDS}
+
+        row = enemy._row
+        last = len(self._enemies) - 1
+
+        # fill the vacated row with the last row
+        if row != last:
+            moved = self._enemies[row] = self._enemies[last]
+            moved._row = row
+
+            for array_name, _ in self.FIELDS.values():
+                array = getattr(self, array_name)
+                array[row] = array[last]
+            self.class_ids[row] = self.class_ids[last]
+
+        self._enemies.pop()
+
+        enemy.__class__ = type(enemy).__bases__[0]
+        del enemy._store, enemy._row
+        enemy.__dict__.update(values)
+
+    def clear(self):
+        """Removes all enemies from this store"""
+        for enemy in reversed(self._enemies):
+            self.remove(enemy)
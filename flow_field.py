@@ -0,0 +1,142 @@
+"""
+Flow fields for moving many path-following enemies at once
+
+A FlowField compiles a Path's best deltas into a per-cell direction array, which
+is used to advance every enemy in an EnemyStore with a single batched pass.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for bulk movement
+    np = None
+
+__author__ = "Haoxi Tan"
+
+
+class FlowField:
+    """Per-cell movement directions for a path, compiled into arrays
+
+    Attributes:
+        path (Path): The path this flow field was compiled from
+        version (int): The version of the path when this flow field was compiled
+        directions (np.ndarray<int>): (columns, rows, 2) array of the best delta from each cell
+        valid (np.ndarray<bool>): (columns, rows) array, True iff a cell is on the path
+    """
+
+    def __init__(self, path, grid):
+        """Compiles a flow field from 'path'
+
+        Parameters:
+            path (Path): The path to follow
+            grid (GridCoordinateTranslator): The grid the path is on
+
+        Raises:
+            ImportError if numpy is not installed
+        """
+        if np is None:
+            raise ImportError("FlowField requires numpy")
+
+        self.path = path
+        self.version = path.version
+        self._grid = grid
+
+        # path may start & end outside of the grid, so bound every cell it covers
+        cells = list(path.deltas) + list(path.ends)
+        columns, rows = zip(*cells)
+
+        self._origin = np.array((min(columns), min(rows)))
+        shape = max(columns) - min(columns) + 1, max(rows) - min(rows) + 1
+
+        self.directions = np.zeros(shape + (2,), dtype=np.intp)
+        self.valid = np.zeros(shape, dtype=bool)
+
+        for cell in path.deltas:
+            column, row = np.subtract(cell, self._origin)
+            self.directions[column, row] = path.get_best_delta(cell)
+            self.valid[column, row] = True
+
+    def lookup(self, cells):
+        """Returns the best deltas for an array of cells
+
+        Parameters:
+            cells (np.ndarray<int>): (n, 2) array of (column, row) cell positions
+
+        Return:
+            tuple<np.ndarray<int>, np.ndarray<bool>>: (deltas, valid) pair, where
+                valid is False for cells that are not on the path (with a (0, 0) delta)
+        """
+        indices = cells - self._origin
+        in_bounds = np.all((indices >= 0) & (indices < self.valid.shape), axis=1)
+
+        indices[~in_bounds] = 0
+        columns, rows = indices[:, 0], indices[:, 1]
+
+        valid = in_bounds & self.valid[columns, rows]
+        deltas = np.where(valid[:, None], self.directions[columns, rows], 0)
+
+        return deltas, valid
+
+    def advance(self, store, rows):
+        """Moves the enemies in 'rows' of 'store' forward a single time-step
+
+        Equivalent to calling AbstractEnemy.move on each enemy, including truncating
+        positions to integers after each partial movement.
+
+        Parameters:
+            store (EnemyStore): The store holding the enemies
+            rows (np.ndarray<int>): The rows of the enemies to move
+
+        Return:
+            np.ndarray<bool>: True for each enemy whose new location is within the grid
+        """
+        cell_size = self._grid.cell_size
+
+        positions = store.positions[rows]
+        movement = store.grid_speed[rows].copy()
+        on_path = np.ones(len(rows), dtype=bool)
+
+        # Repeatedly move toward next cell centre as much as possible
+        active = np.nonzero(movement > 0)[0]
+        while len(active):
+            position = positions[active]
+            cell_offset = np.remainder(position / cell_size, 1) - .5
+
+            # Assuming cell_offset is along an axis!
+            offset_length = np.abs(cell_offset[:, 0] + cell_offset[:, 1])
+
+            remaining = movement[active]
+            partial_movement = np.where(offset_length == 0, remaining, np.minimum(offset_length, remaining))
+
+            cells = np.floor_divide(position, cell_size).astype(np.intp)
+            deltas, valid = self.lookup(cells)
+
+            # enemies that have left the path stop moving
+            on_path[active[~valid]] = False
+
+            # Ensures enemy will move to the centre before moving toward delta
+            signs = np.sign(cell_offset).astype(np.intp)
+            through_centre = np.any(signs != 0, axis=1) & np.any(signs != deltas, axis=1)
+            deltas = np.where(through_centre[:, None], -signs, deltas)
+
+            speed = partial_movement * cell_size
+            position = np.trunc(position + speed[:, None] * deltas)
+
+            positions[active[valid]] = position[valid]
+            movement[active] -= partial_movement
+
+            active = active[valid & (movement[active] > 0)]
+
+        store.positions[rows] = positions
+
+        # mirrors rectangles_intersect on each enemy's bounding box
+        sizes = store.sizes[rows]
+        top_left = positions - sizes // 2
+        bottom_right = top_left + sizes
+
+        width, height = self._grid.pixels
+        intersects = ~((top_left[:, 0] > width) | (bottom_right[:, 0] < 0)
+                       | (top_left[:, 1] > height) | (bottom_right[:, 1] < 0))
+
+        _, valid = self.lookup(np.floor_divide(positions, cell_size).astype(np.intp))
+
+        return on_path & (intersects | valid)
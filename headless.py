@@ -0,0 +1,212 @@
+"""
+Headless simulation runner for tower defence game
+
+Runs a TowerGame at full speed, without creating a tkinter root window, and
+reports simulation throughput. Towers are placed from a JSON layout file,
+containing a list of towers, i.e.
+
+    [
+        {"cell": [2, 1], "tower": "SimpleTower"},
+        {"cell": [3, 3], "tower": "MissileTower", "level": 2}
+    ]
+
+Usage:
+    python headless.py layouts/default.json --waves 10
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import tower
+from model import TowerGame
+from levels.simple import MyLevel
+
+__author__ = "Haoxi Tan"
+
+
+def load_layout(filename):
+    """Loads a tower layout from file
+
+    Parameters:
+        filename (str): The filename of the JSON layout to load from
+
+    Return:
+        list<tuple<tuple<int, int>, Class<AbstractTower>, int>>:
+            (cell, tower_class, level) triple for each tower in the layout
+    """
+    with open(filename) as file:
+        entries = json.load(file)
+
+    layout = []
+    for entry in entries:
+        tower_class = getattr(tower, entry['tower'], None)
+
+        if not isinstance(tower_class, type) or not issubclass(tower_class, tower.AbstractTower):
+            raise ValueError(f"Unknown tower type {entry['tower']!r} in {filename}")
+
+        layout.append((tuple(entry['cell']), tower_class, entry.get('level', 1)))
+
+    return layout
+
+
+def parse_cells(text):
+    """(list<tuple<int, int>>) Parses semicolon separated 'column,row' cells, i.e. "-1,1;-1,4" """
+    return [tuple(int(i) for i in cell.split(',')) for cell in text.split(';')]
+
+
+class WaveReport:
+    """Timing & unit counts gathered while simulating a single wave"""
+
+    def __init__(self, wave):
+        self.wave = wave
+        self.steps = 0
+        self.wall_time = 0.
+        self.peak_enemies = 0
+        self.peak_obstacles = 0
+        self.killed = 0
+        self.escaped = 0
+
+    def steps_per_second(self):
+        """(float) Returns the number of simulation steps performed per second"""
+        if self.wall_time == 0:
+            return 0.
+        return self.steps / self.wall_time
+
+
+class HeadlessRunner:
+    """Simulates waves of a level against a fixed tower layout, as fast as possible"""
+
+    def __init__(self, layout, level=None, size=None, max_steps=20000, **options):
+        """Construct a headless runner
+
+        Parameters:
+            layout (list<tuple<tuple<int, int>, Class<AbstractTower>, int>>):
+                (cell, tower_class, level) triple for each tower to place
+            level (AbstractLevel): The level to generate waves from, defaults to MyLevel
+            size (tuple<int, int>): The (column, row) size of the grid, defaults to the game's
+            max_steps (int): The maximum number of steps to simulate each wave for
+            **options: Any other keyword arguments for the TowerGame constructor
+        """
+        if size is not None:
+            options['size'] = size
+
+        self._game = game = TowerGame(**options)
+        self._level = MyLevel() if level is None else level
+        self._max_steps = max_steps
+
+        for cell, tower_class, tower_level in layout:
+            if not game.place(cell, tower_type=tower_class):
+                raise ValueError(f"Unable to place {tower_class.__name__} at {cell}")
+            game.towers[cell].level = tower_level
+
+    def get_game(self):
+        """(TowerGame) Returns the game being simulated"""
+        return self._game
+
+    def run_wave(self, wave):
+        """Queues & simulates the 'wave'th wave until it is cleared
+
+        Parameters:
+            wave (int): The wave number to simulate
+
+        Return:
+            WaveReport: Timings & unit counts for the wave
+        """
+        game = self._game
+        report = WaveReport(wave)
+
+        enemies = self._level.get_wave(wave, game)
+        for _, enemy in enemies:
+            enemy.set_cell_size(game.grid.cell_size)
+
+        game.queue_wave(enemies)
+
+        killed = game.stats['enemies_killed']
+        escaped = game.stats['enemies_escaped']
+
+        start = time.perf_counter()
+        while report.steps < self._max_steps:
+            report.steps += 1
+            if not game.step():
+                break
+
+            report.peak_enemies = max(report.peak_enemies, len(game.enemies))
+            report.peak_obstacles = max(report.peak_obstacles, len(game.obstacles))
+        report.wall_time = time.perf_counter() - start
+
+        report.killed = game.stats['enemies_killed'] - killed
+        report.escaped = game.stats['enemies_escaped'] - escaped
+
+        return report
+
+    def run(self, waves):
+        """Yields a WaveReport for each of the first 'waves' waves, in order"""
+        for wave in range(1, waves + 1):
+            yield self.run_wave(wave)
+
+
+def main(argv=None):
+    """Runs the headless simulation from the command line"""
+    parser = argparse.ArgumentParser(description="Simulate tower defence waves without a GUI")
+    parser.add_argument('layout', help="JSON file of towers to place")
+    parser.add_argument('--waves', type=int, default=MyLevel.waves, help="number of waves to simulate")
+    parser.add_argument('--max-steps', type=int, default=20000, help="maximum steps to simulate per wave")
+    parser.add_argument('--enemy-store', action='store_true', help="keep enemies in an array-backed store")
+    parser.add_argument('--vectorised-movement', action='store_true',
+                        help="move path-following enemies in a single batched pass")
+    parser.add_argument('--batched-targeting', action='store_true',
+                        help="find the enemies in range of every tower in a single batched pass")
+    parser.add_argument('--weighted-paths', action='store_true',
+                        help="route each set of enemy immunities around the towers that can damage it")
+    parser.add_argument('--diagonal-paths', action='store_true',
+                        help="let enemies move diagonally, without cutting the corners of towers")
+    parser.add_argument('--projectile-system', action='store_true',
+                        help="keep projectiles in arrays & step them in a single batched pass")
+    parser.add_argument('--pooling', action='store_true',
+                        help="reuse expired obstacles & dead enemies from per-class free lists")
+    parser.add_argument('--entrances', type=parse_cells,
+                        help="semicolon separated column,row cells that enemies spawn in, i.e. \"-1,1;-1,4\"")
+    parser.add_argument('--exits', type=parse_cells,
+                        help="semicolon separated column,row cells that enemies escape through")
+    args = parser.parse_args(argv)
+
+    # entrances & exits that can't be connected, or towers that can't be placed between them
+    try:
+        runner = HeadlessRunner(load_layout(args.layout), max_steps=args.max_steps,
+                                enemy_store=args.enemy_store, vectorised_movement=args.vectorised_movement,
+                                batched_targeting=args.batched_targeting, weighted_paths=args.weighted_paths,
+                                diagonal_paths=args.diagonal_paths, entrances=args.entrances, exits=args.exits,
+                                projectile_system=args.projectile_system, pooling=args.pooling)
+    except (KeyError, ValueError) as error:
+        parser.error(f"invalid layout {args.layout}: {error.args[0]}")
+
+    print(f"{'wave':>4} {'steps':>7} {'wall (s)':>9} {'steps/s':>10} "
+          f"{'enemies':>8} {'obstacles':>9} {'killed':>7} {'escaped':>7}")
+
+    total_steps = 0
+    total_time = 0.
+    for report in runner.run(args.waves):
+        total_steps += report.steps
+        total_time += report.wall_time
+
+        print(f"{report.wave:>4} {report.steps:>7} {report.wall_time:>9.3f} {report.steps_per_second():>10.0f} "
+              f"{report.peak_enemies:>8} {report.peak_obstacles:>9} {report.killed:>7} {report.escaped:>7}")
+
+    rate = total_steps / total_time if total_time else 0.
+    print(f"total: {total_steps} steps in {total_time:.3f}s ({rate:.0f} steps/s)")
+
+    stats = runner.get_game().stats
+    print(f"culled: {stats['obstacles_culled_bounds']} out of bounds, "
+          f"{stats['obstacles_culled_lifetime']} past their lifetime")
+
+    pool = runner.get_game().pool
+    if pool is not None:
+        print(f"pool: {pool.hits} hits, {pool.misses} misses, {pool.discarded} discarded, {len(pool)} free")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+"""A simple level, with twenty waves of increasing difficulty"""
+
+from enemy import SimpleEnemy, HardenedEnemy, SuperRichardEnemy
+from level import AbstractLevel
+
+__author__ = "Haoxi Tan"
+
+
+class MyLevel(AbstractLevel):
+    """A simple game level containing examples of how to generate a wave"""
+    waves = 20
+
+    def get_wave(self, wave, game):
+        """Returns enemies in the 'wave_n'th wave
+
+        Parameters:
+            wave_n (int): The nth wave
+            game (TowerGame): the instance of the game
+
+        Return:
+            list[tuple[int, AbstractEnemy]]: A list of (step, enemy) pairs in the
+                                             wave, sorted by step in ascending order 
+        """
+        enemies = []
+
+        if 1 <= wave <= 2:
+            #A hardcoded singleton list of (step, enemy) pairs
+
+            enemies = [ (10, SimpleEnemy()),(12, SimpleEnemy()),(14, SimpleEnemy())]
+
+
+        elif 3 <= wave < 8:
+            #List of (step, enemy) pairs spread across an interval of time (steps)
+
+            steps = int(40 * (wave ** .5))  #The number of steps to spread the enemies across
+            count = wave * 2  #The number of enemies to spread across the (time) steps
+
+            for step in self.generate_intervals(steps, count):
+                #make enemies have more health each wave!
+                enemies.append((step, SimpleEnemy(health=wave/2*100)))
+                #enemies.append((step+20, SwarmEnemy()))
+
+        elif 7 <= wave < 10:
+            #List of (step, enemy) pairs spread across an interval of time (steps)
+
+            steps = int(40 * (wave ** .5))  #The number of steps to spread the enemies across
+            count = wave  #The number of enemies to spread across the (time) steps
+
+            for step in self.generate_intervals(steps, count):
+                enemies.append((step, SimpleEnemy(health=wave/2*100)))
+                enemies.append((step+20, HardenedEnemy(health=wave/2*100)))
+
+        elif wave == 10:
+            #Generate sub waves
+            sub_waves = [
+                #(steps, number of enemies, enemy constructor, args, kwargs)
+                (50, 10, SimpleEnemy, (), {}),  #10 enemies over 50 steps
+                (100, None, None, None, None),  #then nothing for 100 steps
+                (50, 10, SimpleEnemy, (), {}),  #then another 10 enemies over 50 steps
+                (30, 1, lambda game=game: SuperRichardEnemy(game,health=wave/2.5*1500), (), {}),
+            ]
+
+            enemies = self.generate_sub_waves(sub_waves)
+
+        else:  #11 <= wave <= 20
+            #Now it's going to get hectic
+
+            sub_waves = [
+                (
+                    int(13 * wave),  #total steps
+                    int(25 * wave ** (wave / 50)),  #number of enemies
+                    SimpleEnemy,  #enemy constructor
+                    (),  #positional arguments to provide to enemy constructor
+                    {},  #keyword arguments to provide to enemy constructor
+                ),
+                (
+                    int(13 * wave),  #total steps
+                    int(25 * wave ** (wave / 50)),  #number of enemies
+                    HardenedEnemy,  #enemy constructor
+                    (),  #positional arguments to provide to enemy constructor
+                    {},  #keyword arguments to provide to enemy constructor
+                ),
+                (
+                    int(2 * wave),  #total steps
+                    int(wave/8 + 1),  #number of enemies
+                    lambda game=game: SuperRichardEnemy(game),  #enemy constructor
+                    (),  #positional arguments to provide to enemy constructor
+                    {},  #keyword arguments to provide to enemy constructor
+                ),
+
+            ]
+            enemies = self.generate_sub_waves(sub_waves)
+
+        return enemies
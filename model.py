@@ -2,15 +2,25 @@
 High-level modelling classes for tower defence game
 """
 
-from typing import Tuple, List
-
-from core import UnitManager, GameData
+import itertools
+import time
+from collections import Counter
+from typing import Tuple
+
+from core import UnitManager, GameData, ProgressIndex
+from enemy_store import EnemyStore
+from projectiles import ProjectileSystem
+from flow_field import FlowField
+from targeting import TargetingPass
 from modules.ee import EventEmitter
-from modules.matrix import get_adjacent_cells
+from modules.matrix import get_adjacent_cells, RADIAL_DELTAS
 
 from tower import AbstractTower
 from enemy import AbstractEnemy
-from path import Path
+from path import DiagonalPath, IncrementalPath
+from path_cache import NO_PATH, PathCache, PathPrefetcher, ZobristHash
+from pool import ObjectPool
+from routing import Routes
 
 __author__ = "Benjamin Martin and Brae Webb"
 __copyright__ = "Copyright 2018, The University of Queensland"
@@ -123,24 +133,107 @@ class TowerGame(EventEmitter):
     """Model for a game of tower defence"""
     _current_step = -1
 
-    def __init__(self, size=GRID_SIZE, cell_size=CELL_SIZE):
-        """Construct a new tower defence game"""
+    # Units are only updated on every nth step, leaving the steps between for rendering
+    update_interval = 2
+
+    # Obstacles are culled once they are more than this many cells outside of the grid
+    cull_margin = 1
+
+    def __init__(self, size=GRID_SIZE, cell_size=CELL_SIZE, enemy_store=False, vectorised_movement=False,
+                 batched_targeting=False, prefetch_paths=False, weighted_paths=False, diagonal_paths=False,
+                 entrances=None, exits=None, projectile_system=False, pooling=False):
+        """Construct a new tower defence game
+
+        Parameters:
+            size (tuple<int, int>): The (column, row) size of the grid
+            cell_size (int): The size of each cell, in pixels
+            enemy_store (bool): If True, spawned enemies are kept in an array-backed
+                                EnemyStore (requires numpy)
+            vectorised_movement (bool): If True, path-following enemies are moved in a
+                                        single batched pass over a FlowField
+                                        (implies enemy_store)
+            batched_targeting (bool): If True, the enemies in range of every tower are
+                                      found in a single vectorised pass before towers
+                                      are stepped (requires numpy)
+            prefetch_paths (bool): If True, paths for placing a tower in the cells around the
+                                   one being previewed are built on a background thread
+                                   (see attempt_placement)
+            weighted_paths (bool): If True, enemies route around the towers that can damage
+                                   them, with a path shared by each set of immunities
+                                   (see routing.Routes)
+            diagonal_paths (bool): If True, enemies may also move diagonally, without
+                                   cutting the corners of towers (see path.DiagonalPath);
+                                   not supported with vectorised_movement or weighted_paths
+            entrances (list<tuple<int, int>>): The cells (usually just outside of the grid)
+                                               that enemies spawn in, taken in turn,
+                                               defaulting to [(-1, 1)]
+            exits (list<tuple<int, int>>): The cells (usually just outside of the grid)
+                                           that enemies head toward the nearest of,
+                                           defaulting to [(columns, 1)]
+            projectile_system (bool): If True, missiles, bullets & pulses are kept
+                                      in an array-backed ProjectileSystem & stepped in a
+                                      single vectorised pass (implies enemy_store)
+            pooling (bool): If True, expired obstacles & dead enemies are released to an
+                            ObjectPool, to be reinitialised & reused by towers & enemies
+                            that create more (see pool.ObjectPool)
+
+        Raises:
+            ValueError if diagonal_paths is combined with an unsupported option
+        """
+        if diagonal_paths and (vectorised_movement or weighted_paths):
+            raise ValueError("Diagonal paths can't be used with vectorised movement or weighted paths")
+
         super().__init__()
 
         self.grid = GridCoordinateTranslator(cells=size, cell_size=cell_size)
 
         self.towers = {}
+        # the number of towers targeting by progress (see AbstractTower.requires_progress)
+        self._progress_towers = 0
 
-        # assign the start and end point of the enemies
-        self._start, self._end = (-1, 1), (self.grid.cells[0], 1)
+        # assign the start and end points of the enemies, which share a single path
+        self._entrances = list(entrances) if entrances else [(-1, 1)]
+        self._exits = list(exits) if exits else [(self.grid.cells[0], 1)]
+        self._endpoints = set(self._entrances + self._exits)
+        self._next_entrance = itertools.cycle(self._entrances)
 
-        # recalculate the path for enemies to travel avoiding current towers
-        self.path = self.generate_path()
+        # the path for enemies to travel, repaired as towers are placed & removed
+        self._path_class = DiagonalPath if diagonal_paths else IncrementalPath
+        self.path = self._create_path()
+
+        # paths generated for (hypothetical) tower sets, keyed by the towers' fingerprint
+        self._tower_hash = ZobristHash()
+        self.path_cache = PathCache()
+
+        # unchanging copy of the current path, which generated paths are repaired from
+        self._path_snapshot = None
+
+        self._prefetcher = PathPrefetcher(self.path_cache) if prefetch_paths else None
+        # (path version, cell) of the cell that paths were last prefetched around
+        self._prefetched_around = None
 
         self.obstacles = []
 
         self.enemies = []
         self._unspawned_enemies = []
+        self._enemy_store = EnemyStore() if enemy_store or vectorised_movement or projectile_system else None
+
+        self._projectiles = ProjectileSystem() if projectile_system else None
+
+        # free lists of expired obstacles & dead enemies, to reuse rather than construct
+        self.pool = ObjectPool() if pooling else None
+
+        # compiled lazily from the current path, when moving enemies in bulk
+        self._vectorised_movement = vectorised_movement
+        self._flow_field = None
+
+        self._targeting = TargetingPass() if batched_targeting else None
+
+        self._routes = Routes(self._entrances, self._exits, self._get_grid_neighbours, self.towers,
+                              self.grid) if weighted_paths else None
+
+        # Simulation counters, i.e. steps performed, enemies spawned/killed/escaped & obstacles culled
+        self.stats = Counter()
 
         # Game data to be passed to units when stepped
         # It's poor form to pass entire game model, so distinct object is
@@ -151,6 +244,10 @@ class TowerGame(EventEmitter):
         self._data.towers = self.towers
         self._data.path = self.path
         self._data.grid = self.grid
+        self._data.enemy_store = self._enemy_store
+        self._data.progress = ProgressIndex()
+        self._data.routes = self._routes
+        self._data.pool = self.pool
 
     def is_wave_over(self):
         """(bool) Returns True iff there is no wave in progress"""
@@ -160,35 +257,111 @@ class TowerGame(EventEmitter):
         """
         Determine if a valid path can be made with extra towers added.
 
+        Paths are cached (see path_cache), so repeatedly generating a path for the same
+        towers is cheap; the returned path must not be modified.
+
         Parameters:
             extra_towers (set<tuple<int, int>>): Set of extra tower positions to add
 
+        Raises:
+            KeyError if no path can be made with towers in the extra positions
+
         Returns:
-            (bool) True iff a path can be made with towers in the extra positions
+            (Path) The path avoiding every tower, including those in the extra positions
         """
-        # gather all the current tower positions and include new towers
-        towers = set(self.towers.keys())
-        towers.update(extra_towers)
-
-        def get_neighbours(cell, from_=True):  # pylint: disable=unused-argument
-            """Yields all the positions neighbouring cell
-
-            Parameters:
-                cell (tuple<int, int>): The cell to check for neighbours
-                from_ (bool): If true, searches from cell to neighbour, else from neighbour to cell
-                              *not used in this implementation*
-            """
-            for node in get_adjacent_cells(cell):
-                if (self.grid.is_cell_valid(node) and node not in towers) \
-                        or node == self._start or node == self._end:
-                    yield node
-
-        # create a path from start to end avoiding towers
-        path = Path(self._start, self._end, get_neighbours)
-        self._start, self._end = path.start, path.end
+        extra_towers = self._get_extra_towers(extra_towers)
+        key = self._get_path_key(extra_towers)
+
+        path = self.path_cache.get(key)
+        if path is None:
+            try:
+                path = self._get_path_builder(extra_towers)()
+            except KeyError:
+                path = NO_PATH
+
+            self.path_cache.put(key, path)
+
+        if path is NO_PATH:
+            raise KeyError("Cannot reach end from start")
 
         return path
 
+    def _get_extra_towers(self, cells):
+        """(set<tuple<int, int>>) Returns the cells that would add a tower, i.e. those that
+        are within the grid & aren't already towers"""
+        return {cell for cell in cells if cell not in self.towers and self.grid.is_cell_valid(cell)}
+
+    def _get_path_key(self, extra_towers):
+        """Returns the path cache key for the current towers plus 'extra_towers'"""
+        # only towers that aren't already placed change the fingerprint; the start & end
+        # never change, & repaired paths match those generated from scratch, so the same
+        # towers always have the same path, however they were placed
+        return self._tower_hash.get_value_with(extra_towers)
+
+    def _get_path_builder(self, extra_towers):
+        """Returns a function that builds the path avoiding the current towers plus
+        'extra_towers', which is unaffected by towers changing afterwards
+
+        The path is a copy of the current path, repaired around 'extra_towers' just as
+        place repairs the current path, so it is always the path enemies would follow.
+        """
+        # builders share a snapshot per version, & copy it themselves (i.e. on the
+        # prefetcher's thread), as the current path is changed in place
+        if self._path_snapshot is None or self._path_snapshot.version != self.path.version:
+            self._path_snapshot = self.path.copy()
+        snapshot = self._path_snapshot
+
+        def build():
+            path = snapshot.copy()
+            for cell in extra_towers:
+                path.block(cell)
+            return path
+
+        return build
+
+    def _prefetch_paths_around(self, cell):
+        """Requests paths for placing a tower in 'cell' & each of its neighbours in the background"""
+        if self._prefetched_around == (self.path.version, cell):
+            return
+        self._prefetched_around = self.path.version, cell
+
+        for candidate in itertools.chain((cell,), get_adjacent_cells(cell, deltas=RADIAL_DELTAS)):
+            # cells the best path doesn't depend on preview the current path, so need nothing built
+            if self.grid.is_cell_valid(candidate) and candidate not in self.towers \
+                    and self.path.depends_on(candidate):
+                extra_towers = {candidate}
+                self._prefetcher.request(self._get_path_key(extra_towers), self._get_path_builder(extra_towers))
+
+    def _towers_changed(self):
+        """Cancels work that depends on the previous set of towers"""
+        if self._prefetcher is not None:
+            self._prefetcher.cancel()
+
+        if self._routes is not None:
+            self._routes.clear()
+
+    def close(self):
+        """Stops any background work, i.e. path prefetching"""
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+
+    def _get_grid_neighbours(self, cell, from_=True):  # pylint: disable=unused-argument
+        """Yields all the positions neighbouring cell, ignoring towers
+
+        Parameters:
+            cell (tuple<int, int>): The cell to check for neighbours
+            from_ (bool): If true, searches from cell to neighbour, else from neighbour to cell
+                          *not used in this implementation*
+        """
+        for node in get_adjacent_cells(cell, deltas=self._path_class.DELTAS):
+            if self.grid.is_cell_valid(node) or node in self._endpoints:
+                yield node
+
+    def _create_path(self):
+        """(IncrementalPath) Returns a new path from start to end avoiding current towers"""
+        return self._path_class(self._entrances, self._exits, self._get_grid_neighbours, blocked=self.towers)
+
     def get_current_step(self):
         '''(int) returns the current step'''
         return self._current_step
@@ -209,7 +382,12 @@ class TowerGame(EventEmitter):
             raise KeyError(f"No tower exists at {cell}")
 
         tower = self.towers.pop(cell)
-        self._data.path = self.path = self.generate_path()
+        if tower.requires_progress():
+            self._progress_towers -= 1
+        tower.invalidate_coverage()
+        self.path.unblock(cell)
+        self._tower_hash.toggle(cell)
+        self._towers_changed()
 
         return tower
 
@@ -240,64 +418,126 @@ class TowerGame(EventEmitter):
         tower = tower_type(self.grid.cell_size)
         tower.position = self.grid.cell_to_pixel_centre(cell)
 
-        # check a path can still be made
+        # enemies in the cell will need to be moved out of the tower's way
+        problems = self._get_enemies_in_cell(cell)
+        sources = set(self.path.get_sources(cell)) if problems else None
+
+        # repair the path around the tower, if a path can still be made
         try:
-            self.generate_path(cell)
+            self.path.block(cell)
         except KeyError:
             return False
 
         self.towers[cell] = tower
-        old_path = self.path
-        self._data.path = self.path = self.generate_path()
+        if tower.requires_progress():
+            self._progress_towers += 1
+        self._tower_hash.toggle(cell)
+        self._towers_changed()
+        tower.compute_coverage(self._data.enemies)
 
-        self._resolve_problems_after_placement(cell, old_path)
+        if problems:
+            self._resolve_problems_after_placement(cell, problems, sources)
 
         return True
 
-    def _resolve_problems_after_placement(self, cell, old_path):
+    def _get_enemies_in_cell(self, cell):
+        """(list<AbstractEnemy>) Returns the enemies within 'cell'"""
+        return [enemy for enemy in self.enemies if self.grid.pixel_to_cell(enemy.position) == cell]
+
+    def _resolve_problems_after_placement(self, cell, problems, sources):
         """Handles any problematic enemies after a tower is placed.
         Problems are handled by moving them to the closest free cell,
         with a preference for their previous cell.
 
         Parameters:
             cell (tuple<int, int>): The cell in which a tower was placed
-            old_path (Path): The previous path, before the tower was placed        
+            problems (list<AbstractEnemy>): The enemies in 'cell'
+            sources (set<tuple<int, int>>): The cells that flowed into 'cell' on the
+                                            previous path, before the tower was placed
         """
-        # find enemies in this cell
-        problems: List[AbstractEnemy] = []
-        for enemy in self.enemies:
-            enemy_cell = self.grid.pixel_to_cell(enemy.position)
-            if cell == enemy_cell:
-                problems.append(enemy)
-
-        if len(problems):
-            sources = set(old_path.get_sources(cell))
-            for path_cell, _ in self.path.get_best_path():
-                if path_cell in sources:
-                    source = path_cell
-                    break
-            else:
-                source = next(iter(sources))
+        best_paths = (self.path.get_best_path(start) for start in self.path.starts)
+        for path_cell, _ in itertools.chain.from_iterable(best_paths):
+            if path_cell in sources:
+                source = path_cell
+                break
+        else:
+            source = next(iter(sources))
 
-            delta = tuple(b - a for a, b in zip(source, cell))
+        delta = tuple(b - a for a, b in zip(source, cell))
 
-            # move problem enemies back
-            for enemy in problems:
-                relative_cell = tuple(c + 10 / 12 * d / 2 for c, d in zip(source, delta))
-                position = self.grid.cell_to_pixel_centre(relative_cell)
-                enemy.position = position
+        # move problem enemies back
+        for enemy in problems:
+            relative_cell = tuple(c + 10 / 12 * d / 2 for c, d in zip(source, delta))
+            position = self.grid.cell_to_pixel_centre(relative_cell)
+            enemy.position = position
 
     def _step_obstacles(self):
-        """Performs a single time step for all obstacles"""
-        remaining_obstacles = []
-        for obstacle in self.obstacles:
-            persist, new_obstacles = obstacle.step(self._data)
+        """Performs a single time step for all obstacles, removing expired obstacles in place"""
+        expired = self._cull_obstacles()
+
+        # stored projectiles are stepped together, up front
+        if self._projectiles is not None and len(self._projectiles):
+            expired.update(self._projectiles.step(self._enemy_store, self._data.enemies))
+
+        obstacles = self.obstacles
+        added_obstacles = []
+        kept = 0
+
+        for obstacle in obstacles:
+            if obstacle in expired:
+                persist = False
+            elif obstacle.store is None:
+                persist, new_obstacles = obstacle.step(self._data)
+                if new_obstacles:
+                    added_obstacles.extend(new_obstacles)
+            else:
+                persist = True
+
+            # shift persisting obstacles down over expired ones, which are never ahead of them
             if persist:
-                remaining_obstacles.append(obstacle)
-            if new_obstacles:
-                remaining_obstacles.extend(new_obstacles)
+                obstacles[kept] = obstacle
+                kept += 1
+                continue
+
+            self._data.obstacles.remove_unit(obstacle)
+            if self.pool is not None:
+                self.pool.release(obstacle)
 
-        self.obstacles = remaining_obstacles
+        del obstacles[kept:]
+        obstacles.extend(added_obstacles)
+
+    def _cull_obstacles(self):
+        """Ages every obstacle, returning those to retire without stepping
+
+        Obstacles are culled once they are outside of the grid (by more than cull_margin
+        cells), such as bullets that missed their target, or older than their class'
+        max_lifetime. Culled obstacles are removed from the ProjectileSystem, if any.
+
+        Return:
+            set<AbstractObstacle>: The culled obstacles
+        """
+        width, height = self.grid.pixels
+        margin = self.cull_margin * self.grid.cell_size
+
+        culled = set()
+        for obstacle in self.obstacles:
+            obstacle.age += 1
+
+            x, y = obstacle.position
+            if not (-margin <= x <= width + margin and -margin <= y <= height + margin):
+                self.stats['obstacles_culled_bounds'] += 1
+            elif obstacle.max_lifetime is not None and obstacle.age > obstacle.max_lifetime:
+                self.stats['obstacles_culled_lifetime'] += 1
+            else:
+                continue
+
+            culled.add(obstacle)
+
+        stored = [obstacle for obstacle in culled if obstacle.store is not None]
+        if stored:
+            self._projectiles.remove_all(stored)
+
+        return culled
 
     def _step_enemies(self):
         """Performs a single time step for all enemies"""
@@ -305,36 +545,148 @@ class TowerGame(EventEmitter):
         dead_enemies = []
         escaped_enemies = []
 
-        for _, enemy in enumerate(self.enemies):
+        in_bounds = self._move_enemies_in_bulk() if self._vectorised_movement else None
+
+        for i, enemy in enumerate(self.enemies):
             # remove dead enemies
             if enemy.is_dead():
                 dead_enemies.append(enemy)
                 continue
 
             # keep enemies who are still in bounds
-            if enemy.step(self._data):
+            if in_bounds is None:
+                persist = enemy.step(self._data)
+            else:
+                persist = in_bounds[i]
+
+            if persist:
                 remaining_enemies.append(enemy)
             else:
                 escaped_enemies.append(enemy)
 
+        for enemy in dead_enemies + escaped_enemies:
+            self._data.enemies.remove_unit(enemy)
+            self._data.progress.remove(enemy)
+
+            if self._enemy_store is not None:
+                self._enemy_store.remove(enemy)
+
+        self.stats['enemies_killed'] += len(dead_enemies)
+        self.stats['enemies_escaped'] += len(escaped_enemies)
+
         # emit enemy events
         if len(escaped_enemies) > 0:
             self.emit("enemy_escape", escaped_enemies)
         self.emit("enemy_death", dead_enemies)
 
+        # escaped enemies may still be chased by projectiles, so only the dead are reused
+        if self.pool is not None:
+            released = {enemy for enemy in dead_enemies if self.pool.release(enemy)}
+
+            # piercing obstacles skip the enemies they've already hit, which reused enemies aren't
+            if released:
+                for obstacle in self.obstacles:
+                    obstacle.forget(released)
+
         self.enemies = remaining_enemies
         if len(remaining_enemies) == 0 and len(self._unspawned_enemies) == 0:
             self.emit("cleared")
 
+    def _get_flow_field(self):
+        """(FlowField) Returns the flow field for the current path, compiling it if the path changed"""
+        if self._flow_field is None or self._flow_field.version != self.path.version:
+            self._flow_field = FlowField(self.path, self.grid)
+
+        return self._flow_field
+
+    def _move_enemies_in_bulk(self):
+        """Acts & moves all living enemies, moving path-followers in a single batched pass
+
+        Return:
+            list<bool|None>: For each enemy, True iff it is still in bounds after moving
+                             (None for dead enemies, which neither act nor move)
+        """
+        in_bounds = [None] * len(self.enemies)
+
+        # (indices, rows) of the enemies following each flow field, keyed by their
+        # immunities when routed separately
+        groups = {}
+
+        for i, enemy in enumerate(self.enemies):
+            if enemy.is_dead():
+                continue
+
+            enemy.act(self._data)
+
+            # enemies with their own movement can't be moved in bulk
+            if type(enemy).move is AbstractEnemy.move:
+                key = None if self._routes is None else enemy.immunities
+                indices, rows = groups.setdefault(key, ([], []))
+                indices.append(i)
+                rows.append(enemy.row)
+            else:
+                in_bounds[i] = enemy.move(self._data)
+
+        for key, (indices, rows) in groups.items():
+            flow_field = self._get_flow_field() if key is None else self._routes.get_flow_field(key)
+
+            moved = flow_field.advance(self._enemy_store, rows)
+            for i, persist in zip(indices, moved.tolist()):
+                in_bounds[i] = persist
+
+        return in_bounds
+
+    def _update_progress(self):
+        """Updates the remaining path distance of every enemy, so towers can target by progress
+
+        Progress is only tracked while some tower targets by it, as nothing else uses it
+        """
+        progress = self._data.progress
+
+        if not self._progress_towers:
+            if len(progress):
+                progress.clear()
+            return
+
+        cell_size = self.grid.cell_size
+
+        for enemy in self.enemies:
+            # inlined GridCoordinateTranslator.pixel_to_cell & pixel_to_cell_offset
+            x, y = enemy.position
+            column, row = int(x // cell_size), int(y // cell_size)
+
+            # enemies routed by their immunities measure progress along their own route
+            path = self.path if self._routes is None else self._routes.get_path(enemy.immunities)
+            remaining = path.get_remaining_distance((column, row),
+                                                    (x / cell_size - column - .5, y / cell_size - row - .5))
+
+            if remaining is None:
+                progress.remove(enemy)
+            else:
+                progress.update(enemy, remaining)
+
     def _step_towers(self):
         """Performs a single time step for all towers"""
+        towers = self.towers.values()
+
+        # enemies don't move while towers step, so targets can be found up front
+        if self._targeting is not None:
+            self._targeting.assign(towers, self._data.enemies)
+
         # process tower abilities (attacks, etc.)
-        for tower in self.towers.values():
+        for tower in towers:
             obstacles = tower.step(self._data)
 
             if obstacles:
                 self.obstacles.extend(obstacles)
 
+                if self._projectiles is not None:
+                    for obstacle in obstacles:
+                        self._projectiles.add(obstacle)
+
+        if self._targeting is not None:
+            self._targeting.clear(towers)
+
     def _spawn_enemies(self):
         """Spawn all the enemies to be spawned in the current time-step"""
         while len(self._unspawned_enemies):
@@ -347,9 +699,12 @@ class TowerGame(EventEmitter):
 
             self._unspawned_enemies.pop()
 
-            # move enemy to spawn
-            enemy.position = self.grid.cell_to_pixel_centre(self.path.start)
+            # move enemy to spawn, at each entrance in turn
+            enemy.position = self.grid.cell_to_pixel_centre(next(self._next_entrance))
             self.enemies.append(enemy)
+            if self._enemy_store is not None:
+                self._enemy_store.add(enemy)
+            self.stats['enemies_spawned'] += 1
 
     def step(self):
         """Performs a single time step of the game
@@ -358,22 +713,23 @@ class TowerGame(EventEmitter):
             (bool): True if the game is still running
         """
         self._current_step += 1
+        self.stats['steps'] += 1
 
-        if self._current_step % 2 == 0:
-            self._data.enemies.clear()
-            self._data.obstacles.clear()
+        if self._current_step % self.update_interval == 0:
+            self.stats['updates'] += 1
 
+            # units only change buckets when they cross a bucket boundary
             for enemy in self.enemies:
-                if self.grid.is_pixel_valid(enemy.position):
-                    self._data.enemies.add_unit(enemy)
-            
+                self._data.enemies.update_unit(enemy)
+
             for obstacle in self.obstacles:
-                if self.grid.is_pixel_valid(obstacle.position):
-                    self._data.obstacles.add_unit(obstacle)
+                if obstacle.store is None:
+                    self._data.obstacles.update_unit(obstacle)
 
             # perform all step actions
             self._step_obstacles()
             self._step_enemies()
+            self._update_progress()
             self._step_towers()
             self._spawn_enemies()
 
@@ -381,14 +737,48 @@ class TowerGame(EventEmitter):
 
         return len(self._unspawned_enemies) or len(self.enemies)
 
+    def advance(self, ticks=None, deadline=None, until=None):
+        """Performs multiple time steps of the game, i.e. to fast-forward
+
+        Parameters:
+            ticks (int): The number of steps to perform, or None to keep stepping
+                         until 'deadline'
+            deadline (float): A time.perf_counter() value, after which no more steps
+                              are started
+            until (callable): Stepping stops early once this returns True, i.e. on game over
+
+        Returns:
+            (int): The number of steps performed
+        """
+        if ticks is None and deadline is None:
+            raise ValueError("Either ticks or deadline must be given")
+
+        performed = 0
+        while ticks is None or performed < ticks:
+            if deadline is not None and time.perf_counter() >= deadline:
+                break
+
+            self.step()
+            performed += 1
+
+            if until is not None and until():
+                break
+
+        return performed
+
     def reset(self):
         """Resets the game"""
         self.towers.clear()
-        self.enemies = []
+        self._progress_towers = 0
+        self._tower_hash.clear()
+        self._towers_changed()
+        self._clear_enemies()
+        if self._projectiles is not None:
+            self._projectiles.clear()
         self.obstacles = []
         self._unspawned_enemies = []
-        self._data.path = self.path = self.generate_path()
-        self._data.enemies.clear()
+        self._next_entrance = itertools.cycle(self._entrances)
+        self._data.path = self.path = self._create_path()
         self._data.obstacles.clear()
 
     def queue_wave(self, wave, clear=False):
@@ -411,10 +801,48 @@ class TowerGame(EventEmitter):
         self._unspawned_enemies = sorted(wave, key=lambda x: x[0], reverse=True)
 
         if clear:
-            self.enemies = []
+            self._clear_enemies()
+
+    def _clear_enemies(self):
+        """Removes all spawned enemies from the game"""
+        if self._enemy_store is not None:
+            self._enemy_store.clear()
+        self._data.enemies.clear()
+        self._data.progress.clear()
+        self.enemies = []
 
-    def attempt_placement(self, position):
+    def is_cell_placeable(self, cell):
+        """(bool) Returns True iff placing a tower at 'cell' would leave a path from start to end
+
+        Served from the path's separating cells, which are only recomputed once the
+        towers have changed.
+
+        Parameters:
+            cell (tuple<int, int>): The grid position to check
+        """
+        if not self.grid.is_cell_valid(cell) or cell in self.towers:
+            return False
+
+        # every separating cell is on the best path, so other cells needn't check
+        return not self.path.is_on_best_path(cell) or cell not in self.path.get_separating_cells()
+
+    def is_preview_pending(self, position):
+        """(bool) Returns True iff the path for placing a tower at 'position' is still being
+        built in the background"""
+        if self._prefetcher is None:
+            return False
+
+        extra_towers = {self.grid.pixel_to_cell(position)}
+        return self._prefetcher.is_pending(self._get_path_key(extra_towers))
+
+    def attempt_placement(self, position, wait=True):
         """Checks legality of potentially placing a tower at 'position'
+
+        Parameters:
+            position (tuple<int, int>): The pixel position to place a tower at
+            wait (bool): If False & paths are being prefetched (see prefetch_paths), the
+                         current path is returned rather than waiting for the new path to
+                         be built (see is_preview_pending)
         
         Return:
             tuple<bool, Path>: (legal, path) pair, where:
@@ -425,15 +853,28 @@ class TowerGame(EventEmitter):
         # convert mouse position to grid coordinates
         grid_position = self.grid.pixel_to_cell(position)
 
-        # make a path and determine whether it is possible
-        try:
-            path = self.generate_path(grid_position)
-            legal = True
-        except KeyError:
-            path = self.path
-            legal = False
+        if not self.grid.is_cell_valid(grid_position) or grid_position in self.towers:
+            return False, self.path
+
+        if self._prefetcher is not None:
+            self._prefetch_paths_around(grid_position)
 
-        if grid_position in self.towers:
-            legal = False
+        # only blocking a cell the best path depends on can change it, or disconnect the start from the end
+        if not self.path.depends_on(grid_position):
+            return True, self.path
+
+        # legality comes from the separating cells, so illegal cells need no path built
+        if not self.is_cell_placeable(grid_position):
+            return False, self.path
+
+        if not wait and self._prefetcher is not None:
+            path = self.path_cache.get(self._get_path_key({grid_position}))
+
+            # still being built, so preview the current path until it is ready
+            if path is None:
+                return True, self.path
+        else:
+            # hovering back & forth over the same cells is served from the path cache
+            path = self.generate_path(grid_position)
 
-        return legal, path
+        return True, path
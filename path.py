@@ -17,64 +17,109 @@ Path-finding logic for navigating a grid with obstacles
 #              \\ "
 #               '=='
 
-from queue import Queue
+import heapq
+import math
+from array import array
+from collections import deque
+from collections.abc import Mapping
+from itertools import count
+
+from modules.matrix import AXIAL_DELTAS, RADIAL_DELTAS
 
 __author__ = "Benjamin Martin and Brae Webb"
 __copyright__ = "Copyright 2018, The University of Queensland"
 __license__ = "MIT"
 __version__ = "1.1.0"
 
+# Shared by every path, so that no two generated paths ever have the same version
+_versions = count()
+
+# Distance travelled, in cells, by moving between the centres of adjacent cells, by delta
+STEP_LENGTHS = {delta: math.hypot(*delta) for delta in RADIAL_DELTAS}
+
 
 class Path:
     """A path from a start point to an end point.
 
-    Used to generate shortest routes between two points.
+    Used to generate shortest routes between two points. There may be several start
+    &/or end points, in which case every start point is routed to its nearest end point
+    by a single search outward from all of the end points.
 
     Attributes:
-        start (tuple<int, int>): The starting point
-        end (tuple<int, int>): The ending point
+        start (tuple<int, int>): The (first) starting point
+        end (tuple<int, int>): The (first) ending point
+        starts (tuple<tuple<int, int>, ...>): Every starting point
+        ends (tuple<tuple<int, int>, ...>): Every ending point
         deltas (dict<tuple<int, int>: tuple<int, int>>): A map of the
                                                                   best path to follow
+        distances (dict<tuple<int, int>: int>): A map of positions to their distance
+                                                from the end point
+        version (int): Changes whenever the deltas are (re)generated, so caches derived
+                       from a path can tell when it has changed
     """
+    # The deltas toward the neighbouring cells that a path can move to
+    DELTAS = AXIAL_DELTAS
 
     def __init__(self, start, end, get_neighbours):
         """Initialize a path from a starting point to a finishing point
 
         Parameters:
-            start (tuple<int, int>): The starting position
-            end (tuple<int, int>): The end position
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
             get_neighbours (func<tuple<int, int>>): A function which takes a
                                                     position and returns the
                                                     neighbours
         """
-        self.start = start
-        self.end = end
+        self._set_ends(start, end)
         self.get_neighbours = get_neighbours
 
         self._generate()
 
+    def _set_ends(self, start, end):
+        """Sets the start & end points, each of which is either a single position or a
+        list of positions"""
+        self.starts = tuple(start) if isinstance(start, list) else (start,)
+        self.ends = tuple(end) if isinstance(end, list) else (end,)
+        self.start, self.end = self.starts[0], self.ends[0]
+
     def _generate_distance_map(self):
         """Generate a mapping of positions to their distance from the end point
 
         Returns:
             dict<tuple<int, int>: int>: the position distance mapping
         """
-        boundary = Queue()
-        boundary.put(self.end)
+        boundary = deque(self.ends)
 
-        distances = {self.end: 0}
+        distances = dict.fromkeys(self.ends, 0)
 
         # Generate distance map
-        while not boundary.empty():
-            to = boundary.get()
+        while boundary:
+            to = boundary.popleft()
 
             for from_ in self.get_neighbours(to, from_=False):
                 if from_ not in distances:
-                    boundary.put(from_)
+                    boundary.append(from_)
                     distances[from_] = distances[to] + 1
 
         return distances
 
+    def _get_best_neighbour_deltas(self, from_, distances):
+        """Calculate the deltas from a position toward its neighbours nearest the end point
+
+        Parameters:
+            from_ (tuple<int, int>): The position to calculate deltas from
+            distances (dict<tuple<int, int>: int>): A map of positions to
+                                                    distances from end point
+
+        Returns:
+            set<tuple<int, int>>: The deltas toward every equally nearest neighbour
+        """
+        neighbours = [(distances[to], to) for to in self.get_neighbours(from_, from_=True)]
+        best_distance = min(distance for distance, _ in neighbours)
+
+        return {tuple(a - b for a, b in zip(neighbour, from_))
+                for distance, neighbour in neighbours if distance == best_distance}
+
     def _generate_best_neighbours(self, distances):
         """Calculate the best route based on a distance mapping
 
@@ -86,51 +131,136 @@ class Path:
             dict<tuple<int, int>: tuple<int, int>>: A map of the best path to follow
         """
         best_neighbours = {}
+        ends = set(self.ends)
 
         # Calculate best neighbours
         for from_ in distances:
-            neighbours_by_distance = []
-            for to in self.get_neighbours(from_, from_=True):
-                neighbours_by_distance.append((distances[to], to))
+            if from_ not in ends:
+                best_neighbours[from_] = self._get_best_neighbour_deltas(from_, distances)
 
-            neighbours_by_distance.sort(key=lambda x: x[0])
+        return best_neighbours
 
-            best_distance = neighbours_by_distance[0][0]
-            best_deltas = set()
-            for distance, neighbour in neighbours_by_distance:
-                if distance == best_distance:
-                    delta = tuple(a - b for a, b in zip(neighbour, from_))
-                    best_deltas.add(delta)
+    def _override_best_path(self):
+        """Overwrites the deltas along the best path from each start point with the single
+        delta that is followed
 
-            best_neighbours[from_] = best_deltas
+        Return:
+            set<tuple<int, int>>: The positions whose deltas were overwritten
+        """
+        overridden = set()
 
-        del best_neighbours[self.end]
+        for best, delta in self._get_best_paths(overridden):
+            self._set_deltas(best, {delta})
 
-        return best_neighbours
+        # for cell in self.deltas:
+        #     self.deltas[cell] = {self.deltas[cell].pop()}
+
+        for end, delta in list(self._get_exit_deltas()):
+            self._set_deltas(end, {delta})
+            overridden.add(end)
+
+        return overridden
+
+    def _get_best_paths(self, visited):
+        """Yields (position, delta) pairs on the best path from each start point, with the
+        delta followed out of each end point reached
+
+        Best paths that merge are only followed until they join a path already yielded,
+        so each position is visited once, regardless of the number of start points.
+
+        Parameters:
+            visited (set<tuple<int, int>>): The positions already yielded, updated in place
+        """
+        for start in self.starts:
+            best_path = []
+            for best, delta in self.get_best_path(start):
+                if best in visited:
+                    break
+                best_path.append((best, delta))
+            else:
+                best_path[-1] = best_path[-1][0], best_path[-2][1]
+
+            visited.update(best for best, _ in best_path)
+            yield from best_path
+
+    def _get_exit_deltas(self):
+        """Yields (end, delta) pairs for each end point that no best path leads to, so that
+        units reaching it continue in the direction they entered it from"""
+        for end in self.ends:
+            if end in self.deltas:
+                continue
+
+            # the least source is taken, rather than the first, so that a repaired path
+            # matches one generated from scratch for the same blocked positions
+            source = min(self.get_sources(end), default=None)
+            if source is not None:
+                yield end, tuple(a - b for a, b in zip(end, source))
 
     def _generate(self):
         """Calculate the best path to travel through the path"""
-        distances = self._generate_distance_map()
+        self.distances = distances = self._generate_distance_map()
 
-        # ensure the start point can be reached from the end point
-        if self.start not in distances:
+        # ensure every start point can reach an end point
+        if any(start not in distances for start in self.starts):
             raise KeyError("Cannot reach end from start")
 
         self.deltas = self._generate_best_neighbours(distances)
+        self._index_sources()
 
         # overwrite bests on path
-        best_path = list(self.get_best_path())
+        self._override_best_path()
 
-        best_path[-1] = best_path[-1][0], best_path[-2][1]
+        self.version = next(_versions)
 
-        # for cell in self.deltas:
-        #     self.deltas[cell] = {self.deltas[cell].pop()}
+    def _index_sources(self):
+        """Builds the predecessor index, mapping each cell to the cells that flow into it"""
+        self._sources = {}
+
+        for source, deltas in self.deltas.items():
+            self._link_sources(source, deltas, True)
+
+    def _link_sources(self, source, deltas, add):
+        """Adds (or removes) 'source' to the predecessor index of each cell that 'deltas' lead to
+
+        Parameters:
+            source (tuple<int, int>): The cell being flowed from
+            deltas (set<tuple<int, int>>): The deltas from 'source'
+            add (bool): If True, adds 'source' to the index, else removes it
+        """
+        for delta in deltas:
+            destination = tuple(a + b for a, b in zip(source, delta))
+
+            if add:
+                self._sources.setdefault(destination, set()).add(source)
+            else:
+                sources = self._sources[destination]
+                sources.discard(source)
+                if not sources:
+                    del self._sources[destination]
+
+    def _set_deltas(self, cell, deltas):
+        """Sets the deltas of 'cell', keeping the predecessor index up to date
+
+        Parameters:
+            cell (tuple<int, int>): The cell to set the deltas of
+            deltas (set<tuple<int, int>>): The new deltas, or None to remove the cell's deltas
+        """
+        previous = self.deltas.get(cell)
+        if previous is not None:
+            self._link_sources(cell, previous, False)
 
-        for best, delta in best_path:
-            self.deltas[best] = {delta}
+        if deltas is None:
+            self.deltas.pop(cell, None)
+        else:
+            self.deltas[cell] = deltas
+            self._link_sources(cell, deltas, True)
 
-    def get_best_path(self):
+    def get_best_path(self, start=None):
         """Yields (position, delta) pairs on best path, from start to end
+
+        Parameters:
+            start (tuple<int, int>): The start point to follow the path from, defaulting
+                                     to the first
         
         Yield:
             (position, delta) pair:
@@ -138,36 +268,45 @@ class Path:
                 - delta (tuple<int, int>): change in (column, row) position to reach next point on path,
                                            else None iff delta == end 
         """
-        best = self.start
+        best = self.start if start is None else start
 
-        for delta in self.get_best_deltas():
+        for delta in self.get_best_deltas(start):
             yield best, delta
             best = tuple(a + b for a, b in zip(best, delta))
 
         yield best, None
 
-    def get_best_deltas(self):
+    def get_best_deltas(self, start=None):
         """Yield the best path to travel from start to finish
 
+        Parameters:
+            start (tuple<int, int>): The start point to follow the path from, defaulting
+                                     to the first
+
         Yields:
             tuple<int, int>: The best sequence of positions to reach the end
         """
-        best = self.start
+        best = self.start if start is None else start
         previous = None
+        ends = set(self.ends)
 
-        while best != self.end:
+        while best not in ends:
             delta = self.get_best_delta(best, previous=previous)
             yield delta
             previous = delta
             best = tuple(a + b for a, b in zip(best, delta))
 
-    def get_shortest(self):
+    def get_shortest(self, start=None):
         """Yield the best path to travel from start to finish
 
+        Parameters:
+            start (tuple<int, int>): The start point to follow the path from, defaulting
+                                     to the first
+
         Yields:
             tuple<int, int>: The best sequence of positions to reach the end
         """
-        for best, delta in self.get_best_path():
+        for best, delta in self.get_best_path(start):
             yield best
             if delta is None:
                 break
@@ -183,16 +322,839 @@ class Path:
             return previous
         return next(iter(self.deltas[cell]))
 
+    def get_remaining_distance(self, cell, offset=(0, 0)):
+        """(float) Returns the distance, in cells, left to travel to reach the end from a
+        point within 'cell', or None if 'cell' is not on the path
+
+        Parameters:
+            cell (tuple<int, int>): The cell containing the point
+            offset (tuple<float, float>): The fractional offset of the point from the cell's centre
+        """
+        distance = self.distances.get(cell)
+        if distance is None:
+            return None
+
+        deltas = self.deltas.get(cell)
+        if not deltas:
+            return distance
+
+        # points past the centre (along the best delta) are closer to the end
+        dx, dy = self.get_best_delta(cell)
+        return distance - (offset[0] * dx + offset[1] * dy)
+
     def get_sources(self, destination):
         """Yields the cell(s) that flow into destination
         
         Parameters:
             destination (tuple<int, int>): The destination cell 
         """
+        yield from self._sources.get(destination, ())
 
-        for source, deltas in self.deltas.items():
-            for delta in deltas:
-                next_ = tuple(a + b for a, b in zip(source, delta))
+    def get_destinations(self, source):
+        """Yields the cell(s) that source flows into
+
+        Parameters:
+            source (tuple<int, int>): The source cell
+        """
+        for delta in self.deltas.get(source, ()):
+            yield tuple(a + b for a, b in zip(source, delta))
+
+    @staticmethod
+    def _get_reachable(cell, get_next):
+        """(set<tuple<int, int>>) Returns every cell reachable from 'cell' (exclusive) by
+        repeatedly following 'get_next'"""
+        reachable = set()
+
+        boundary = deque([cell])
+        while boundary:
+            for next_ in get_next(boundary.popleft()):
+                if next_ not in reachable:
+                    reachable.add(next_)
+                    boundary.append(next_)
+
+        reachable.discard(cell)
+        return reachable
+
+    def get_upstream(self, cell):
+        """(set<tuple<int, int>>) Returns every cell that eventually flows into 'cell'
+
+        Parameters:
+            cell (tuple<int, int>): The cell to search upstream of
+        """
+        return self._get_reachable(cell, self.get_sources)
+
+    def get_downstream(self, cell):
+        """(set<tuple<int, int>>) Returns every cell that 'cell' eventually flows into
+
+        Parameters:
+            cell (tuple<int, int>): The cell to search downstream of
+        """
+        return self._get_reachable(cell, self.get_destinations)
+
+
+class IncrementalPath(Path):
+    """A path that is repaired in place, rather than regenerated, when a single cell
+    is blocked or unblocked
+
+    Only the region whose distance to the end point changes (and its neighbours) is
+    recalculated, and the version is advanced after every change.
+
+    Attributes:
+        blocked (set<tuple<int, int>>): The positions that can not be travelled through
+    """
+
+    def __init__(self, start, end, get_neighbours, blocked=()):
+        """Initialize a path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
+            get_neighbours (func<tuple<int, int>>): A function which takes a
+                                                    position and returns the
+                                                    neighbours, ignoring blocked positions
+            blocked (iter<tuple<int, int>>): The positions that are initially blocked
+        """
+        self._set_ends(start, end)
+        self.blocked = set(blocked)
+
+        self._get_all_neighbours = get_neighbours
+
+        # best neighbour deltas for every position, before the best path is overridden
+        self._best_neighbours = {}
+        self._overridden = set()
+
+        # (version, cells) pair of the separating cells, computed when first needed
+        self._separating = None, None
+
+        self._generate()
+
+    def get_neighbours(self, cell, from_=True):
+        """Yields the unblocked positions neighbouring 'cell'
+
+        Parameters:
+            cell (tuple<int, int>): The cell to check for neighbours
+            from_ (bool): If true, searches from cell to neighbour, else from neighbour to cell
+        """
+        for neighbour in self._get_all_neighbours(cell, from_=from_):
+            if neighbour not in self.blocked:
+                yield neighbour
+
+    def copy(self):
+        """(IncrementalPath) Returns a copy of this path that can be changed independently"""
+        path = self.__class__.__new__(self.__class__)
+        path.__dict__.update(self.__dict__)
+
+        # delta sets are replaced rather than modified, so can be shared
+        path.blocked = set(self.blocked)
+        path.distances = dict(self.distances)
+        path.deltas = dict(self.deltas)
+        path._best_neighbours = dict(self._best_neighbours)
+        path._overridden = set(self._overridden)
+        path._sources = {cell: set(sources) for cell, sources in self._sources.items()}
+
+        return path
+
+    def _generate_best_neighbours(self, distances):
+        self._best_neighbours = super()._generate_best_neighbours(distances)
+        return dict(self._best_neighbours)
+
+    def _override_best_path(self):
+        self._overridden = super()._override_best_path()
+        return self._overridden
+
+    def is_on_best_path(self, cell):
+        """(bool) Returns True iff 'cell' is on the best path from any start to an end"""
+        return cell in self._overridden
+
+    def depends_on(self, cell):
+        """(bool) Returns True iff blocking 'cell' could change the best path"""
+        return self.is_on_best_path(cell)
+
+    def get_separating_cells(self):
+        """Returns the cells that every route from some start to the ends passes through,
+        i.e. the cells that can't be blocked without disconnecting a start from the ends
+
+        Found with a single depth-first search (Tarjan's articulation points) from a
+        virtual root joined to every end, and cached until the path next changes.
+
+        Return:
+            set<tuple<int, int>>: The separating cells, excluding the starts & ends
+        """
+        version, separating = self._separating
+        if version == self.version:
+            return separating
+
+        ends = set(self.ends)
+
+        def get_linked(cell):
+            """Yields the cells linked to 'cell', including the root (None) for ends"""
+            if cell is None:
+                yield from self.ends
+                return
+
+            yield from self.get_neighbours(cell)
+            if cell in ends:
+                yield None
+
+        # discovery order & lowest reachable discovery order of each cell
+        order = {None: 0}
+        low = {None: 0}
+        parents = {None: None}
+
+        stack = [(None, get_linked(None))]
+        while stack:
+            cell, neighbours = stack[-1]
+
+            for neighbour in neighbours:
+                if neighbour not in order:
+                    order[neighbour] = low[neighbour] = len(order)
+                    parents[neighbour] = cell
+                    stack.append((neighbour, get_linked(neighbour)))
+                    break
+
+                if neighbour != parents[cell]:
+                    low[cell] = min(low[cell], order[neighbour])
+            else:
+                stack.pop()
+
+                parent = parents[cell]
+                if parent is not None:
+                    low[parent] = min(low[parent], low[cell])
+
+        # only cells between a start & the root in the search tree can separate them, when
+        # the subtree leading to the start can't reach above them
+        separating = set()
+        visited = set()
+
+        for start in self.starts:
+            child, cell = start, parents[start]
+            while cell is not None:
+                if low[child] >= order[cell]:
+                    separating.add(cell)
+
+                # the rest of the way to the root has already been checked
+                if cell in visited:
+                    break
+                visited.add(cell)
+
+                child, cell = cell, parents[cell]
+
+        separating.difference_update(self.starts)
+        separating.difference_update(self.ends)
+
+        self._separating = self.version, separating
+        return separating
+
+    def _update(self, changed):
+        """Recalculates best deltas around the positions whose distance changed, then
+        re-overrides the best path
+
+        Parameters:
+            changed (set<tuple<int, int>>): The positions whose distance changed
+        """
+        distances = self.distances
+
+        # a position's best deltas depend on the distances of its neighbours
+        stale = set(changed)
+        for cell in changed:
+            stale.update(self._get_all_neighbours(cell, from_=False))
+
+        ends = set(self.ends)
+        for cell in stale:
+            if cell in distances and cell not in ends and cell not in self.blocked:
+                self._best_neighbours[cell] = self._get_best_neighbour_deltas(cell, distances)
+            else:
+                self._best_neighbours.pop(cell, None)
+
+        # restore the previous best path, before overriding the new one
+        for cell in self._overridden | stale:
+            self._set_deltas(cell, self._best_neighbours.get(cell))
+
+        self._override_best_path()
+        self.version = next(_versions)
+
+    def _get_dependants(self, cell):
+        """Returns the positions that only reach the end point through 'cell'
+
+        Return:
+            set<tuple<int, int>>: The dependant positions, including 'cell'
+        """
+        distances = self.distances
+        dependants = {cell}
+
+        # positions are visited in order of distance, so every equally distant dependant
+        # is known before the positions further away are checked
+        boundary = deque([cell])
+        while boundary:
+            to = boundary.popleft()
+            distance = distances[to] + 1
+
+            for from_ in self.get_neighbours(to, from_=False):
+                if from_ in dependants or distances.get(from_) != distance:
+                    continue
+
+                # a position with another equally good neighbour doesn't depend on 'to'
+                if any(distances.get(neighbour) == distance - 1 and neighbour not in dependants
+                       for neighbour in self.get_neighbours(from_, from_=True)):
+                    continue
+
+                dependants.add(from_)
+                boundary.append(from_)
+
+        return dependants
+
+    def block(self, cell):
+        """Blocks 'cell', repairing the path around it
+
+        Parameters:
+            cell (tuple<int, int>): The position to block
+
+        Raises:
+            KeyError if blocking 'cell' would disconnect the start from the end,
+            in which case the path is left unchanged
+        """
+        if cell in self.blocked:
+            return
+
+        if cell in self.starts or cell in self.ends:
+            raise KeyError("Cannot block the start or end of a path")
+
+        distances = self.distances
+        if cell not in distances:
+            # already unreachable, so no distances depend on it
+            self.blocked.add(cell)
+            return
+
+        dependants = self._get_dependants(cell)
+        self.blocked.add(cell)
+
+        previous = {dependant: distances.pop(dependant) for dependant in dependants}
+        dependants.discard(cell)
+
+        # re-seed each dependant from its nearest unaffected neighbour, then expand
+        boundary = []
+        for dependant in dependants:
+            neighbours = [distances[neighbour] for neighbour in self.get_neighbours(dependant, from_=True)
+                          if neighbour in distances]
+            if neighbours:
+                heapq.heappush(boundary, (min(neighbours) + 1, dependant))
+
+        while boundary:
+            distance, to = heapq.heappop(boundary)
+            if to in distances:
+                continue
+
+            distances[to] = distance
+
+            for from_ in self.get_neighbours(to, from_=False):
+                if from_ in dependants and from_ not in distances:
+                    heapq.heappush(boundary, (distance + 1, from_))
+
+        if any(start not in distances for start in self.starts):
+            for dependant in dependants:
+                distances.pop(dependant, None)
+            distances.update(previous)
+            self.blocked.discard(cell)
+
+            raise KeyError("Cannot reach end from start")
+
+        self._update(previous.keys())
+
+    def unblock(self, cell):
+        """Unblocks 'cell', repairing the path through it
+
+        Parameters:
+            cell (tuple<int, int>): The position to unblock
+        """
+        if cell not in self.blocked:
+            return
+
+        self.blocked.discard(cell)
+
+        distances = self.distances
+        neighbours = [distances[neighbour] for neighbour in self.get_neighbours(cell, from_=True)
+                      if neighbour in distances]
+
+        if not neighbours:
+            # still unreachable, so no distances can improve
+            return
+
+        changed = set()
+
+        boundary = [(min(neighbours) + 1, cell)]
+        while boundary:
+            distance, to = heapq.heappop(boundary)
+            if distances.get(to, distance + 1) <= distance:
+                continue
+
+            distances[to] = distance
+            changed.add(to)
+
+            for from_ in self.get_neighbours(to, from_=False):
+                if distances.get(from_, distance + 2) > distance + 1:
+                    heapq.heappush(boundary, (distance + 1, from_))
+
+        self._update(changed)
 
-                if next_ == destination:
-                    yield source
+
+class DiagonalPath(IncrementalPath):
+    """A path that may also move diagonally between cells, generated with Dijkstra's
+    algorithm over the length of each step (1 axially, sqrt(2) diagonally)
+
+    Diagonal steps can't cut corners, i.e. both cells axially adjacent to the step must
+    be unblocked. As a result, blocking a cell only disconnects what removing it from
+    the grid would, so the separating cells are found as for any IncrementalPath.
+
+    Blocking & unblocking regenerate the whole path, rather than repairing it.
+    """
+    DELTAS = RADIAL_DELTAS
+
+    def __init__(self, start, end, get_neighbours, blocked=()):
+        """Initialize a path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
+            get_neighbours (func<tuple<int, int>>): A function which takes a
+                                                    position and returns the (axial &
+                                                    diagonal) neighbours, ignoring blocked
+                                                    positions
+            blocked (iter<tuple<int, int>>): The positions that are initially blocked
+        """
+        # the cells either side of each diagonal step on the best path
+        self._corners = set()
+
+        super().__init__(start, end, get_neighbours, blocked=blocked)
+
+    def get_neighbours(self, cell, from_=True):
+        """Yields the unblocked positions neighbouring 'cell', excluding diagonal
+        positions that could only be reached by cutting a corner
+
+        Parameters:
+            cell (tuple<int, int>): The cell to check for neighbours
+            from_ (bool): If true, searches from cell to neighbour, else from neighbour to cell
+        """
+        neighbours = set(super().get_neighbours(cell, from_=from_))
+        column, row = cell
+
+        for neighbour in neighbours:
+            x, y = neighbour
+            if x == column or y == row or ((x, row) in neighbours and (column, y) in neighbours):
+                yield neighbour
+
+    def copy(self):
+        path = super().copy()
+        path._corners = set(self._corners)
+        return path
+
+    def _generate_distance_map(self):
+        """Generate a mapping of positions to their distance, in cells, from the end point
+
+        Returns:
+            dict<tuple<int, int>: float>: the position distance mapping
+        """
+        distances = dict.fromkeys(self.ends, 0)
+        settled = set()
+
+        # (distance, cell) pairs, which may be stale if a shorter route was found later
+        boundary = [(0, end) for end in self.ends]
+
+        while boundary:
+            distance, to = heapq.heappop(boundary)
+            if to in settled:
+                continue
+            settled.add(to)
+
+            for from_ in self.get_neighbours(to, from_=False):
+                if from_ in settled:
+                    continue
+
+                from_distance = distance + STEP_LENGTHS[from_[0] - to[0], from_[1] - to[1]]
+                if from_ not in distances or from_distance < distances[from_]:
+                    distances[from_] = from_distance
+                    heapq.heappush(boundary, (from_distance, from_))
+
+        return distances
+
+    def _get_best_neighbour_deltas(self, from_, distances):
+        """Calculate the deltas from a position toward its neighbours on the shortest route
+        to the end point
+
+        Parameters:
+            from_ (tuple<int, int>): The position to calculate deltas from
+            distances (dict<tuple<int, int>: float>): A map of positions to
+                                                      distances from end point
+
+        Returns:
+            set<tuple<int, int>>: The deltas toward every equally short route
+        """
+        routes = []
+        for to in self.get_neighbours(from_, from_=True):
+            delta = to[0] - from_[0], to[1] - from_[1]
+            routes.append((STEP_LENGTHS[delta] + distances[to], delta))
+
+        best_distance = min(distance for distance, _ in routes)
+
+        # allow for rounding when adding diagonal steps
+        return {delta for distance, delta in routes if math.isclose(distance, best_distance)}
+
+    def _override_best_path(self):
+        overridden = super()._override_best_path()
+
+        self._corners = set()
+        for column, row in overridden.difference(self.ends):
+            dx, dy = self.get_best_delta((column, row))
+            if dx and dy:
+                self._corners.update(((column + dx, row), (column, row + dy)))
+
+        return overridden
+
+    def depends_on(self, cell):
+        """(bool) Returns True iff blocking 'cell' could change the best path, including
+        by preventing a diagonal step from cutting its corner"""
+        return self.is_on_best_path(cell) or cell in self._corners
+
+    def get_remaining_distance(self, cell, offset=(0, 0)):
+        distance = self.distances.get(cell)
+        if distance is None:
+            return None
+
+        deltas = self.deltas.get(cell)
+        if not deltas:
+            return distance
+
+        # points past the centre (along the best delta) are closer to the end
+        dx, dy = self.get_best_delta(cell)
+        return distance - (offset[0] * dx + offset[1] * dy) / STEP_LENGTHS[dx, dy]
+
+    def _regenerate(self):
+        """Regenerates the whole path, restoring the previous distances if the start
+        can't reach the end
+
+        Raises:
+            KeyError if the start can't reach the end
+        """
+        distances = self.distances
+
+        try:
+            self._generate()
+        except KeyError:
+            self.distances = distances
+            raise
+
+    def block(self, cell):
+        """Blocks 'cell', regenerating the path around it
+
+        Parameters:
+            cell (tuple<int, int>): The position to block
+
+        Raises:
+            KeyError if blocking 'cell' would disconnect the start from the end,
+            in which case the path is left unchanged
+        """
+        if cell in self.blocked:
+            return
+
+        if cell in self.starts or cell in self.ends:
+            raise KeyError("Cannot block the start or end of a path")
+
+        self.blocked.add(cell)
+
+        try:
+            self._regenerate()
+        except KeyError:
+            self.blocked.discard(cell)
+            raise
+
+    def unblock(self, cell):
+        """Unblocks 'cell', regenerating the path through it
+
+        Parameters:
+            cell (tuple<int, int>): The position to unblock
+        """
+        if cell not in self.blocked:
+            return
+
+        self.blocked.discard(cell)
+        self._regenerate()
+
+
+class _CellMap(Mapping):
+    """Read-only mapping view of an ArrayPath's per-cell arrays, keyed by (column, row)"""
+
+    def __init__(self, path, get_value, has_value):
+        """Constructor
+
+        Parameters:
+            path (ArrayPath): The path whose arrays to view
+            get_value (func<int>): Returns the value for a cell id
+            has_value (func<int>): Returns True iff a cell id has a value
+        """
+        self._path = path
+        self._get_value = get_value
+        self._has_value = has_value
+
+    def __getitem__(self, cell):
+        index = self._path.get_cell_id(cell)
+        if not self._has_value(index):
+            raise KeyError(cell)
+        return self._get_value(index)
+
+    def __contains__(self, cell):
+        try:
+            return self._has_value(self._path.get_cell_id(cell))
+        except KeyError:
+            return False
+
+    def __iter__(self):
+        get_cell = self._path.get_cell
+        for index in range(len(self._path.open)):
+            if self._has_value(index):
+                yield get_cell(index)
+
+    def __len__(self):
+        return sum(1 for index in range(len(self._path.open)) if self._has_value(index))
+
+
+class WeightedPath(Path):
+    """A path whose cells have a cost to travel through, generated with Dijkstra's algorithm
+
+    The distance of each cell from the end point is the total cost of the cells on the
+    cheapest route from it, including the cell itself but excluding the end point.
+    """
+
+    def __init__(self, start, end, get_neighbours, get_cost):
+        """Initialize a weighted path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
+            get_neighbours (func<tuple<int, int>>): A function which takes a
+                                                    position and returns the
+                                                    neighbours
+            get_cost (func<tuple<int, int>>): A function which takes a position and
+                                              returns the (positive) cost of travelling
+                                              through it
+        """
+        self.get_cost = get_cost
+
+        super().__init__(start, end, get_neighbours)
+
+    def _generate_distance_map(self):
+        """Generate a mapping of positions to their cost to reach the end point
+
+        Returns:
+            dict<tuple<int, int>: float>: the position distance mapping
+        """
+        distances = dict.fromkeys(self.ends, 0)
+        settled = set()
+
+        # (distance, cell) pairs, which may be stale if a cheaper route was found later
+        boundary = [(0, end) for end in self.ends]
+
+        while boundary:
+            distance, to = heapq.heappop(boundary)
+            if to in settled:
+                continue
+            settled.add(to)
+
+            for from_ in self.get_neighbours(to, from_=False):
+                if from_ in settled:
+                    continue
+
+                from_distance = distance + self.get_cost(from_)
+                if from_ not in distances or from_distance < distances[from_]:
+                    distances[from_] = from_distance
+                    heapq.heappush(boundary, (from_distance, from_))
+
+        return distances
+
+
+class ArrayPath(Path):
+    """A path through a rectangular grid, stored in flat arrays indexed by cell id
+
+    Cell ids are row-major indices into the grid, padded on every side so that the
+    starts & ends may lie just outside of it. Distances are held in an integer array &
+    best deltas as a bit mask per cell, with 'deltas' & 'distances' being read-only
+    mapping views over them.
+
+    Attributes:
+        size (tuple<int, int>): The (column, row) size of the grid
+        open (bytearray): 1 for each cell id that can be travelled through, else 0
+    """
+    # Cells of padding around the grid; the start & end may be 1 cell outside of the
+    # grid, & their neighbours must still be valid ids
+    PADDING = 2
+
+    def __init__(self, start, end, size, blocked=()):
+        """Initialize a path from a starting point to a finishing point
+
+        Parameters:
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
+            size (tuple<int, int>): The (column, row) size of the grid
+            blocked (iter<tuple<int, int>>): Positions within the grid that can't be travelled through
+        """
+        self._set_ends(start, end)
+        self.size = columns, rows = size
+
+        self._width = columns + 2 * self.PADDING
+        self._height = rows + 2 * self.PADDING
+
+        # change in cell id for each delta, in the same order as get_adjacent_cells
+        self._offsets = tuple(dy * self._width + dx for dx, dy in AXIAL_DELTAS)
+        self._delta_bits = {delta: 1 << i for i, delta in enumerate(AXIAL_DELTAS)}
+
+        # every delta in each bit mask, & the delta preferred when there are several
+        self._mask_deltas = [tuple(delta for i, delta in enumerate(AXIAL_DELTAS) if mask & (1 << i))
+                             for mask in range(1 << len(AXIAL_DELTAS))]
+
+        self.open = bytearray(self._width * self._height)
+        for row in range(rows):
+            first = self.get_cell_id((0, row))
+            self.open[first:first + columns] = b'\x01' * columns
+
+        for cell in blocked:
+            self.open[self.get_cell_id(cell)] = 0
+
+        for cell in self.starts + self.ends:
+            self.open[self.get_cell_id(cell)] = 1
+
+        self.distances = _CellMap(self, self._distances_get, self._distances_has)
+        self.deltas = _CellMap(self, self._deltas_get, self._deltas_has)
+
+        self._generate()
+
+    def get_cell_id(self, cell):
+        """(int) Returns the id of 'cell'
+
+        Raises:
+            KeyError if 'cell' is outside of the padded grid
+        """
+        column, row = cell
+        column += self.PADDING
+        row += self.PADDING
+
+        if not (0 <= column < self._width and 0 <= row < self._height):
+            raise KeyError(cell)
+
+        return row * self._width + column
+
+    def get_cell(self, index):
+        """(tuple<int, int>) Returns the cell with id 'index'"""
+        row, column = divmod(index, self._width)
+        return column - self.PADDING, row - self.PADDING
+
+    def _distances_get(self, index):
+        return self._distances[index]
+
+    def _distances_has(self, index):
+        return self._distances[index] >= 0
+
+    def _deltas_get(self, index):
+        return set(self._mask_deltas[self._best[index]])
+
+    def _deltas_has(self, index):
+        return self._best[index] != 0
+
+    def get_neighbours(self, cell, from_=True):  # pylint: disable=unused-argument
+        """Yields all the open positions neighbouring cell
+
+        Parameters:
+            cell (tuple<int, int>): The cell to check for neighbours
+            from_ (bool): If true, searches from cell to neighbour, else from neighbour to cell
+                          *not used in this implementation*
+        """
+        index = self.get_cell_id(cell)
+        for offset in self._offsets:
+            if self.open[index + offset]:
+                yield self.get_cell(index + offset)
+
+    def _generate(self):
+        """Calculate the best path to travel through the path"""
+        open_ = self.open
+        offsets = self._offsets
+
+        ends = list({self.get_cell_id(end): None for end in self.ends})
+
+        distances = self._distances = array('l', [-1]) * len(open_)
+        for end in ends:
+            distances[end] = 0
+
+        # every cell is queued at most once, so a list doubles as the frontier
+        boundary = ends
+        for to in boundary:
+            distance = distances[to] + 1
+
+            for offset in offsets:
+                from_ = to + offset
+                if open_[from_] and distances[from_] < 0:
+                    distances[from_] = distance
+                    boundary.append(from_)
+
+        # ensure every start point can reach an end point
+        if any(distances[self.get_cell_id(start)] < 0 for start in self.starts):
+            raise KeyError("Cannot reach end from start")
+
+        # every neighbour one step nearer to the end is a best neighbour
+        best = self._best = bytearray(len(open_))
+        for from_ in boundary:
+            if not distances[from_]:
+                continue
+
+            nearer = distances[from_] - 1
+
+            mask = 0
+            for bit, offset in enumerate(offsets):
+                if distances[from_ + offset] == nearer:
+                    mask |= 1 << bit
+            best[from_] = mask
+
+        # overwrite bests on path
+        self._override_best_path()
+
+        self.version = next(_versions)
+
+    def _override_best_path(self):
+        """Overwrites the deltas along the best path from each start point with the single
+        delta that is followed"""
+        for cell, delta in self._get_best_paths(set()):
+            self._best[self.get_cell_id(cell)] = self._delta_bits[delta]
+
+        for end, delta in list(self._get_exit_deltas()):
+            self._best[self.get_cell_id(end)] = self._delta_bits[delta]
+
+    def get_sources(self, destination):
+        """Yields the cell(s) that flow into destination
+
+        Checks the bit masks of the destination's neighbours, so needs no separate index.
+
+        Parameters:
+            destination (tuple<int, int>): The destination cell
+        """
+        try:
+            index = self.get_cell_id(destination)
+        except KeyError:
+            return
+
+        best = self._best
+        for bit, offset in enumerate(self._offsets):
+            # the neighbour in the opposite direction flows in along this delta
+            source = index - offset
+            if 0 <= source < len(best) and best[source] & (1 << bit):
+                yield self.get_cell(source)
+
+    def get_best_delta(self, cell, previous=None):
+        """(tuple<int, int>) Returns change in (column, row) position to reach next point on path
+
+        Parameters:
+            cell (tuple<int, int>): Current point on the path
+            previous (tuple<int, int>): Previous point on the path
+        """
+        mask = self._best[self.get_cell_id(cell)]
+        if not mask:
+            raise KeyError(cell)
+
+        if previous and mask & self._delta_bits.get(previous, 0):
+            return previous
+        return self._mask_deltas[mask][0]
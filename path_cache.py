@@ -0,0 +1,212 @@
+"""
+Caching of generated paths, keyed by the set of towers they avoid, & speculative
+path generation on a background thread
+
+Tower sets are fingerprinted with Zobrist hashing, i.e. by XORing a random key
+for each tower cell, so the fingerprint can be updated in constant time as
+towers are placed & removed, & hypothetical tower sets can be fingerprinted
+without copying the whole set.
+"""
+
+import queue
+import random
+import threading
+from collections import OrderedDict
+
+__author__ = "Haoxi Tan"
+
+# Cached in place of a path, for tower sets that leave no path from start to end
+NO_PATH = object()
+
+
+class ZobristHash:
+    """Order-independent 64-bit fingerprint of a set of cells
+
+    Attributes:
+        value (int): The fingerprint of the current set of cells
+    """
+
+    def __init__(self, seed=0):
+        """Constructor
+
+        Parameters:
+            seed (int): Seed for the random key of each cell
+        """
+        self._random = random.Random(seed)
+        self._keys = {}
+        self.value = 0
+
+    def get_key(self, cell):
+        """(int) Returns the random key for 'cell', generating it if necessary"""
+        key = self._keys.get(cell)
+
+        if key is None:
+            key = self._keys[cell] = self._random.getrandbits(64)
+
+        return key
+
+    def toggle(self, cell):
+        """Adds 'cell' to the set if it is absent, else removes it"""
+        self.value ^= self.get_key(cell)
+
+    def clear(self):
+        """Empties the set"""
+        self.value = 0
+
+    def get_value_with(self, cells):
+        """(int) Returns the fingerprint of the set with each of 'cells' toggled
+
+        Parameters:
+            cells (iter<tuple<int, int>>): Cells that are not in the set
+        """
+        value = self.value
+        for cell in cells:
+            value ^= self.get_key(cell)
+
+        return value
+
+
+class PathCache:
+    """Bounded least-recently-used cache of paths, safe to share between threads
+
+    Cached paths are shared between lookups, so must not be modified. NO_PATH may be
+    cached to remember that a tower set leaves no path.
+
+    Attributes:
+        hits (int): The number of lookups that found a cached path
+        misses (int): The number of lookups that didn't
+    """
+
+    def __init__(self, capacity=32):
+        """Constructor
+
+        Parameters:
+            capacity (int): The maximum number of paths to keep
+        """
+        self._capacity = capacity
+        self._paths = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def __contains__(self, key):
+        """(bool) Returns True iff a path is cached for 'key', without counting a lookup"""
+        return key in self._paths
+
+    def get(self, key):
+        """(Path) Returns the path (or NO_PATH) cached for 'key', or None if there isn't one"""
+        with self._lock:
+            path = self._paths.get(key)
+
+            if path is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._paths.move_to_end(key)
+            return path
+
+    def put(self, key, path):
+        """Caches 'path' for 'key', evicting the least recently used path if full"""
+        with self._lock:
+            self._paths[key] = path
+            self._paths.move_to_end(key)
+
+            if len(self._paths) > self._capacity:
+                self._paths.popitem(last=False)
+
+    def clear(self):
+        """Removes every cached path"""
+        with self._lock:
+            self._paths.clear()
+
+
+class PathPrefetcher:
+    """Builds paths on a background worker thread, to fill a PathCache ahead of time
+
+    Requests belong to the generation they were made in; cancelling starts a new
+    generation, so pending requests are dropped & results still being built are
+    discarded.
+
+    Attributes:
+        generation (int): The current generation
+    """
+
+    def __init__(self, cache):
+        """Constructor
+
+        Parameters:
+            cache (PathCache): The cache to fill with built paths
+        """
+        self._cache = cache
+        self._requests = queue.Queue()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+        self.generation = 0
+
+        self._worker = threading.Thread(target=self._run, name="PathPrefetcher", daemon=True)
+        self._worker.start()
+
+    def request(self, key, build):
+        """Requests that the path for 'key' is built & cached, unless it already is
+
+        Parameters:
+            key (hashable): The cache key of the path
+            build (func<>): Returns the path for 'key' (raising KeyError if there is none),
+                            & must not depend on state that changes between generations
+        """
+        with self._lock:
+            if key in self._pending or key in self._cache:
+                return
+
+            self._pending.add(key)
+            self._requests.put((self.generation, key, build))
+
+    def is_pending(self, key):
+        """(bool) Returns True iff the path for 'key' has been requested but not yet cached"""
+        return key in self._pending
+
+    def cancel(self):
+        """Cancels every pending request, i.e. because the paths they build are out of date"""
+        with self._lock:
+            self.generation += 1
+            self._pending.clear()
+
+        # drop queued requests now, rather than waiting for the worker to skip them
+        try:
+            while True:
+                self._requests.get_nowait()
+        except queue.Empty:
+            pass
+
+    def close(self):
+        """Cancels pending requests & stops the worker thread"""
+        self.cancel()
+        self._requests.put(None)
+        self._worker.join()
+
+    def _run(self):
+        """Builds requested paths until closed"""
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+
+            generation, key, build = request
+            if generation != self.generation:
+                continue
+
+            try:
+                path = build()
+            except KeyError:
+                path = NO_PATH
+
+            with self._lock:
+                if generation == self.generation:
+                    self._cache.put(key, path)
+                    self._pending.discard(key)
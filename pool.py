@@ -0,0 +1,97 @@
+"""
+Object pooling for short-lived units
+
+Towers fire a new obstacle almost every step, & some enemies spawn others, so an
+ObjectPool keeps a free list of expired units per class to reinitialise & reuse,
+rather than leaving them for the garbage collector.
+"""
+
+__author__ = "Haoxi Tan"
+
+
+class ObjectPool:
+    """Per-class free lists of released objects, reinitialised when acquired
+
+    Objects are reset by calling their class' constructor on them again, so a class can
+    only be pooled if its constructor fully reinitialises its instances. Released objects
+    must no longer be used by the game, other than to check whether they are dead.
+
+    Only classes that have been acquired from the pool are kept when released, as
+    instances of other classes would never be reused.
+
+    Attributes:
+        hits (int): The number of objects acquired from a free list
+        misses (int): The number of objects constructed because their free list was empty
+        discarded (int): The number of objects released to a full free list, & so dropped
+    """
+
+    def __init__(self, capacity=256):
+        """Constructor
+
+        Parameters:
+            capacity (int): The maximum number of free objects to keep per class
+        """
+        self._capacity = capacity
+        self._free = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def __len__(self):
+        """(int) Returns the number of free objects, across every class"""
+        return sum(len(free) for free in self._free.values())
+
+    def acquire(self, class_, *args, **kwargs):
+        """Returns an instance of 'class_', reusing a free instance if there is one
+
+        Parameters:
+            class_ (type): The class to return an instance of
+            *args, **kwargs: Arguments for the class' constructor
+        """
+        free = self._free.setdefault(class_, [])
+
+        if not free:
+            self.misses += 1
+            return class_(*args, **kwargs)
+
+        self.hits += 1
+        instance = free.pop()
+        instance.__init__(*args, **kwargs)
+        return instance
+
+    def release(self, instance):
+        """Returns 'instance' to the free list for its class, unless the list is full or
+        its class is never acquired
+
+        Return:
+            bool: True iff 'instance' was kept, to be reused
+        """
+        free = self._free.get(type(instance))
+        if free is None:
+            return False
+
+        if len(free) < self._capacity:
+            free.append(instance)
+            return True
+
+        self.discarded += 1
+        return False
+
+    def clear(self):
+        """Drops every free object"""
+        self._free.clear()
+
+
+def create(pool, class_, *args, **kwargs):
+    """Returns an instance of 'class_', acquired from 'pool' unless it is None
+
+    Parameters:
+        pool (ObjectPool): The pool to acquire from, or None to always construct
+        class_ (type): The class to return an instance of
+        *args, **kwargs: Arguments for the class' constructor
+    """
+    if pool is None:
+        return class_(*args, **kwargs)
+
+    return pool.acquire(class_, *args, **kwargs)
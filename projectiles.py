@@ -0,0 +1,489 @@
+"""
+Array-backed (struct-of-arrays) storage for projectiles, advanced in bulk
+
+Projectiles added to a ProjectileSystem keep their kinematic state, target, damage &
+damage type in contiguous NumPy arrays, with each projectile object becoming a thin
+view over its row (see enemy_store). Every homing & straight-line projectile is then
+moved with a single vectorised pass per step, & the enemies they hit are found for
+all projectiles at once, rather than each projectile stepping itself.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for array-backed projectiles
+    np = None
+
+from enemy_store import get_view_class
+from tower import Bullet, Missile, PiercingObstacle
+from utilities import segments_intersect_boxes
+
+__author__ = "Haoxi Tan"
+
+
+class ProjectileSystem:
+    """Struct-of-arrays collection of projectiles
+
+    Rows [0, len(system)) of each array are occupied, in the order projectiles were
+    added; removing projectiles shifts the rows after them down.
+
+    Attributes:
+        positions (np.ndarray<float>): (n, 2) array of (x, y) pixel positions
+        rotations (np.ndarray<float>): Direction of travel of each projectile, in radians
+        speeds (np.ndarray<float>): Distance travelled by each projectile per step, in pixels
+        thresholds (np.ndarray<float>): Maximum rotation of each homing projectile per step
+        directions (np.ndarray<float>): (n, 2) array of the unit direction of each sweeping
+                                        projectile
+        damage (np.ndarray<float>): Damage dealt to each enemy hit
+        kinds (np.ndarray<int>): How each projectile moves & hits, one of the kinds below
+        hit_limits (np.ndarray<int>): Number of enemies each sweeping projectile can hit
+                                      before it expires, or 0 if unlimited
+    """
+    # Moves toward its target, turning by no more than its threshold, & hits it when close
+    HOMING = 0
+    # Moves in a straight line, hitting its target if the target comes close
+    STRAIGHT = 1
+    # Moves in a straight line, hitting every enemy it passes over once
+    SWEEP = 2
+
+    # Maps each projectile class to its kind; subclasses share their parent's kind
+    KINDS = {
+        Missile: HOMING,
+        Bullet: STRAIGHT,
+        PiercingObstacle: SWEEP,
+    }
+
+    # Maps each stored projectile attribute to its (array name, is_vector) pair
+    FIELDS = {
+        'position': ('positions', True),
+        'rotation': ('rotations', False),
+    }
+
+    def __init__(self, capacity=64):
+        """Constructor
+
+        Parameters:
+            capacity (int): The number of projectiles to initially allocate space for
+
+        Raises:
+            ImportError if numpy is not installed
+        """
+        if np is None:
+            raise ImportError("ProjectileSystem requires numpy")
+
+        self._projectiles = []
+
+        # per-row targets (or None), & the set of enemies already hit by sweeping projectiles
+        self._targets = []
+        self._damaged = []
+
+        self.positions = np.zeros((capacity, 2))
+        self.rotations = np.zeros(capacity)
+        self.speeds = np.zeros(capacity)
+        self.thresholds = np.zeros(capacity)
+        self.directions = np.zeros((capacity, 2))
+        self.damage = np.zeros(capacity)
+        self.kinds = np.zeros(capacity, dtype=np.intp)
+        self.hit_limits = np.zeros(capacity, dtype=np.intp)
+
+    # arrays holding a value for every row, in addition to FIELDS
+    _ARRAYS = ('positions', 'rotations', 'speeds', 'thresholds', 'directions', 'damage', 'kinds', 'hit_limits')
+
+    def __len__(self):
+        return len(self._projectiles)
+
+    def __iter__(self):
+        """Yields stored projectiles, in row order"""
+        return iter(self._projectiles)
+
+    def __contains__(self, projectile):
+        return projectile._store is self
+
+    @classmethod
+    def get_kind(cls, projectile_class):
+        """(int) Returns the kind of 'projectile_class', or None if it can't be stored"""
+        for class_ in projectile_class.__mro__:
+            kind = cls.KINDS.get(class_)
+            if kind is not None:
+                return kind
+
+        return None
+
+    def _grow(self):
+        """Doubles the capacity of every array"""
+        for array_name in self._ARRAYS:
+            array = getattr(self, array_name)
+            setattr(self, array_name, np.concatenate((array, np.zeros_like(array))))
+
+    def add(self, projectile):
+        """Moves 'projectile's attributes into this system, making it a view over a new row
+
+        Parameters:
+            projectile (AbstractObstacle): The projectile to add, which must not belong to a system
+
+        Return:
+            bool: True iff the projectile was added, i.e. its class has a kind
+        """
+        if projectile._store is not None:
+            raise ValueError(f"{projectile} already belongs to a ProjectileSystem")
+
+        kind = self.get_kind(type(projectile))
+        if kind is None:
+            return False
+
+        row = len(self._projectiles)
+        if row == len(self.speeds):
+            self._grow()
+
+        self._projectiles.append(projectile)
+        self._targets.append(getattr(projectile, 'target', None))
+        self._damaged.append(getattr(projectile, 'damaged', None))
+
+        self.kinds[row] = kind
+        self.speeds[row] = projectile.speed
+        self.thresholds[row] = projectile.rotation_threshold if kind == self.HOMING else 0
+        self.directions[row] = getattr(projectile, 'direction', (0, 0))
+        self.damage[row] = projectile.damage
+        self.hit_limits[row] = getattr(projectile, 'hit_limit', 0)
+
+        for field, (array_name, _) in self.FIELDS.items():
+            getattr(self, array_name)[row] = projectile.__dict__.pop(field)
+
+        projectile._store, projectile._row = self, row
+        projectile.__class__ = get_view_class(type(projectile), self.FIELDS)
+
+        return True
+
+    def remove(self, projectile):
+        """Removes 'projectile' from this system, copying its attributes back onto it
+
+        Parameters:
+            projectile (AbstractObstacle): The projectile to remove
+        """
+        if projectile._store is not self:
+            raise KeyError(f"{projectile} does not belong to this ProjectileSystem")
+
+        self._remove_rows([projectile._row])
+
+    def remove_all(self, projectiles):
+        """Removes every projectile in 'projectiles' from this system (see remove)
+
+        Parameters:
+            projectiles (list<AbstractObstacle>): The projectiles to remove
+        """
+        for projectile in projectiles:
+            if projectile._store is not self:
+                raise KeyError(f"{projectile} does not belong to this ProjectileSystem")
+
+        self._remove_rows(sorted(projectile._row for projectile in projectiles))
+
+    def clear(self):
+        """Removes all projectiles from this system"""
+        self._remove_rows(range(len(self._projectiles)))
+
+    def _remove_rows(self, rows):
+        """Removes the projectiles in 'rows', shifting later rows down to fill the gaps
+
+        Parameters:
+            rows (list<int>): The rows to remove, in ascending order
+        """
+        if not rows:
+            return
+
+        count = len(self._projectiles)
+
+        for row in rows:
+            projectile = self._projectiles[row]
+            values = {field: getattr(projectile, field) for field in self.FIELDS}
+
+            projectile.__class__ = type(projectile).__bases__[0]
+            del projectile._store, projectile._row
+            projectile.__dict__.update(values)
+
+        keep = np.ones(count, dtype=bool)
+        keep[rows] = False
+        remaining = count - len(rows)
+
+        for array_name in self._ARRAYS:
+            array = getattr(self, array_name)
+            array[:remaining] = array[:count][keep]
+
+        kept = keep.tolist()
+        self._projectiles = [value for value, kept_ in zip(self._projectiles, kept) if kept_]
+        self._targets = [value for value, kept_ in zip(self._targets, kept) if kept_]
+        self._damaged = [value for value, kept_ in zip(self._damaged, kept) if kept_]
+
+        for row in range(rows[0], remaining):
+            self._projectiles[row]._row = row
+
+    def step(self, enemies, buckets):
+        """Moves every projectile forward a single time-step, damaging the enemies they hit
+
+        Equivalent to stepping each projectile in row order, except that targeted hits are
+        found before any enemy is damaged, & sweeping projectiles expire as soon as they
+        leave the grid.
+
+        Parameters:
+            enemies (EnemyStore): The store holding every enemy that can be hit
+            buckets (BucketManager): The buckets the enemies are divided into, which
+                                     limit sweeping projectiles to nearby enemies
+
+        Return:
+            list<AbstractObstacle>: The projectiles that expired, which have been removed
+        """
+        count = len(self._projectiles)
+        if not count:
+            return []
+
+        kinds = self.kinds[:count]
+        speeds = self.speeds[:count]
+        rotations = self.rotations[:count]
+        positions = self.positions[:count]
+        old_positions = positions.copy()
+
+        target_rows = self._get_target_rows(enemies)
+        target_health, target_positions = self._get_targets(enemies, target_rows)
+        target_alive = target_health > 0
+
+        # targeted projectiles hit their target once it is within a single step's distance
+        dx, dy = (target_positions - old_positions).T
+        hits = target_alive & (kinds <= self.STRAIGHT) & (np.hypot(dx, dy) <= speeds)
+        expired = hits | (~target_alive & (kinds != self.SWEEP))
+
+        # homing projectiles turn toward their target, by no more than their threshold
+        angles = np.arctan2(dy, dx)
+        thresholds = self.thresholds[:count]
+        turn = (angles - rotations + np.pi) % (2 * np.pi) - np.pi
+        turned = np.where(np.abs(turn) <= thresholds, angles, rotations + np.copysign(thresholds, turn))
+        np.copyto(rotations, turned, where=kinds == self.HOMING)
+
+        if hits.any():
+            damage = self.damage.tolist()
+            for row in np.flatnonzero(hits).tolist():
+                self._targets[row].damage(damage[row], self._projectiles[row].damage_type)
+
+        # every surviving projectile moves in a straight line, along its rotation or direction
+        sweeping = (kinds == self.SWEEP)[:, None]
+        steps = np.where(sweeping, self.directions[:count], np.column_stack((np.cos(rotations), np.sin(rotations))))
+        positions += steps * (speeds * ~expired)[:, None]
+
+        # sweeping projectiles hit the enemies along their path, until they leave the grid
+        passing = ~expired & sweeping[:, 0]
+        if passing.any():
+            self._resolve_passing(np.flatnonzero(passing), old_positions, expired, enemies, buckets)
+
+        rows = np.flatnonzero(expired).tolist()
+        expired_projectiles = [self._projectiles[row] for row in rows]
+        self._remove_rows(rows)
+
+        return expired_projectiles
+
+    def _get_target_rows(self, enemies):
+        """(np.ndarray<int>) Returns the row in 'enemies' of each projectile's target, or -1
+        if it has none or its target has left the store"""
+        return np.fromiter((-1 if target is None or target.store is not enemies else target.row
+                            for target in self._targets), dtype=np.intp, count=len(self._targets))
+
+    def _get_targets(self, enemies, target_rows):
+        """Returns the health & position of each projectile's target
+
+        Parameters:
+            enemies (EnemyStore): The store holding every enemy that can be hit
+            target_rows (np.ndarray<int>): The row of each projectile's target, from _get_target_rows
+
+        Return:
+            tuple<np.ndarray<float>, np.ndarray<float>>: (count,) array of health (0 for
+                projectiles without a target) & (count, 2) array of positions
+        """
+        unstored = target_rows < 0
+
+        # unstored rows read the last row of each array, which is overwritten below
+        health = enemies.health[target_rows]
+        positions = enemies.positions[target_rows]
+
+        # targets that have left the store (i.e. escaped) are still chased, like unstored projectiles
+        if unstored.any():
+            for row in np.flatnonzero(unstored).tolist():
+                target = self._targets[row]
+
+                if target is None:
+                    health[row] = 0
+                else:
+                    health[row] = target.health
+                    positions[row] = target.position
+
+        return health, positions
+
+    def _resolve_passing(self, rows, old_positions, expired, enemies, buckets):
+        """Damages the enemies passed by each sweeping projectile in 'rows'
+
+        Parameters:
+            rows (np.ndarray<int>): The rows of the projectiles that moved this step
+            old_positions (np.ndarray<float>): (count, 2) array of positions before moving
+            expired (np.ndarray<bool>): (count,) array of projectiles that have expired,
+                                        updated with those that leave the grid or reach
+                                        their hit limit
+            enemies (EnemyStore): The store holding every enemy that can be hit
+            buckets (BucketManager): The buckets the enemies are divided into
+        """
+        limit = np.array(buckets.get_max_position(), dtype=float)
+        bucket_size = np.array(buckets.get_bucket_size(), dtype=float)
+
+        old, new = old_positions[rows], self.positions[rows]
+
+        # projectiles outside of the grid expire without hitting anything
+        inside = np.all((old >= 0) & (old < limit), axis=1)
+        if not inside.all():
+            expired[rows[~inside]] = True
+            rows, old, new = rows[inside], old[inside], new[inside]
+
+        self._hit_passed_enemies(rows, old, new, expired, enemies, limit, bucket_size)
+
+        # those leaving the grid expire once they have hit the enemies on their way out
+        leaving = ~np.all((new >= 0) & (new < limit), axis=1)
+        expired[rows[leaving]] = True
+
+    def _hit_passed_enemies(self, rows, old, new, expired, enemies, limit, bucket_size):
+        """Damages the enemies whose bounding box each projectile's path crosses
+
+        Parameters:
+            rows (np.ndarray<int>): The rows of the projectiles that moved this step, from within the grid
+            old (np.ndarray<float>): (n, 2) array of each projectile's position before moving
+            new (np.ndarray<float>): (n, 2) array of each projectile's position after moving
+            expired (np.ndarray<bool>): (count,) array of projectiles that have expired
+            enemies (EnemyStore): The store holding every enemy that can be hit
+            limit (np.ndarray<float>): The (x, y) size of the area divided into buckets
+            bucket_size (np.ndarray<float>): The (width, height) of each bucket
+        """
+        enemy_count = len(enemies)
+        if not len(rows) or not enemy_count:
+            return
+
+        enemy_positions = enemies.positions[:enemy_count]
+        enemy_buckets = self._get_buckets(enemy_positions, limit, bucket_size)
+
+        order = np.argsort(enemy_buckets, kind='stable')
+        sorted_buckets = enemy_buckets[order]
+
+        # paths leaving the grid only pass through the buckets up to its edge
+        last_bucket = np.ceil(limit / bucket_size) - 1
+        old_buckets, new_buckets = np.floor(old / bucket_size), np.clip(np.floor(new / bucket_size), 0, last_bucket)
+
+        # (projectile, enemy) pairs in every bucket along each projectile's path
+        indices, enemy_rows = self._join_path_buckets(np.arange(len(rows)), old_buckets, new_buckets,
+                                                      limit[1], sorted_buckets, order)
+
+        if not len(indices):
+            return
+
+        # projectiles hit enemies whose bounding box their path crosses
+        sizes = enemies.sizes[enemy_rows]
+        top_left = enemy_positions[enemy_rows] - np.floor_divide(sizes, 2)
+        hit = segments_intersect_boxes(old[indices], new[indices], top_left, top_left + sizes)
+
+        self._apply_passing_hits(rows.tolist(), indices[hit].tolist(), enemy_rows[hit].tolist(), expired, enemies)
+
+    @classmethod
+    def _join_path_buckets(cls, indices, old_buckets, new_buckets, stride, sorted_buckets, order):
+        """Returns every (projectile, enemy) pair where the enemy's bucket lies within the
+        range of buckets between the projectile's old & new buckets
+
+        For projectiles moving axially, these are exactly the buckets along their path.
+
+        Parameters:
+            indices (np.ndarray<int>): The index of each projectile to join
+            old_buckets (np.ndarray<float>): (n, 2) array of the (column, row) bucket before moving
+            new_buckets (np.ndarray<float>): (n, 2) array of the (column, row) bucket after moving
+            stride (float): The flat bucket index step between columns (see _get_buckets)
+            sorted_buckets (np.ndarray<float>): The flat bucket of each enemy, in ascending order
+            order (np.ndarray<int>): The enemy row of each of 'sorted_buckets'
+
+        Return:
+            tuple<np.ndarray<int>, np.ndarray<int>>: (indices, enemy rows) pair, of the
+                projectile index & row of the enemy in each pair
+        """
+        if not len(indices):
+            return indices, indices
+
+        low = np.minimum(old_buckets[indices], new_buckets[indices]).astype(np.intp)
+        spans = np.abs(new_buckets[indices] - old_buckets[indices]).astype(np.intp) + 1
+
+        # expand each projectile into one entry per bucket in its range
+        counts = spans[:, 0] * spans[:, 1]
+        owners = np.repeat(np.arange(len(indices)), counts)
+        offsets = np.arange(len(owners)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        columns = low[owners, 0] + offsets // spans[owners, 1]
+        rows = low[owners, 1] + offsets % spans[owners, 1]
+
+        pairs, enemy_rows = cls._join_buckets(columns * stride + rows, sorted_buckets, order)
+        return indices[owners[pairs]], enemy_rows
+
+    @staticmethod
+    def _get_buckets(positions, limit, bucket_size):
+        """Returns the index of the bucket containing each position, flattened column-major
+
+        Parameters:
+            positions (np.ndarray<float>): (n, 2) array of positions
+            limit (np.ndarray<float>): The (x, y) size of the area divided into buckets
+            bucket_size (np.ndarray<float>): The (width, height) of each bucket
+
+        Return:
+            np.ndarray<float>: (n,) array of bucket indices, or -1 for positions outside of the area
+        """
+        indices = np.floor(positions / bucket_size)
+        flat = indices[:, 0] * limit[1] + indices[:, 1]
+        flat[~((positions >= 0) & (positions < limit)).all(axis=1)] = -1
+
+        return flat
+
+    @staticmethod
+    def _join_buckets(buckets, sorted_buckets, order):
+        """Returns every (projectile, enemy) pair sharing a bucket
+
+        Parameters:
+            buckets (np.ndarray<float>): (n,) array of the bucket of each projectile
+            sorted_buckets (np.ndarray<float>): The bucket of each enemy, in ascending order
+            order (np.ndarray<int>): The enemy row of each of 'sorted_buckets'
+
+        Return:
+            tuple<np.ndarray<int>, np.ndarray<int>>: (indices, enemy rows) pair, of the index
+                into 'buckets' & row of the enemy in each pair
+        """
+        starts = np.searchsorted(sorted_buckets, buckets, side='left')
+        counts = np.searchsorted(sorted_buckets, buckets, side='right') - starts
+
+        indices = np.repeat(np.arange(len(buckets)), counts)
+
+        # the position of each pair within its projectile's run of enemies
+        offsets = np.arange(len(indices)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        return indices, order[starts[indices] + offsets]
+
+    def _apply_passing_hits(self, rows, indices, enemy_rows, expired, enemies):
+        """Damages each enemy hit by a sweeping projectile
+
+        Each projectile only hits an enemy once, expiring once it reaches its hit limit.
+
+        Parameters:
+            rows (list<int>): The row of each projectile that passed over enemies
+            indices (list<int>): The index into 'rows' of each hit
+            enemy_rows (list<int>): The row in 'enemies' of the enemy hit by each hit
+            expired (np.ndarray<bool>): (count,) array of projectiles that have expired
+            enemies (EnemyStore): The store holding every enemy that can be hit
+        """
+        damage = self.damage.tolist()
+        hit_limits = self.hit_limits.tolist()
+
+        for i, enemy_row in zip(indices, enemy_rows):
+            row = rows[i]
+            enemy = enemies.get_enemy(enemy_row)
+
+            damaged = self._damaged[row]
+            if enemy in damaged or expired[row]:
+                continue
+
+            enemy.damage(damage[row], self._projectiles[row].damage_type)
+            damaged.add(enemy)
+
+            if hit_limits[row] and len(damaged) >= hit_limits[row]:
+                expired[row] = True
@@ -2,17 +2,80 @@
 
 from utilities import vector_length
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for batched containment checks
+    np = None
+
 __author__ = "Benjamin Martin"
 __copyright__ = "Copyright 2018, The University of Queensland"
 __license__ = "MIT"
 __version__ = "1.1.0"
 
 
+def get_box_distances(top_left, bottom_right):
+    """Returns the distances from the origin to the nearest & farthest points of a box
+
+    Parameters:
+        top_left (tuple<float, float>): The top-left corner of the box
+        bottom_right (tuple<float, float>): The bottom-right corner of the box
+
+    Return:
+        tuple<float, float>: (nearest, farthest) distance pair
+    """
+    nearest = []
+    farthest = []
+    for low, high in zip(top_left, bottom_right):
+        nearest.append(low if low > 0 else -high if high < 0 else 0)
+        farthest.append(max(-low, high))
+
+    return vector_length(nearest), vector_length(farthest)
+
+
 class AbstractRange:
-    """Abstractly-shaped area range area"""
+    """Abstractly-shaped area range area
+
+    Ranges are shared between every tower of a type, so should not be modified after
+    construction.
+    """
     def contains(self, point):
         """(bool) Returns True iff 'point' exists within this range (from origin)"""
-        raise NotImplementedError("contains must be implemented by a subclass")
+        x, y = point
+        return self.contains_offset(x, y)
+
+    def contains_offset(self, x, y):
+        """(bool) Returns True iff the point ('x', 'y') exists within this range (from origin)"""
+        raise NotImplementedError("contains_offset must be implemented by a subclass")
+
+    def contains_many(self, xs, ys):
+        """Checks whether many points exist within this range (from origin) at once
+
+        Parameters:
+            xs (np.ndarray<float>): The x coordinate of each point, of any shape
+            ys (np.ndarray<float>): The y coordinate of each point, of the same shape as xs
+
+        Return:
+            np.ndarray<bool>: True for each point that exists within this range
+        """
+        return np.vectorize(self.contains_offset, otypes=[bool])(xs, ys)
+
+    def get_bounding_radius(self):
+        """(float) Returns the smallest distance, along either axis, from the origin that
+        encloses this range, or None if this range is unbounded"""
+        return None
+
+    def intersects_box(self, top_left, bottom_right):
+        """(bool) Returns True iff the box may contain a point within this range (from origin)
+
+        Defaults to True, so that ranges which do not override this are always checked
+        point by point.
+        """
+        return True
+
+    def contains_box(self, top_left, bottom_right):
+        """(bool) Returns True iff every point in the box (excluding its bottom & right
+        edges) exists within this range (from origin)"""
+        return False
 
 
 class CircularRange(AbstractRange):
@@ -24,10 +87,32 @@ class CircularRange(AbstractRange):
             radius (float): The radius of the circle underpinning the range
         """
         self.radius = radius
+        self._radius_squared = radius ** 2
 
-    def contains(self, point):
-        """(bool) Returns True iff 'point' exists within this range (from origin)"""
-        return vector_length(point) <= self.radius
+    def contains_offset(self, x, y):
+        """(bool) Returns True iff the point ('x', 'y') exists within this range (from origin)"""
+        return x * x + y * y <= self._radius_squared
+
+    def contains_many(self, xs, ys):
+        """(np.ndarray<bool>) Returns True for each point ('xs[i]', 'ys[i]') that exists
+        within this range (from origin)"""
+        return xs * xs + ys * ys <= self._radius_squared
+
+    def get_bounding_radius(self):
+        """(float) Returns the smallest distance, along either axis, from the origin that
+        encloses this range"""
+        return self.radius
+
+    def intersects_box(self, top_left, bottom_right):
+        """(bool) Returns True iff the box may contain a point within this range (from origin)"""
+        nearest, _ = get_box_distances(top_left, bottom_right)
+        return nearest <= self.radius
+
+    def contains_box(self, top_left, bottom_right):
+        """(bool) Returns True iff every point in the box (excluding its bottom & right
+        edges) exists within this range (from origin)"""
+        _, farthest = get_box_distances(top_left, bottom_right)
+        return farthest <= self.radius
 
 
 class PlusRange(AbstractRange):
@@ -50,15 +135,49 @@ class PlusRange(AbstractRange):
         self.inner_radius = inner_radius
         self.outer_radius = outer_radius
 
-    def contains(self, point):
-        """(bool) Returns True iff 'point' exists within this range (from origin)"""
+    def contains_offset(self, x, y):
+        """(bool) Returns True iff the point ('x', 'y') exists within this range (from origin)"""
         inn = self.inner_radius
         out = self.outer_radius
 
-        x, y = point
-
         return (-inn < x < inn and -out < y < out) or (-out < x < out and -inn < y < inn)
 
+    def contains_many(self, xs, ys):
+        """(np.ndarray<bool>) Returns True for each point ('xs[i]', 'ys[i]') that exists
+        within this range (from origin)"""
+        inn = self.inner_radius
+        out = self.outer_radius
+
+        xs, ys = abs(xs), abs(ys)
+
+        return ((xs < inn) & (ys < out)) | ((xs < out) & (ys < inn))
+
+    def get_bounding_radius(self):
+        """(float) Returns the smallest distance, along either axis, from the origin that
+        encloses this range"""
+        return self.outer_radius
+
+    def _get_bars(self):
+        """Yields the (half width, half height) of each bar of the plus"""
+        yield self.inner_radius, self.outer_radius
+        yield self.outer_radius, self.inner_radius
+
+    def intersects_box(self, top_left, bottom_right):
+        """(bool) Returns True iff the box may contain a point within this range (from origin)"""
+        (left, top), (right, bottom) = top_left, bottom_right
+
+        return any(left < width and right > -width and top < height and bottom > -height
+                   for width, height in self._get_bars())
+
+    def contains_box(self, top_left, bottom_right):
+        """(bool) Returns True iff every point in the box (excluding its bottom & right
+        edges) exists within this range (from origin)"""
+        (left, top), (right, bottom) = top_left, bottom_right
+
+        # bottom & right edges are compared strictly, to remain safe against rounding
+        return any(-width < left and right < width and -height < top and bottom < height
+                   for width, height in self._get_bars())
+
 
 class DonutRange(AbstractRange):
     """Donut shape area"""
@@ -72,6 +191,31 @@ class DonutRange(AbstractRange):
         self.inner_radius = inner_radius
         self.outer_radius = outer_radius
 
-    def contains(self, point):
-        """(bool) Returns True iff 'point' exists within this range (from origin)"""
-        return self.inner_radius <= vector_length(point) <= self.outer_radius
+        self._inner_squared = inner_radius ** 2
+        self._outer_squared = outer_radius ** 2
+
+    def contains_offset(self, x, y):
+        """(bool) Returns True iff the point ('x', 'y') exists within this range (from origin)"""
+        return self._inner_squared <= x * x + y * y <= self._outer_squared
+
+    def contains_many(self, xs, ys):
+        """(np.ndarray<bool>) Returns True for each point ('xs[i]', 'ys[i]') that exists
+        within this range (from origin)"""
+        distances = xs * xs + ys * ys
+        return (self._inner_squared <= distances) & (distances <= self._outer_squared)
+
+    def get_bounding_radius(self):
+        """(float) Returns the smallest distance, along either axis, from the origin that
+        encloses this range"""
+        return self.outer_radius
+
+    def intersects_box(self, top_left, bottom_right):
+        """(bool) Returns True iff the box may contain a point within this range (from origin)"""
+        nearest, farthest = get_box_distances(top_left, bottom_right)
+        return nearest <= self.outer_radius and farthest >= self.inner_radius
+
+    def contains_box(self, top_left, bottom_right):
+        """(bool) Returns True iff every point in the box (excluding its bottom & right
+        edges) exists within this range (from origin)"""
+        nearest, farthest = get_box_distances(top_left, bottom_right)
+        return self.inner_radius <= nearest and farthest <= self.outer_radius
@@ -0,0 +1,115 @@
+"""
+Routing of enemies around the towers that can damage them
+
+Each set of enemy immunities gets its own WeightedPath, where travelling through a
+cell costs more for every tower able to damage such enemies there. The paths (&
+their flow fields) are built lazily & shared by every enemy class with the same
+immunities, until the towers next change, so moving an enemy remains a single
+lookup of its best delta.
+"""
+
+import math
+
+from flow_field import FlowField
+from path import WeightedPath
+
+__author__ = "Haoxi Tan"
+
+
+class Routes:
+    """Weighted paths, keyed by enemy immunities (see AbstractEnemy.immunities)"""
+
+    def __init__(self, start, end, get_neighbours, towers, grid, threat_cost=2):
+        """Constructor
+
+        Parameters:
+            start (tuple<int, int>|list<tuple<int, int>>): The starting position(s)
+            end (tuple<int, int>|list<tuple<int, int>>): The end position(s)
+            get_neighbours (func<tuple<int, int>>): Returns the neighbours of a position,
+                                                    ignoring towers
+            towers (dict<tuple<int, int>, AbstractTower>): The towers to route around,
+                                                           mapped by their cell
+            grid (GridCoordinateTranslator): The grid the towers are on
+            threat_cost (float): The additional cost of travelling through a cell for
+                                 each tower that can damage an enemy there
+        """
+        self._start = start
+        self._end = end
+        self._get_neighbours = get_neighbours
+        self._towers = towers
+        self._grid = grid
+        self.threat_cost = threat_cost
+
+        self._paths = {}
+        self._flow_fields = {}
+
+    def clear(self):
+        """Discards every path, i.e. because the towers have changed"""
+        self._paths.clear()
+        self._flow_fields.clear()
+
+    def get_threats(self, immunities):
+        """(dict<tuple<int, int>, int>) Returns the number of towers able to damage an
+        enemy with 'immunities' in each cell, omitting cells without any
+
+        Parameters:
+            immunities (frozenset<str>): The types of damage that don't harm the enemy
+        """
+        threats = {}
+        columns, rows = self._grid.cells
+
+        for (column, row), tower in self._towers.items():
+            if tower.damage_type is None or tower.damage_type in immunities:
+                continue
+
+            radius = tower.range.get_bounding_radius()
+            if radius is None:
+                cells = ((x, y) for x in range(columns) for y in range(rows))
+            else:
+                # range is measured from the centre of the tower's cell
+                reach = math.ceil(radius)
+                cells = ((x, y)
+                         for x in range(max(column - reach, 0), min(column + reach + 1, columns))
+                         for y in range(max(row - reach, 0), min(row + reach + 1, rows)))
+
+            for x, y in cells:
+                if tower.range.contains((x - column, y - row)):
+                    threats[x, y] = threats.get((x, y), 0) + 1
+
+        return threats
+
+    def _get_neighbours_avoiding_towers(self, cell, from_=True):
+        """Yields the positions neighbouring 'cell' that don't contain a tower"""
+        for neighbour in self._get_neighbours(cell, from_=from_):
+            if neighbour not in self._towers:
+                yield neighbour
+
+    def get_path(self, immunities):
+        """(WeightedPath) Returns the path for enemies with 'immunities', building it if necessary
+
+        Parameters:
+            immunities (frozenset<str>): The types of damage that don't harm the enemy
+        """
+        path = self._paths.get(immunities)
+
+        if path is None:
+            threats = self.get_threats(immunities)
+            threat_cost = self.threat_cost
+
+            def get_cost(cell):
+                return 1 + threat_cost * threats.get(cell, 0)
+
+            path = self._paths[immunities] = WeightedPath(self._start, self._end,
+                                                          self._get_neighbours_avoiding_towers, get_cost)
+
+        return path
+
+    def get_flow_field(self, immunities):
+        """(FlowField) Returns the flow field for enemies with 'immunities', compiling it
+        if necessary"""
+        flow_field = self._flow_fields.get(immunities)
+
+        if flow_field is None:
+            flow_field = self._flow_fields[immunities] = FlowField(self.get_path(immunities), self._grid)
+
+        return flow_field
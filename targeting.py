@@ -0,0 +1,79 @@
+"""
+Batched targeting for towers
+
+A TargetingPass finds the enemies in range of every tower with one vectorised
+operation per tower range, rather than each tower separately scanning the enemy
+buckets when it steps.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for batched targeting
+    np = None
+
+__author__ = "Haoxi Tan"
+
+
+class TargetingPass:
+    """Assigns each tower the enemies within its range, nearest first"""
+
+    def __init__(self):
+        """Constructor
+
+        Raises:
+            ImportError if numpy is not installed
+        """
+        if np is None:
+            raise ImportError("TargetingPass requires numpy")
+
+    @staticmethod
+    def group_by_range(towers):
+        """(dict<AbstractRange, list<AbstractTower>>) Returns 'towers' grouped by their range
+
+        Towers of the same type share a range object, so each group can be checked with
+        a single towers x enemies operation.
+        """
+        groups = {}
+        for tower in towers:
+            groups.setdefault(tower.range, []).append(tower)
+
+        return groups
+
+    def assign(self, towers, enemies):
+        """Sets each tower's candidate targets to the enemies within its range
+
+        Parameters:
+            towers (iterable<AbstractTower>): The towers to find targets for
+            enemies (iterable<AbstractEnemy>): The enemies that can be targeted
+        """
+        enemies = list(enemies)
+
+        if not enemies:
+            for tower in towers:
+                tower.set_candidates([])
+            return
+
+        positions = np.array([enemy.position for enemy in enemies], dtype=float)
+
+        for range_, group in self.group_by_range(towers).items():
+            origins = np.array([tower.position for tower in group], dtype=float)
+            cell_sizes = np.array([tower.cell_size for tower in group], dtype=float)[:, None]
+
+            # (towers, enemies) offsets, in cells, mirroring AbstractTower.is_position_in_range
+            dx = (positions[None, :, 0] - origins[:, None, 0]) / cell_sizes
+            dy = (positions[None, :, 1] - origins[:, None, 1]) / cell_sizes
+
+            in_range = range_.contains_many(dx, dy)
+            distances = dx * dx + dy * dy
+
+            for tower, mask, tower_distances in zip(group, in_range, distances):
+                indices = np.flatnonzero(mask)
+                indices = indices[np.argsort(tower_distances[indices], kind='stable')]
+
+                tower.set_candidates([enemies[i] for i in indices.tolist()])
+
+    @staticmethod
+    def clear(towers):
+        """Clears each tower's candidate targets, so that they search for targets directly"""
+        for tower in towers:
+            tower.set_candidates(None)
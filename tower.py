@@ -9,9 +9,10 @@ from typing import Union
 
 from core import Unit, Point2D, UnitManager
 from enemy import AbstractEnemy
+from pool import create
 from range_ import AbstractRange, CircularRange, PlusRange, DonutRange
 from utilities import Countdown, euclidean_distance, rotate_toward, angle_between, polar_to_rectangular, \
-    rectangles_intersect
+    get_segment_box_hits
 
 
 __author__ = "Benjamin Martin"
@@ -20,6 +21,24 @@ __license__ = "MIT"
 __version__ = "1.1.1"
 
 
+def get_units_crossed(units, start, end):
+    """(list<Unit>) Returns the units whose bounding box the segment from 'start' to 'end'
+    crosses (see get_segment_box_hits)
+
+    Parameters:
+        units (list<Unit>): The units to test, i.e. those in the buckets along the segment
+        start (tuple<num, num>): The position the segment starts at
+        end (tuple<num, num>): The position the segment ends at
+    """
+    if not units:
+        return []
+
+    top_left, bottom_right = zip(*(unit.get_bounding_box() for unit in units))
+    hits = get_segment_box_hits(start, end, top_left, bottom_right)
+
+    return [unit for unit, hit in zip(units, hits) if hit]
+
+
 class AbstractTower(Unit):
     """Abstract representation for a tower"""
     name: str
@@ -35,7 +54,22 @@ class AbstractTower(Unit):
 
     range: AbstractRange
 
+    # The type of damage dealt to enemies (see AbstractEnemy.immunities), or None if the
+    # tower deals no damage
+    damage_type = None
+
+    # How to choose between enemies in range (see get_prioritised_unit_in_range),
+    # or None to choose whichever is found first
+    target_priority = None
+
     def __init__(self, cell_size: int, grid_size=(.9, .9), rotation=math.pi * .25, base_damage=1, level: int = 1):
+        # (manager, position) the bucket coverage was computed for, & the coverage itself
+        self._coverage_key = None
+        self._coverage = None
+
+        # enemies in range, nearest first, when assigned by a batched targeting pass
+        self._candidates = None
+
         super().__init__(None, grid_size, cell_size)
 
         self.rotation = rotation
@@ -46,6 +80,67 @@ class AbstractTower(Unit):
         self.base_damage = base_damage
         self.level = level
 
+    def set_cell_size(self, cell_size: int):
+        """Sets the cell size for this unit to 'cell_size'"""
+        super().set_cell_size(cell_size)
+        self.invalidate_coverage()
+
+    def invalidate_coverage(self):
+        """Discards this tower's precomputed bucket coverage"""
+        self._coverage_key = None
+        self._coverage = None
+
+    def compute_coverage(self, manager: UnitManager):
+        """Precomputes the buckets of 'manager' that this tower's range can touch
+
+        Parameters:
+            manager (UnitManager): The manager whose buckets to cover
+        """
+        x, y = self.position
+        radius = self.range.get_bounding_radius()
+        if radius is not None:
+            radius *= self.cell_size
+
+        coverage = []
+        for index in manager.get_closish_indices(self.position, radius=radius):
+            (left, top), (right, bottom) = manager.get_bucket_box(index)
+            top_left = (left - x) / self.cell_size, (top - y) / self.cell_size
+            bottom_right = (right - x) / self.cell_size, (bottom - y) / self.cell_size
+
+            if self.range.intersects_box(top_left, bottom_right):
+                coverage.append((manager.get_bucket(index), self.range.contains_box(top_left, bottom_right)))
+
+        self._coverage_key = manager, self.position
+        self._coverage = coverage
+
+    def get_coverage(self, manager: UnitManager):
+        """Returns the buckets of 'manager' that this tower's range can touch, roughly
+        nearest first, computing them if necessary
+
+        Parameters:
+            manager (UnitManager): The manager whose buckets to cover
+
+        Return:
+            list<tuple<set<Unit>, bool>>: (bucket, fully_covered) pair for each bucket, where
+                                          fully_covered is True iff the bucket lies entirely
+                                          within this tower's range
+        """
+        key = self._coverage_key
+        if key is None or key[0] is not manager or key[1] != self.position:
+            self.compute_coverage(manager)
+
+        return self._coverage
+
+    def set_candidates(self, candidates):
+        """Sets the enemies in range of this tower, which get_units_in_range yields
+        instead of searching for them, until cleared
+
+        Parameters:
+            candidates (list<AbstractEnemy>): The enemies in range, nearest first,
+                                              or None to search for enemies again
+        """
+        self._candidates = candidates
+
     def get_damage(self):
         """(int) Returns the amount of damage this tower can deal"""
         return self.level * self.base_damage
@@ -56,9 +151,26 @@ class AbstractTower(Unit):
 
     def is_position_in_range(self, pixel_position):
         """(bool) Returns True iff 'pixel_position' exists within this range"""
-        point = (Point2D(*pixel_position) - Point2D(*self.position)) / self.cell_size
+        x, y = pixel_position
+        tower_x, tower_y = self.position
+        cell_size = self.cell_size
 
-        return self.range.contains(tuple(point))
+        return self.range.contains_offset((x - tower_x) / cell_size, (y - tower_y) / cell_size)
+
+    def are_positions_in_range(self, pixel_positions):
+        """Checks whether many pixel positions exist within this range at once
+
+        Parameters:
+            pixel_positions (np.ndarray<float>): (n, 2) array of (x, y) pixel positions
+
+        Return:
+            np.ndarray<bool>: True for each position that exists within this range
+        """
+        tower_x, tower_y = self.position
+        cell_size = self.cell_size
+
+        return self.range.contains_many((pixel_positions[:, 0] - tower_x) / cell_size,
+                                        (pixel_positions[:, 1] - tower_y) / cell_size)
 
     def step(self, data):
         """Performs time step for tower
@@ -66,38 +178,109 @@ class AbstractTower(Unit):
         """
 
     def get_units_in_range(self, enemies: UnitManager, limit=0):
-        """(AbstractEnemy) Yields enemies that are in-range of this tower
+        """(AbstractEnemy) Yields enemies that are in-range of this tower, roughly
+        nearest first
         
         Parameters:
             enemies (UnitManager): All enemies in the game
+            limit (int): The maximum number of enemies to yield, or 0 for no limit
             
         Note:
-            For efficiency, method could be extended to first convert to potentially
-            valid buckets, and only search those rather than iterating through every enemy.
+            Only buckets that can intersect this tower's range are searched, and enemies
+            in buckets that lie entirely within range are not checked individually.
+            If candidates have been set (see set_candidates), they are yielded instead.
         """
+        if self._candidates is not None:
+            yield from self._candidates[:limit] if limit else self._candidates
+            return
 
         count = 0
-        for enemy in enemies.get_closish(self.position):
-            if self.is_position_in_range(enemy.position):
-                yield enemy
-                count += 1
-                if limit == count:
-                    break
-
-    def get_unit_in_range(self, units) -> Union[AbstractEnemy, None]:
+        for bucket, fully_covered in self.get_coverage(enemies):
+            for enemy in bucket:
+                if fully_covered or self.is_position_in_range(enemy.position):
+                    yield enemy
+                    count += 1
+                    if limit == count:
+                        return
+
+    def requires_progress(self):
+        """(bool) Returns True iff this tower's target_priority needs each enemy's remaining
+        path distance (see get_prioritised_unit_in_range)"""
+        return self.target_priority in ('first', 'last')
+
+    def get_unit_in_range(self, units, progress=None) -> Union[AbstractEnemy, None]:
         """(AbstractEnemy) Returns an enemy that is in-range of this tower, else None if no
         such enemy is in range.
         
-        Enemy is not guaranteed to be the closest to tower."""
+        Enemy is chosen by this tower's target_priority if it has one (see
+        get_prioritised_unit_in_range), otherwise it is not guaranteed to be the closest
+        to tower.
+
+        Parameters:
+            units (UnitManager): All enemies in the game
+            progress (ProgressIndex): The remaining path distance of each enemy
+        """
+        if self.target_priority is not None:
+            return self.get_prioritised_unit_in_range(units, self.target_priority, progress=progress)
+
         for unit in self.get_units_in_range(units, limit=1):
             return unit
 
         return None
 
-    def _get_target(self, units) -> Union[AbstractEnemy, None]:
+    def get_prioritised_unit_in_range(self, units, priority, progress=None) -> Union[AbstractEnemy, None]:
+        """(AbstractEnemy) Returns the in-range enemy that best matches 'priority', else
+        None if no enemy is in range
+
+        Parameters:
+            units (UnitManager): All enemies in the game
+            priority (str): One of:
+                - 'first': the enemy with the least remaining path distance
+                - 'last': the enemy with the most remaining path distance
+                - 'strongest': the enemy with the most health
+                - 'closest': the enemy closest to this tower
+            progress (ProgressIndex): The remaining path distance of each enemy, required
+                                      for 'first' & 'last'
+
+        Raises:
+            ValueError if 'priority' is unknown, or requires 'progress' when it is None
+        """
+        if priority in ('first', 'last'):
+            if progress is None:
+                raise ValueError(f"Target priority {priority!r} requires a ProgressIndex")
+
+            # walk the index from the preferred end, stopping at the first enemy in range
+            for enemy in (iter(progress) if priority == 'first' else reversed(progress)):
+                if self.is_position_in_range(enemy.position):
+                    return enemy
+
+            # enemies missing from the index are off the path, so are only chosen as a last resort
+            for enemy in self.get_units_in_range(units, limit=1):
+                return enemy
+
+            return None
+
+        candidates = self.get_units_in_range(units)
+
+        if priority == 'closest':
+            x, y = self.position
+
+            def get_distance(enemy):
+                enemy_x, enemy_y = enemy.position
+                return (enemy_x - x) ** 2 + (enemy_y - y) ** 2
+
+            return min(candidates, key=get_distance, default=None)
+
+        if priority == 'strongest':
+            return max(candidates, key=lambda enemy: enemy.health, default=None)
+
+        raise ValueError(f"Unknown target priority {priority!r}")
+
+    def _get_target(self, units, progress=None) -> Union[AbstractEnemy, None]:
         """Returns previous target, else selects new one if previous is invalid
         
         Invalid target is one of:
+            - no longer among 'units' (i.e. dead, escaped or released to an ObjectPool)
             - dead
             - out-of-range
         
@@ -107,9 +290,10 @@ class AbstractTower(Unit):
                            Otherwise, returns None
         """
         if self._target is None \
+                or self._target not in units \
                 or self._target.is_dead() \
                 or not self.is_position_in_range(self._target.position):
-            self._target = self.get_unit_in_range(units)
+            self._target = self.get_unit_in_range(units, progress=progress)
 
         return self._target
 
@@ -120,6 +304,9 @@ class SimpleTower(AbstractTower):
     colour = '#E94A1F'  # Coquelicot
 
     range = CircularRange(1.5)
+
+    damage_type = 'projectile'
+    target_priority = 'first'
     cool_down_steps = 0
 
     base_cost = 30
@@ -134,7 +321,7 @@ class SimpleTower(AbstractTower):
         """Rotates toward 'target' and attacks if possible"""
         self.cool_down.step()
 
-        target = self.get_unit_in_range(data.enemies)
+        target = self.get_unit_in_range(data.enemies, progress=data.progress)
 
         if target is None:
             return
@@ -151,19 +338,43 @@ class AbstractObstacle(Unit):
     """An obstacle created by a tower"""
     speed = None
 
+    # The type of damage dealt to enemies, i.e. projectile, explosive
+    damage_type = None
+
+    # The ProjectileSystem holding this obstacle's attributes, if any (see projectiles.ProjectileSystem)
+    _store = None
+
+    # The most steps this obstacle can persist for before the game culls it, or None if unlimited
+    max_lifetime = None
+
     def __init__(self, position, grid_size, cell_size, grid_speed: Union[int, float] = 0, rotation=0, damage=0):
         self.grid_speed = grid_speed
+        self.age = 0
 
         super().__init__(position, grid_size, cell_size)
 
         self.rotation = rotation
         self.damage = damage
 
+    @property
+    def store(self):
+        """(ProjectileSystem) Returns the system holding this obstacle's attributes, or None
+        if it isn't stored"""
+        return self._store
+
     def set_cell_size(self, cell_size: int):
         """Sets the cell size for this unit to 'cell_size'"""
         super().set_cell_size(cell_size)
         self.speed = cell_size * self.grid_speed
 
+    def forget(self, enemies):
+        """Drops any references this obstacle keeps to 'enemies', i.e. because they are
+        about to be reused for new enemies
+
+        Parameters:
+            enemies (set<AbstractEnemy>): The enemies to forget
+        """
+
     def step(self, units):
         """Performs a time step for this obstacle
         
@@ -183,8 +394,13 @@ class Missile(AbstractObstacle):
     name = "Missile"
     colour = '#F5F0E5'  # Eburnean
 
+    damage_type = 'explosive'
+
     rotation_threshold = (1 / 3) * math.pi
 
+    # long enough to chase a target across a large grid, but not to circle it forever
+    max_lifetime = 300
+
     def __init__(self, position, cell_size, target: AbstractEnemy, size=.2,
                  rotation: Union[int, float] = 0, grid_speed=.1, damage=10):
         super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
@@ -212,7 +428,7 @@ class Missile(AbstractObstacle):
         radius = euclidean_distance(self.position, self.target.position)
 
         if radius <= self.speed:
-            self.target.damage(self.damage, 'explosive')
+            self.target.damage(self.damage, self.damage_type)
             return False, None
 
         # Rotate toward target and move
@@ -237,6 +453,9 @@ class MissileTower(SimpleTower):
     level_cost = 60
 
     range = DonutRange(1.5, 4.5)
+    target_priority = 'strongest'
+
+    damage_type = 'explosive'
 
     rotation_threshold = (1 / 3) * math.pi
 
@@ -245,10 +464,11 @@ class MissileTower(SimpleTower):
 
         self._target: AbstractEnemy = None
 
-    def _get_target(self, units) -> Union[AbstractEnemy, None]:
+    def _get_target(self, units, progress=None) -> Union[AbstractEnemy, None]:
         """Returns previous target, else selects new one if previous is invalid
         
         Invalid target is one of:
+            - no longer among 'units' (i.e. dead, escaped or released to an ObjectPool)
             - dead
             - out-of-range
         
@@ -258,9 +478,10 @@ class MissileTower(SimpleTower):
                            Otherwise, returns None
         """
         if self._target is None \
+                or self._target not in units \
                 or self._target.is_dead() \
                 or not self.is_position_in_range(self._target.position):
-            self._target = self.get_unit_in_range(units)
+            self._target = self.get_unit_in_range(units, progress=progress)
 
         return self._target
 
@@ -268,7 +489,7 @@ class MissileTower(SimpleTower):
         """Rotates toward 'target' and fires missile if possible"""
         self.cool_down.step()
 
-        target = self._get_target(units.enemies)
+        target = self._get_target(units.enemies, progress=units.progress)
 
         if target is None:
             return None
@@ -285,7 +506,7 @@ class MissileTower(SimpleTower):
         self.cool_down.start()
 
         # Spawn missile on tower
-        missile = Missile(self.position, self.cell_size, target, rotation=self.rotation,
+        missile = create(units.pool, Missile, self.position, self.cell_size, target, rotation=self.rotation,
                           damage=self.get_damage(), grid_speed=.3)
 
         # Move missile to outer edge of tower
@@ -297,33 +518,46 @@ class MissileTower(SimpleTower):
 
 
 
-class Pulse(AbstractObstacle):
-    """A projectile fired from a PulseTower that damages all enemies it collides with"""
-    name = "Pulse"
-    colour = '#7F191C'  # Falu
-
-    NORTH = (0, -1)
-    SOUTH = (0, 1)
-    EAST = (1, 0)
-    WEST = (-1, 0)
+class PiercingObstacle(AbstractObstacle):
+    """An obstacle that travels in a fixed direction until it leaves the grid, damaging
+    every enemy it passes through (at most once each)
 
-    DIRECTIONS = [NORTH, EAST, SOUTH, WEST]
+    Enemies are found along the whole segment travelled each step, so fast obstacles
+    can't skip over enemies between their old & new positions.
+    """
 
-    base_damage = 30
+    def __init__(self, position, grid_size, cell_size, direction, grid_speed: Union[int, float] = 0,
+                 rotation=0, damage=0, hits=0):
+        """Construct a piercing obstacle
 
-    def __init__(self, position, cell_size, direction, size=.04,
-                 rotation: Union[int, float] = 0, grid_speed=.35, damage=30, hits=20):
-        super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
+        Parameters:
+            direction (tuple<num, num>): The unit vector to travel along
+            hits (int): The number of enemies to damage before expiring, or 0 for no limit
+        """
+        super().__init__(position, grid_size, cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
 
         self.direction = direction
         self._damaged = set()
         self._hit_count = hits
 
+    @property
+    def damaged(self):
+        """(set<AbstractEnemy>) Returns the enemies this obstacle has hit, which it won't hit again"""
+        return self._damaged
+
+    @property
+    def hit_limit(self):
+        """(int) Returns the number of enemies to damage before expiring, or 0 for no limit"""
+        return self._hit_count
+
+    def forget(self, enemies):
+        self._damaged -= enemies
+
     def step(self, units):
-        """Performs a time step for this pulse
+        """Performs a time step for this obstacle
 
         Moves according to direction, damaging any enemies that are collided with along the way
-        If hits is non-zero, this pulse expires if it has the number of enemies hit is at least 'hits',
+        If hits is non-zero, this obstacle expires if it has the number of enemies hit is at least 'hits',
         else continues until off the grid
 
         Parameters:
@@ -339,36 +573,42 @@ class Pulse(AbstractObstacle):
         x, y = old_position = self.position
         self.position = new_position = x + dx, y + dy
 
-        try:
-            old_bucket = units.enemies.get_bucket_for_position(old_position)
-            new_bucket = units.enemies.get_bucket_for_position(self.position)
-        except IndexError:
-            return False, None
+        # broadphase: every enemy in a bucket along the path (within the grid), then exact
+        # segment vs box tests
+        candidates = [enemy for bucket in units.enemies.get_buckets_along(old_position, new_position)
+                      for enemy in bucket if enemy not in self._damaged]
 
-        for enemy in old_bucket.union(new_bucket):
-            if enemy in self._damaged:
-                continue
+        for enemy in get_units_crossed(candidates, old_position, new_position):
+            enemy.damage(self.damage, self.damage_type)
+            self._damaged.add(enemy)
 
-            x1, y1 = old_position
-            x2, y2 = new_position
+            if self._hit_count and len(self._damaged) >= self._hit_count:
+                return False, None
 
-            if x2 < x1:
-                x1, x2 = x2, x1
+        # leaving the grid expires the obstacle, once it has hit the enemies on its way out
+        return units.enemies.is_position_valid(new_position), None
 
-            if y2 < y1:
-                y1, y2 = y2, y1
 
-            tl1, br1 = (x1, y1), (x2, y2)
-            tl2, br2 = enemy.get_bounding_box()
+class Pulse(PiercingObstacle):
+    """A projectile fired from a PulseTower that damages all enemies it collides with"""
+    name = "Pulse"
+    colour = '#7F191C'  # Falu
 
-            if rectangles_intersect(tl1, br1, tl2, br2):
-                enemy.damage(self.damage, 'pulse')
-                self._damaged.add(enemy)
+    damage_type = 'pulse'
 
-                if self._hit_count and len(self._damaged) >= self._hit_count:
-                    return False, None
+    NORTH = (0, -1)
+    SOUTH = (0, 1)
+    EAST = (1, 0)
+    WEST = (-1, 0)
 
-        return True, None
+    DIRECTIONS = [NORTH, EAST, SOUTH, WEST]
+
+    base_damage = 30
+
+    def __init__(self, position, cell_size, direction, size=.04,
+                 rotation: Union[int, float] = 0, grid_speed=.35, damage=30, hits=20):
+        super().__init__(position, (size, 0), cell_size, direction, grid_speed=grid_speed, rotation=rotation,
+                         damage=damage, hits=hits)
 
 
 class SlowTower(SimpleTower):
@@ -378,11 +618,13 @@ class SlowTower(SimpleTower):
     base_cost = 100
     level_cost = 120
 
+    damage_type = None
+
     def step(self, data):
         """Rotates toward 'target' and attacks if possible"""
         self.cool_down.step()
 
-        target = self.get_unit_in_range(data.enemies)
+        target = self.get_unit_in_range(data.enemies, progress=data.progress)
 
         if target is None:
             return
@@ -408,6 +650,8 @@ class PulseTower(AbstractTower):
 
     range = PlusRange(0.5, 1.5)
 
+    damage_type = 'pulse'
+
     def step(self, units):
         """Fires pulses"""
         self.cool_down.step()
@@ -415,7 +659,7 @@ class PulseTower(AbstractTower):
         if not self.cool_down.is_done():
             return None
 
-        target = self.get_unit_in_range(units.enemies)
+        target = self.get_unit_in_range(units.enemies, progress=units.progress)
 
         if target is None:
             return None
@@ -425,7 +669,7 @@ class PulseTower(AbstractTower):
         pulses = []
 
         for direction in Pulse.DIRECTIONS:
-            pulse = Pulse(self.position, self.cell_size, direction)
+            pulse = create(units.pool, Pulse, self.position, self.cell_size, direction)
             pulse.move_by(Point2D(*direction) * (.4 * self.cell_size))
             pulses.append(pulse)
 
@@ -434,73 +678,40 @@ class PulseTower(AbstractTower):
 
 
 class Laser(AbstractObstacle):
-    """A laser fired from a LaserTower"""
-
+    """The render record of a beam fired by a LaserTower
 
+    Beams are hit-scan, so every enemy along one is damaged as it is fired (see
+    LaserTower.step); a laser only lingers for a few steps afterward so it can be drawn.
+    """
     name = "Laser"
-    #colour = "#00FFFF" #Aqua
     colour = 'red'
-    rotation_threshold = (1 / 3) * math.pi
 
+    damage_type = 'energy'
 
-    def __init__(self, position, cell_size, target: AbstractEnemy, size=30,
-                 rotation: Union[int, float] = 0, grid_speed=.5, damage=10):
-        
-        super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
-        self.target = target
-        self._rotation = rotation
+    def __init__(self, start, end, cell_size, lifetime=2):
+        """Construct a laser
 
+        Parameters:
+            start (tuple<num, num>): The position the beam was fired from
+            end (tuple<num, num>): The position the beam stops at
+            lifetime (int): The number of steps to persist for
+        """
+        length = euclidean_distance(start, end)
+        super().__init__(start, (length / cell_size, 0), cell_size, rotation=angle_between(start, end))
+
+        self.end = end
+        self.lifetime = lifetime
 
     def step(self, units):
-        """Performs a time step for this missile
-        
-        Moves towards target and damages if collision occurs
-        If target is dead, this missile expires
-        
-        Parameters:
-            units.enemies (UnitManager): The unit manager to select targets from
-            
+        """Counts down this laser's lifetime
+
         Return:
             (persist, new_obstacles) pair, where:
                 - persist (bool): True if the obstacle should persist in the game (else will be removed)
                 - new_obstacles (list[AbstractObstacle]): A list of new obstacles to add to the game, or None
         """
-        
-        if self.target == None:
-            return False, None
-
-        if self.target.is_dead():
-            return False, None
-
-        
-        # move toward the target
-        #for enemy in units.enemies:
-         #   radius = euclidean_distance(self.position, enemy.position)
-
-            #if radius <= self.speed:
-                #enemy.damage(self.damage, 'energy')
-                #return False, None
-
-        # new approach to laser
-        x, y = old_position = self.position
-        dx, dy = polar_to_rectangular(self.speed, self._rotation)
-        self.position = new_position = x + dx, y + dy
-
-        self._hit_count = 1000 
-
-
-        try:
-            old_bucket = units.enemies.get_bucket_for_position(old_position)
-            new_bucket = units.enemies.get_bucket_for_position(self.position)
-        except IndexError:
-            return False, None
-
-        for enemy in old_bucket.union(new_bucket):
-            if -0.5 <= euclidean_distance(self.position, enemy.position) >= 0.5:
-                enemy.damage(self.damage, 'energy')
-
-
-        return True, None
+        self.lifetime -= 1
+        return self.lifetime > 0, None
 
 
 class LaserTower(SimpleTower):
@@ -515,17 +726,20 @@ class LaserTower(SimpleTower):
 
     range = CircularRange(4)
 
+    damage_type = 'energy'
+
     rotation_threshold = (1 / 3) * math.pi
 
-    def __init__(self, cell_size: int, grid_size=(.9, .9), rotation=math.pi * .25, base_damage=2, level: int = 1):
+    def __init__(self, cell_size: int, grid_size=(.9, .9), rotation=math.pi * .25, base_damage=8, level: int = 1):
         super().__init__(cell_size, grid_size=grid_size, rotation=rotation, base_damage=base_damage, level=level)
 
         self._target: AbstractEnemy = None
 
-    def _get_target(self, units) -> Union[AbstractEnemy, None]:
+    def _get_target(self, units, progress=None) -> Union[AbstractEnemy, None]:
         """Returns previous target, else selects new one if previous is invalid
         
         Invalid target is one of:
+            - no longer among 'units' (i.e. dead, escaped or released to an ObjectPool)
             - dead
             - out-of-range
             - off the map
@@ -536,10 +750,11 @@ class LaserTower(SimpleTower):
                            Otherwise, returns None
         """
         if self._target is None \
+                or self._target not in units \
                 or self._target.is_dead() \
                 or not self.is_position_in_range(self._target.position) \
                 or self._target.position[0] > 400:
-            self._target = self.get_unit_in_range(units)
+            self._target = self.get_unit_in_range(units, progress=progress)
 
         return self._target
 
@@ -547,7 +762,7 @@ class LaserTower(SimpleTower):
         """Rotates toward 'target' and fires laser if possible"""
         self.cool_down.step()
 
-        target = self._get_target(units.enemies)
+        target = self._get_target(units.enemies, progress=units.progress)
 
         # if there's no target or if the target is out of the map
         if target is None:
@@ -565,76 +780,45 @@ class LaserTower(SimpleTower):
 
         self.cool_down.start()
 
-        # Spawn laser on tower
-        laser = Laser(self.position, self.cell_size, target, rotation=self.rotation,
-                          damage=self.get_damage(), grid_speed=.5)
-
-        # Move laser to outer edge of tower
-        radius = self.grid_size[0] / 2
-        delta = polar_to_rectangular(self.cell_size * radius, partial_angle)
-        laser.move_by(delta)
-
-
-        return [laser]
+        # Fire a beam from the outer edge of the tower to the edge of its range
+        x, y = self.position
+        dx, dy = polar_to_rectangular(self.cell_size * self.grid_size[0] / 2, partial_angle)
+        start = x + dx, y + dy
 
-class Inferno(Pulse):
-    '''a pulse that deals energy damage'''
+        dx, dy = polar_to_rectangular(self.cell_size * self.range.radius, partial_angle)
+        end = x + dx, y + dy
 
-    colour = 'orange'
-    name = 'Inferno'
-    base_damage = 20
+        self._fire_beam(units.enemies, start, end)
 
+        laser = create(units.pool, Laser, start, end, self.cell_size)
 
-    def step(self, units):
-        """Performs a time step for this pulse
+        return [laser]
 
-        Moves according to direction, damaging any enemies that are collided with along the way
-        If hits is non-zero, this pulse expires if it has the number of enemies hit is at least 'hits',
-        else continues until off the grid
+    def _fire_beam(self, enemies, start, end):
+        """Damages every enemy the beam from 'start' to 'end' passes through
 
         Parameters:
-            units.enemies (UnitManager): The unit manager to select targets from
-
-        Return:
-            (persist, new_obstacles) pair, where:
-                - persist (bool): True if the obstacle should persist in the game (else will be removed)
-                - new_obstacles (list[AbstractObstacle]): A list of new obstacles to add to the game, or None
+            enemies (UnitManager): The unit manager to select targets from
+            start (tuple<num, num>): The position the beam is fired from
+            end (tuple<num, num>): The position the beam stops at
         """
-        dx, dy = tuple(self.speed * i for i in self.direction)
-
-        x, y = old_position = self.position
-        self.position = new_position = x + dx, y + dy
-
-        try:
-            old_bucket = units.enemies.get_bucket_for_position(old_position)
-            new_bucket = units.enemies.get_bucket_for_position(self.position)
-        except IndexError:
-            return False, None
-
-        for enemy in old_bucket.union(new_bucket):
-            if enemy in self._damaged:
-                continue
+        # broadphase: every enemy in a bucket along the beam, then exact segment vs box tests
+        candidates = [enemy for bucket in enemies.get_buckets_along(start, end) for enemy in bucket]
 
-            x1, y1 = old_position
-            x2, y2 = new_position
+        damage = self.get_damage()
+        for enemy in get_units_crossed(candidates, start, end):
+            enemy.damage(damage, self.damage_type)
 
-            if x2 < x1:
-                x1, x2 = x2, x1
 
-            if y2 < y1:
-                y1, y2 = y2, y1
+class Inferno(Pulse):
+    '''a pulse that deals energy damage'''
 
-            tl1, br1 = (x1, y1), (x2, y2)
-            tl2, br2 = enemy.get_bounding_box()
+    colour = 'orange'
+    name = 'Inferno'
 
-            if rectangles_intersect(tl1, br1, tl2, br2):
-                enemy.damage(self.damage, 'energy')
-                self._damaged.add(enemy)
+    damage_type = 'energy'
+    base_damage = 20
 
-                if self._hit_count and len(self._damaged) >= self._hit_count:
-                    return False, None
-
-        return True, None
 
 class InfernoTower(PulseTower):
     '''a pulse tower that shoots infernos'''
@@ -646,6 +830,8 @@ class InfernoTower(PulseTower):
 
     range = PlusRange(0.5, 1.5)
 
+    damage_type = 'energy'
+
 
     def step(self, units):
         """Fires pulses"""
@@ -654,7 +840,7 @@ class InfernoTower(PulseTower):
         if not self.cool_down.is_done():
             return None
 
-        target = self.get_unit_in_range(units.enemies)
+        target = self.get_unit_in_range(units.enemies, progress=units.progress)
 
         if target is None:
             return None
@@ -664,7 +850,7 @@ class InfernoTower(PulseTower):
         infernos = []
 
         for direction in Inferno.DIRECTIONS:
-            inferno = Inferno(self.position, int(self.cell_size), direction)
+            inferno = create(units.pool, Inferno, self.position, int(self.cell_size), direction)
             inferno.move_by(Point2D(*direction) * (.4 * self.cell_size))
             infernos.append(inferno)
 
@@ -679,8 +865,13 @@ class Bullet(AbstractObstacle):
     name = "Bullet"
     colour = 'orange'  # Eburnean
 
+    damage_type = 'explosive'
+
     rotation_threshold = (1 / 3) * math.pi
 
+    # bullets that miss their target fly on in a straight line
+    max_lifetime = 300
+
     def __init__(self, position, cell_size, target: AbstractEnemy, size=.2,
                  rotation: Union[int, float] = 0, grid_speed=.1, damage=80):
         super().__init__(position, (size, 0), cell_size, grid_speed=grid_speed, rotation=rotation, damage=damage)
@@ -708,7 +899,7 @@ class Bullet(AbstractObstacle):
         radius = euclidean_distance(self.position, self.target.position)
 
         if radius <= self.speed:
-            self.target.damage(self.damage, 'explosive')
+            self.target.damage(self.damage, self.damage_type)
             return False, None
 
 
@@ -728,6 +919,8 @@ class GunTower(SimpleTower):
     cool_down_steps = 4
     base_cost = 30
 
+    damage_type = 'explosive'
+
     def __init__(self, cell_size: int, grid_size=(.9, .9), rotation=math.pi * .25, base_damage=40, level: int = 1):
         super().__init__(cell_size, grid_size, rotation, base_damage, level)
         self._target = None
@@ -737,7 +930,7 @@ class GunTower(SimpleTower):
         """Rotates toward 'target' and fires missile if possible"""
         self.cool_down.step()
 
-        target = self._get_target(units.enemies)
+        target = self._get_target(units.enemies, progress=units.progress)
 
         if target is None:
             return None
@@ -754,7 +947,7 @@ class GunTower(SimpleTower):
         self.cool_down.start()
 
         # Spawn missile on tower
-        bullet = Bullet(self.position, self.cell_size, target, rotation=self.rotation,
+        bullet = create(units.pool, Bullet, self.position, self.cell_size, target, rotation=self.rotation,
                           damage=self.get_damage(), grid_speed=.4)
 
         # Move missile to outer edge of tower
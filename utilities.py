@@ -3,10 +3,14 @@ General & Geometric Utilities
 """
 
 import math
-import tkinter as tk
 from typing import Union, Tuple
 from inspect import getmembers, isfunction
 
+try:
+    import numpy as np
+except ImportError:  # numpy is only required for batched segment vs box tests
+    np = None
+
 __author__ = "Benjamin Martin and Brae Webb"
 __copyright__ = "Copyright 2018, The University of Queensland"
 __license__ = "MIT"
@@ -71,6 +75,96 @@ def rectangles_intersect(top_left1: Point2D_T, bottom_right1: Point2D_T,
     return not (left1 > right2 or right1 < left2 or top1 > bottom2 or bottom1 < top)
 
 
+def segment_intersects_box(start: Point2D_T, end: Point2D_T,
+                           top_left: Point2D_T, bottom_right: Point2D_T) -> bool:
+    """(bool) Returns True iff the segment from 'start' to 'end' intersects a box, using the
+    slab method (see segments_intersect_boxes to test many boxes at once)
+
+    Boxes are closed, like rectangles_intersect, so touching a box's edge counts as a hit.
+
+    Parameters:
+        start (tuple<num, num>): The position the segment starts at
+        end (tuple<num, num>): The position the segment ends at
+        top_left (tuple<num, num>): The top-left corner position of the box
+        bottom_right (tuple<num, num>): The bottom-right corner position of the box
+    """
+    enter, leave = 0., 1.
+
+    # the segment is start + t * (end - start), for t in [0, 1]; only the axes it moves
+    # along limit t, & those it doesn't must already lie within the box
+    for origin, target, low, high in zip(start, end, top_left, bottom_right):
+        delta = target - origin
+
+        if not delta:
+            if not low <= origin <= high:
+                return False
+            continue
+
+        near, far = (low - origin) / delta, (high - origin) / delta
+        if near > far:
+            near, far = far, near
+
+        enter, leave = max(enter, near), min(leave, far)
+
+    return enter <= leave
+
+
+def get_segment_box_hits(start: Point2D_T, end: Point2D_T, top_left, bottom_right) -> list:
+    """(list<bool>) Returns whether the segment from 'start' to 'end' intersects each box,
+    testing them all at once if numpy is installed, else one at a time
+
+    Parameters:
+        start (tuple<num, num>): The position the segment starts at
+        end (tuple<num, num>): The position the segment ends at
+        top_left (list<tuple<num, num>>): The top-left corner position of each box
+        bottom_right (list<tuple<num, num>>): The bottom-right corner position of each box
+    """
+    if np is None:
+        return [segment_intersects_box(start, end, *box) for box in zip(top_left, bottom_right)]
+
+    return segments_intersect_boxes(start, end, top_left, bottom_right).tolist()
+
+
+def segments_intersect_boxes(starts, ends, top_left, bottom_right):
+    """Tests every segment against its box at once, using the slab method
+
+    Boxes are closed, like rectangles_intersect, so touching a box's edge counts as a hit.
+    A single segment may be given to test it against every box.
+
+    Parameters:
+        starts (array_like<float>): (n, 2) array of the position each segment starts at
+        ends (array_like<float>): (n, 2) array of the position each segment ends at
+        top_left (array_like<float>): (n, 2) array of the top-left corner of each box
+        bottom_right (array_like<float>): (n, 2) array of the bottom-right corner of each box
+
+    Return:
+        np.ndarray<bool>: (n,) array, True for each segment that intersects its box
+
+    Raises:
+        ImportError if numpy is not installed
+    """
+    if np is None:
+        raise ImportError("segments_intersect_boxes requires numpy")
+
+    starts, ends = np.asarray(starts, dtype=float), np.asarray(ends, dtype=float)
+    top_left, bottom_right = np.asarray(top_left, dtype=float), np.asarray(bottom_right, dtype=float)
+
+    deltas = ends - starts
+    moving = deltas != 0
+
+    # the fraction of each segment travelled on reaching either side of the box, along
+    # each axis; axes a segment doesn't move along must already lie within the box
+    with np.errstate(divide='ignore', invalid='ignore'):
+        near = (top_left - starts) / deltas
+        far = (bottom_right - starts) / deltas
+
+    within = (starts >= top_left) & (starts <= bottom_right)
+    enter = np.where(moving, np.minimum(near, far), np.where(within, -np.inf, np.inf))
+    leave = np.where(moving, np.maximum(near, far), np.where(within, np.inf, -np.inf))
+
+    return np.maximum(enter.max(axis=-1), 0) <= np.minimum(leave.min(axis=-1), 1)
+
+
 def rotate_point(point, angle):
     """(float, float) Returns result of rotating 'point' by 'angle' radians
     
@@ -127,6 +221,29 @@ def get_delta_through_centre(cell_offset, delta):
     return delta
 
 
+def get_radial_target(cell_offset, delta):
+    """Returns the offset, from the centre of the current cell, to move toward in order to
+    follow delta, which (unlike get_delta_through_centre) may be diagonal.
+
+    The target is the centre of the next cell if the current offset already lies in the
+    direction of delta (or at the centre), else the centre of the current cell.
+
+    Parameters:
+        cell_offset (tuple<float, float>): The relative offset from the centre of a cell
+        delta (tuple<int, int>): The position delta to move towards
+
+    Return:
+        tuple<int, int>: Either delta, or (0, 0)
+    """
+    for offset, direction in zip(cell_offset, delta):
+        sign = 1 if offset > 0 else (-1 if offset < 0 else 0)
+
+        if sign not in (0, direction):
+            return 0, 0
+
+    return delta
+
+
 def inherit_docstrings(cls):
     """Class decorator for methods to inherit super classes docstrings
 
@@ -147,80 +264,6 @@ def inherit_docstrings(cls):
     return cls
 
 
-class Stepper:
-    """Asynchronous control class to emulate non-blocking loop for
-    tkinter GUI application by repeatedly runnning step function
-    after a given interval
-    
-    Can be stopped/paused
-    """
-
-    def __init__(self, master: Union[tk.Widget, tk.Tk], delay: int = 30):
-        """Constructor
-        
-        Parameters:
-            master (tk.Widget|tk.Tk): The tkinter master widget
-            delay (int): The number of milliseconds between each _step
-                         (does not include time taken to run _step)
-        """
-        self._master = master
-        self._step_number = -1
-        self._paused = False
-        self._delay = delay
-        self._after_id = None
-
-    def is_started(self):
-        """(bool) Returns True iff the stepper is started"""
-        return self._after_id is not None
-
-    def is_stopped(self):
-        """(bool) Returns True iff the stepper is stopped"""
-        return self._after_id is None and not self._paused
-
-    def is_paused(self):
-        """(bool) Returns True iff the stepper is paused"""
-        return self._paused
-
-    def start(self):
-        """Start the stepper"""
-        if self.is_started():
-            return
-        self._paused = False
-        self._after_id = self._master.after(self._delay, self._step_manager)
-
-    def stop(self):
-        """Stop the stepper & reset steps to 0"""
-        if self.is_stopped():
-            return
-        if not self.is_paused():
-            self._paused = False
-            self._master.after_cancel(self._after_id)
-            self._after_id = None
-        self._step_number = -1
-
-    def pause(self):
-        """Pause the stepper (does not reset steps to 0)"""
-        if self.is_paused() or self.is_stopped():
-            return
-        self._paused = True
-        self._master.after_cancel(self._after_id)
-        self._after_id = None
-
-    def _step_manager(self):
-        """Internal wrapper around step method to keep track of the number of steps and queue next step"""
-        self._step_number += 1
-
-        if self._step() and not self.is_stopped():
-            self._after_id = self._master.after(self._delay, self._step_manager)
-
-    def _step(self):
-        """(bool) Performs a step
-        
-        Returns True if stepping should continue
-        """
-        raise NotImplementedError("_step must be implemented by a subclass")
-
-
 class Countdown:
     """A simple decrementing counter"""
     current: int = 0
@@ -243,3 +286,64 @@ class Countdown:
         """Decrements the counter if possible"""
         if self.current > 0:
             self.current -= 1
+
+
+class FixedTimestep:
+    """Converts elapsed real time into a whole number of fixed-length simulation ticks
+
+    Unused time is carried over to the next frame, so the simulation advances at a
+    fixed rate regardless of how often (or how regularly) frames are rendered.
+    """
+    # Supported speed multipliers, where None is unbounded (as many ticks as fit in a frame)
+    SPEEDS = (1, 2, 4, 16, None)
+
+    def __init__(self, frame_length: float, ticks_per_frame: int = 1, max_ticks: int = 64):
+        """Constructor
+
+        Parameters:
+            frame_length (float): The number of seconds between each rendered frame
+            ticks_per_frame (int): The number of ticks per frame at normal (1x) speed
+            max_ticks (int): The most ticks to run in one frame; time beyond this is
+                             dropped, so that slow frames can't snowball
+        """
+        self.tick_length = frame_length / ticks_per_frame
+        self.max_ticks = max_ticks
+        self.speed = 1
+        self._accumulated = 0.
+
+    def set_speed(self, speed):
+        """Sets the speed multiplier
+
+        Parameters:
+            speed (int|None): One of SPEEDS, where None is unbounded
+        """
+        if speed not in self.SPEEDS:
+            raise ValueError(f"Unsupported speed {speed!r}, must be one of {self.SPEEDS}")
+
+        self.speed = speed
+        self._accumulated = 0.
+
+    def next_speed(self):
+        """(int|None) Cycles to, and returns, the next speed multiplier"""
+        index = self.SPEEDS.index(self.speed)
+        self.set_speed(self.SPEEDS[(index + 1) % len(self.SPEEDS)])
+        return self.speed
+
+    def update(self, elapsed: float):
+        """Accumulates 'elapsed' seconds of real time
+
+        Returns:
+            int|None: The number of ticks to run this frame, or None if unbounded
+        """
+        if self.speed is None:
+            return None
+
+        self._accumulated += elapsed * self.speed
+        ticks = int(self._accumulated // self.tick_length)
+        self._accumulated -= ticks * self.tick_length
+
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self._accumulated = 0.
+
+        return ticks